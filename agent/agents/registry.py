@@ -39,8 +39,9 @@ You are a patient and enthusiastic educator. You:
 
 Your tone is warm, encouraging, and supportive. You make learning feel fun and accessible.
 """,
-        "voice": "aura-asteria-en",  # Warm female voice
-        "greeting": "Hello! I'm your teaching assistant. What would you like to learn about today?"
+        "voice": "Aoede",  # Warm female voice
+        "greeting": "Hello! I'm your teaching assistant. What would you like to learn about today?",
+        "context_token_budget": 24000,  # Lessons refer back to earlier explanations
     },
     
     "consultant": {
@@ -58,8 +59,9 @@ You are a sharp, analytical business advisor. You:
 
 Your tone is professional, thoughtful, and direct. You respect the user's time and get to the point.
 """,
-        "voice": "aura-orion-en",  # Professional male voice
-        "greeting": "Good to connect with you. What business challenge can I help you work through?"
+        "voice": "Charon",  # Professional male voice
+        "greeting": "Good to connect with you. What business challenge can I help you work through?",
+        "context_token_budget": 24000,  # Business context builds up over the session
     },
     
     "coach": {
@@ -77,8 +79,9 @@ You are an empathetic and motivating life coach. You:
 
 Your tone is warm, supportive, and empowering. You believe in the person you're talking to.
 """,
-        "voice": "aura-luna-en",  # Warm, nurturing voice
-        "greeting": "Hi there! I'm so glad we're connecting. How are you feeling today, and what's on your mind?"
+        "voice": "Leda",  # Warm, nurturing voice
+        "greeting": "Hi there! I'm so glad we're connecting. How are you feeling today, and what's on your mind?",
+        "context_token_budget": 16000,  # Long sessions; the summary carries the thread
     },
     
     "friend": {
@@ -96,8 +99,9 @@ You are a fun, easygoing friend to chat with. You:
 
 Your tone is relaxed, warm, and authentically engaged. You're here to have a good chat.
 """,
-        "voice": "aura-stella-en",  # Friendly, approachable voice
-        "greeting": "Hey! Great to chat with you. What's going on?"
+        "voice": "Puck",  # Friendly, approachable voice
+        "greeting": "Hey! Great to chat with you. What's going on?",
+        "context_token_budget": 12000,  # Casual chat, mostly about the last few turns
     }
 }
 
@@ -0,0 +1,215 @@
+"""
+Replay a long transcript through ContextCompactor and compare the realtime
+model's context with and without compaction.
+
+Each user message is one generation. Its input size is estimated the way
+Gemini Live holds the conversation: turns spoken in the current Gemini
+session as audio tokens (AUDIO_TOKENS_PER_SECOND at a speaking rate of
+WORDS_PER_SECOND), and text (instructions, summary and the turns a
+compaction carries over) at about 4 characters per token. Input tokens
+are billed for the whole context on every generation, so the total shows
+the cost difference.
+
+Summaries come from the same summarizer the worker uses (Gemini, needs
+GOOGLE_API_KEY), or with --offline from a local extractive stand-in that
+measures the mechanics without network calls.
+
+Usage:
+    python -m agent.bench_context                          # 45 min synthetic coaching session
+    python -m agent.bench_context --minutes 90 --agent-type teacher
+    python -m agent.bench_context --file transcript.json   # [{"role": ..., "content": ...}, ...]
+    python -m agent.bench_context --session-id <uuid>      # Messages from the database
+    python -m agent.bench_context --offline --budget 8000 --recent-turns 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+from typing import Dict, List, Set
+
+from livekit.agents import llm
+
+from agent.agents.registry import get_agent_config
+from agent.context import (
+    DEFAULT_TOKEN_BUDGET,
+    RECENT_TURNS,
+    ContextCompactor,
+    summarize_with_gemini,
+    summary_instructions,
+)
+
+# Gemini audio input/output tokens per second of speech
+AUDIO_TOKENS_PER_SECOND = 32
+
+# Conversational speaking rate (150 words per minute)
+WORDS_PER_SECOND = 2.5
+
+TOPICS = [
+    "getting back into running after an injury", "a difficult conversation with a manager",
+    "sleeping badly before deadlines", "saving for a first apartment", "learning to say no",
+    "a sister's wedding speech", "switching careers into design", "keeping a journaling habit",
+]
+
+
+def text_tokens(text: str) -> int:
+    """Rough token count of text (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def audio_tokens(text: str) -> int:
+    """Tokens of the same text spoken as audio."""
+    return int(len(text.split()) / WORDS_PER_SECOND * AUDIO_TOKENS_PER_SECOND)
+
+
+def synthetic_transcript(minutes: float, seed: int = 7) -> List[Dict[str, str]]:
+    """Alternating user/assistant messages filling about `minutes` of talk."""
+    rng = random.Random(seed)
+    messages, spoken_seconds, turn = [], 0.0, 0
+    while spoken_seconds < minutes * 60:
+        topic = TOPICS[(turn // 12) % len(TOPICS)]
+        user = f"About {topic}, " + " ".join(rng.choice(["I", "think", "really", "maybe", "week", "felt", "tried", "because", "again", "but"]) for _ in range(rng.randint(12, 40)))
+        assistant = f"That makes sense regarding {topic}. " + " ".join(rng.choice(["you", "could", "try", "small", "step", "notice", "what", "helps", "and", "when"]) for _ in range(rng.randint(25, 70)))
+        for role, content in (("user", user), ("assistant", assistant)):
+            messages.append({"role": role, "content": content})
+            spoken_seconds += len(content.split()) / WORDS_PER_SECOND + 1.0
+        turn += 1
+    return messages
+
+
+async def summarize_offline(summary: str, messages: List[llm.ChatMessage]) -> str:
+    """Extractive stand-in: the first words of each user message, capped at ~250 words."""
+    points = [" ".join(message.text_content.split()[:8]) for message in messages if message.role == "user"]
+    return " ".join((summary.split() + " / ".join(points).split())[-250:])
+
+
+async def load_session_transcript(session_id: str) -> List[Dict[str, str]]:
+    """Messages of a stored session, oldest first."""
+    from agent.database import get_message_repository
+
+    repository = await get_message_repository()
+    if repository is None:
+        raise SystemExit("❌ Persistence is disabled (AGENT_PERSISTENCE=0 or backend not importable)")
+    return [
+        {"role": row["role"], "content": row["content"]}
+        for row in await repository.get_session_messages(session_id, limit=100000)
+        if row["role"] in ("user", "assistant")
+    ]
+
+
+def context_tokens(instructions: str, chat_ctx: llm.ChatContext, text_ids: Set[str]) -> int:
+    """Estimated input tokens of a generation on this context."""
+    total = text_tokens(instructions)
+    for item in chat_ctx.items:
+        text = item.text_content or ""
+        total += text_tokens(text) if item.id in text_ids else audio_tokens(text)
+    return total
+
+
+async def replay(messages: List[Dict[str, str]], instructions: str, compactor: ContextCompactor) -> Dict[str, List[float]]:
+    """
+    Replay messages, compacting as the worker does.
+
+    Returns:
+        Per-generation context tokens with and without compaction, and the
+        time spent applying each compaction (ms)
+    """
+    chat_ctx = llm.ChatContext.empty()
+    full_ctx = llm.ChatContext.empty()
+    text_ids: Set[str] = set()
+    results: Dict[str, List[float]] = {"compacted": [], "baseline": [], "apply_ms": []}
+
+    for message in messages:
+        chat_ctx.add_message(role=message["role"], content=message["content"])
+        full_ctx.add_message(role=message["role"], content=message["content"])
+        if message["role"] != "user":
+            # The reply was added: the worker hands over here when a summary is ready
+            await compactor.wait()
+            if compactor.ready:
+                start = time.perf_counter()
+                chat_ctx = compactor.apply(chat_ctx)
+                results["apply_ms"].append((time.perf_counter() - start) * 1000)
+                # Carried-over turns are seeded into the new session as text
+                text_ids = {item.id for item in chat_ctx.items}
+            continue
+
+        tokens = context_tokens(summary_instructions(instructions, compactor.summary), chat_ctx, text_ids)
+        results["compacted"].append(tokens)
+        results["baseline"].append(context_tokens(instructions, full_ctx, set()))
+        compactor.observe(tokens, chat_ctx)
+
+    return results
+
+
+def describe(values: List[float], precision: int = 0) -> str:
+    """p50 / max of a series."""
+    if not values:
+        return "n/a"
+    return f"p50={statistics.median(values):,.{precision}f} max={max(values):,.{precision}f}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agent-type", default="coach", help="Registry agent type (instructions and budget)")
+    parser.add_argument("--minutes", type=float, default=45, help="Length of the synthetic transcript")
+    parser.add_argument("--file", help="JSON transcript to replay instead of the synthetic one")
+    parser.add_argument("--session-id", help="Stored session to replay instead of the synthetic one")
+    parser.add_argument("--budget", type=int, help="Token budget (default: the agent type's)")
+    parser.add_argument("--recent-turns", type=int, default=RECENT_TURNS, help="Turns kept verbatim")
+    parser.add_argument("--offline", action="store_true", help="Use the local extractive summarizer")
+    args = parser.parse_args()
+
+    config = get_agent_config(args.agent_type)
+    budget = args.budget or config.get("context_token_budget", DEFAULT_TOKEN_BUDGET)
+    if args.session_id:
+        messages = await load_session_transcript(args.session_id)
+        source = f"session {args.session_id}"
+    elif args.file:
+        with open(args.file) as f:
+            messages = json.load(f)
+        source = args.file
+    else:
+        messages = synthetic_transcript(args.minutes)
+        source = f"synthetic {args.minutes:.0f} min"
+
+    compactor = ContextCompactor(
+        token_budget=budget,
+        recent_turns=args.recent_turns,
+        summarize=summarize_offline if args.offline else summarize_with_gemini,
+    )
+
+    print("=" * 60)
+    print(f"Context compaction replay ({source}, {len(messages)} messages)")
+    print(f"agent_type={args.agent_type} budget={budget} recent_turns={args.recent_turns} "
+          f"summarizer={'offline' if args.offline else 'gemini'}")
+    print("=" * 60)
+
+    results = await replay(messages, config["instructions"], compactor)
+    baseline, compacted = results["baseline"], results["compacted"]
+    if not compacted:
+        print("❌ Transcript has no user messages")
+        return
+
+    saved = 1 - sum(compacted) / sum(baseline)
+    print(f"Generations:               {len(compacted)}")
+    print(f"Context tokens, baseline:  {describe(baseline)}")
+    print(f"Context tokens, compacted: {describe(compacted)}")
+    print(f"Input tokens billed:       {sum(baseline):,.0f} -> {sum(compacted):,.0f} ({saved:.0%} saved)")
+    print(f"Compactions:               {compactor.compactions}")
+    print(f"Summary latency (ms):      {describe(compactor.summary_ms)} (background, off the audio path)")
+    print(f"Apply (ms):                {describe(results['apply_ms'], precision=3)}")
+    print(f"Summary size:              {text_tokens(compactor.summary) if compactor.summary else 0} tokens")
+    over = sum(1 for tokens in compacted if tokens > budget * 1.5)
+    print(f"{'✅' if over == 0 else '❌'} Generations over 1.5x budget: {over}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv("../.env")
+    load_dotenv(".env")
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""
+Load reporting for the agent worker.
+
+LiveKit calls the worker's load_fnc periodically. Once the returned load
+reaches load_threshold the worker is marked full and LiveKit dispatches
+new rooms to other workers, until the load drops again.
+
+The load is the highest of:
+- active sessions / AGENT_MAX_SESSIONS (each session holds a Gemini
+  realtime connection and an avatar stream)
+- CPU utilisation, averaged over the last few samples
+- memory utilisation
+
+AGENT_MAX_SESSIONS and AGENT_LOAD_THRESHOLD for a node size come from
+the soak test (python -m agent.soak), which ramps concurrent jobs until
+turn latency degrades.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+import psutil
+
+from agent.metrics import (
+    WORKER_ACTIVE_SESSIONS,
+    WORKER_AVAILABLE,
+    WORKER_CPU_LOAD,
+    WORKER_LOAD,
+    WORKER_MEMORY_LOAD,
+)
+
+logger = logging.getLogger("mirage-agent")
+
+# Sessions one worker carries at full load
+MAX_SESSIONS = int(os.getenv("AGENT_MAX_SESSIONS", "8"))
+
+# Load at which the worker stops taking jobs (unset: LiveKit's default,
+# no limit in dev mode and 0.7 in production)
+LOAD_THRESHOLD = os.getenv("AGENT_LOAD_THRESHOLD")
+
+# Seconds between load log lines (threshold crossings are always logged)
+LOAD_LOG_INTERVAL_SECONDS = float(os.getenv("AGENT_LOAD_LOG_INTERVAL", "60"))
+
+# CPU samples averaged (load_fnc runs every few seconds and before job offers)
+CPU_SAMPLES = 5
+
+
+class WorkerLoad:
+    """
+    load_fnc for WorkerOptions.
+
+    Keeps a short CPU moving average and exports the load components as
+    Prometheus gauges. LiveKit runs load_fnc in an executor thread, possibly
+    concurrently, so the sampling state is guarded by a lock.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, threshold: Optional[float] = None):
+        """
+        Args:
+            max_sessions: Sessions per worker at full load
+            threshold: Load threshold passed to WorkerOptions, used for
+                logging availability changes (None if LiveKit's default)
+        """
+        self.max_sessions = max(1, max_sessions)
+        self.threshold = threshold
+        self._cpu_samples: deque = deque(maxlen=CPU_SAMPLES)
+        self._available: Optional[bool] = None
+        self._last_log = 0.0
+        self._lock = threading.Lock()
+        psutil.cpu_percent(interval=None)  # First call only sets the baseline
+
+    def __call__(self, worker: Any) -> float:
+        """Compute the current load of the worker (0-1, may exceed 1)."""
+        sessions = len(worker.active_jobs)
+        memory = psutil.virtual_memory().percent / 100
+
+        with self._lock:
+            self._cpu_samples.append(psutil.cpu_percent(interval=None) / 100)
+            cpu = sum(self._cpu_samples) / len(self._cpu_samples)
+
+            load = max(sessions / self.max_sessions, cpu, memory)
+
+            WORKER_LOAD.set(load)
+            WORKER_ACTIVE_SESSIONS.set(sessions)
+            WORKER_CPU_LOAD.set(cpu)
+            WORKER_MEMORY_LOAD.set(memory)
+
+            self._report(load, sessions, cpu, memory)
+        return load
+
+    def _report(self, load: float, sessions: int, cpu: float, memory: float):
+        """Log the load periodically and whenever availability changes."""
+        available = self.threshold is None or load < self.threshold
+        WORKER_AVAILABLE.set(1 if available else 0)
+
+        summary = (
+            f"load={load:.2f} sessions={sessions}/{self.max_sessions} "
+            f"cpu={cpu:.2f} memory={memory:.2f}"
+        )
+        now = time.monotonic()
+
+        if available != self._available:
+            if self._available is not None:
+                if available:
+                    logger.info(f"Worker accepting jobs again ({summary})")
+                else:
+                    logger.warning(f"Worker over load threshold {self.threshold}, not taking jobs ({summary})")
+            self._available = available
+            self._last_log = now
+        elif now - self._last_log >= LOAD_LOG_INTERVAL_SECONDS:
+            logger.info(f"Worker {summary}")
+            self._last_log = now
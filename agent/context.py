@@ -0,0 +1,208 @@
+"""
+Rolling context compaction for long voice sessions.
+
+A realtime session keeps every turn (as audio tokens) in the model's
+context, so each reply of a long session costs more and starts later.
+When a generation's input reaches the agent type's token budget
+(context_token_budget in the registry), ContextCompactor:
+1. Summarizes everything but the last RECENT_TURNS turns, folded into
+   the running summary, with a text model in a background task (off the
+   audio path; replies keep streaming meanwhile)
+2. Hands the compacted context over once the agent finishes its next
+   reply: the summary plus the recent turns verbatim, without the turns
+   already summarized
+
+Gemini Live cannot remove turns from a running session, so the worker
+applies the compacted context through an agent handoff, which starts a
+new Gemini session seeded with it (see manage_context in worker.py).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from livekit.agents import llm
+
+logger = logging.getLogger("mirage-agent")
+
+# Turns (a user message and the replies to it) kept verbatim
+RECENT_TURNS = int(os.getenv("AGENT_CONTEXT_RECENT_TURNS", "6"))
+
+# Budget for agent types without context_token_budget in the registry
+DEFAULT_TOKEN_BUDGET = 24000
+
+# Text model that writes the summaries
+SUMMARY_MODEL = os.getenv("AGENT_SUMMARY_MODEL", "gemini-2.0-flash")
+
+SUMMARY_PROMPT = """You maintain the memory of a long voice conversation between a user and an AI assistant.
+Update the summary below with the new part of the transcript. Keep what the assistant needs to continue
+naturally: the user's name and situation, goals, decisions, open questions, commitments and the topics
+already covered. Write plain prose in the third person, at most 250 words, and drop small talk.
+
+SUMMARY SO FAR:
+{summary}
+
+NEW TRANSCRIPT:
+{transcript}
+
+UPDATED SUMMARY:"""
+
+Summarizer = Callable[[str, List[llm.ChatMessage]], Awaitable[str]]
+
+
+def conversation_messages(chat_ctx: llm.ChatContext) -> List[llm.ChatMessage]:
+    """User and assistant messages of a chat context that have text."""
+    return [
+        item for item in chat_ctx.items
+        if item.type == "message" and item.role in ("user", "assistant") and item.text_content
+    ]
+
+
+def split_recent(messages: List[llm.ChatMessage], recent_turns: int) -> Tuple[List[llm.ChatMessage], List[llm.ChatMessage]]:
+    """
+    Split messages before the last recent_turns user messages.
+
+    Returns:
+        (older messages, recent messages)
+    """
+    user_indexes = [i for i, message in enumerate(messages) if message.role == "user"]
+    if len(user_indexes) <= recent_turns:
+        return [], messages
+    split = user_indexes[-recent_turns] if recent_turns > 0 else len(messages)
+    return messages[:split], messages[split:]
+
+
+def format_transcript(messages: List[llm.ChatMessage]) -> str:
+    """Messages as "User: ..." / "Assistant: ..." lines."""
+    return "\n".join(f"{message.role.capitalize()}: {message.text_content}" for message in messages)
+
+
+def summary_instructions(instructions: str, summary: str) -> str:
+    """Agent instructions with the summary of the earlier conversation appended."""
+    if not summary:
+        return instructions
+    return f"{instructions}\nEARLIER IN THIS CONVERSATION (summary, continue from it naturally):\n{summary}\n"
+
+
+async def summarize_with_gemini(summary: str, messages: List[llm.ChatMessage]) -> str:
+    """
+    Fold messages into the running summary with SUMMARY_MODEL.
+
+    Raises:
+        google.genai.errors.APIError: If the request fails
+        ValueError: If the response has no text
+    """
+    from google.genai import Client
+
+    client = Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    response = await client.aio.models.generate_content(
+        model=SUMMARY_MODEL,
+        contents=SUMMARY_PROMPT.format(summary=summary or "(none yet)", transcript=format_transcript(messages)),
+    )
+    if not response.text:
+        raise ValueError("Summary model returned no text")
+    return response.text.strip()
+
+
+class ContextCompactor:
+    """
+    Decide when to compact a session's context and prepare the compaction.
+
+    Example:
+        compactor = ContextCompactor(token_budget=24000)
+        compactor.observe(metrics.input_tokens, agent.chat_ctx)  # per generation
+        ...
+        if compactor.ready:                                     # after a reply
+            chat_ctx = compactor.apply(agent.chat_ctx)          # recent turns
+            instructions = summary_instructions(base, compactor.summary)
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        recent_turns: int = RECENT_TURNS,
+        summarize: Summarizer = summarize_with_gemini,
+        summary: str = "",
+    ):
+        """
+        Args:
+            token_budget: Context size (input tokens) that triggers compaction
+            recent_turns: Turns kept verbatim
+            summarize: Folds messages into a summary (previous summary, messages)
+            summary: Summary the session already started with (e.g. resumed)
+        """
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary = summary
+        self.compactions = 0
+        self.summary_ms: List[float] = []
+        self._summarize = summarize
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[Tuple[str, Set[str]]] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether a compaction is prepared and waiting to be applied."""
+        return self._ready is not None
+
+    def observe(self, context_tokens: int, chat_ctx: llm.ChatContext) -> bool:
+        """
+        Check a generation's context size, and start summarizing if over budget.
+
+        Returns:
+            Whether a summary was started
+        """
+        if context_tokens < self.token_budget or self._ready is not None:
+            return False
+        if self._task is not None and not self._task.done():
+            return False
+
+        older, _ = split_recent(conversation_messages(chat_ctx), self.recent_turns)
+        if not older:
+            return False
+
+        logger.info(f"Context at {context_tokens} tokens (budget {self.token_budget}), summarizing {len(older)} messages")
+        self._task = asyncio.create_task(self._prepare(older), name="context-summary")
+        return True
+
+    async def _prepare(self, older: List[llm.ChatMessage]):
+        """Summarize older messages in the background."""
+        start = time.perf_counter()
+        try:
+            summary = await self._summarize(self.summary, older)
+        except Exception as e:
+            # The next generation over budget tries again
+            logger.warning(f"Context summary failed: {e}")
+            return
+        self.summary_ms.append((time.perf_counter() - start) * 1000)
+        self._ready = (summary, {message.id for message in older})
+
+    def apply(self, chat_ctx: llm.ChatContext) -> llm.ChatContext:
+        """
+        Take the prepared compaction: a copy of chat_ctx without the summarized
+        messages (turns added since summarizing started are kept). Updates
+        self.summary.
+        """
+        if self._ready is None:
+            raise RuntimeError("No compaction is ready")
+        summary, summarized_ids = self._ready
+        self._ready = None
+        self.summary = summary
+        self.compactions += 1
+
+        compacted = chat_ctx.copy()
+        compacted.items = [item for item in compacted.items if item.id not in summarized_ids]
+        return compacted
+
+    async def wait(self):
+        """Wait for a summary in progress to finish (or fail)."""
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def close(self):
+        """Cancel a summary in progress."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
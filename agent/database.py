@@ -0,0 +1,108 @@
+"""
+Database access for the agent worker.
+
+The worker reuses the backend's repository layer (backend/app), so it
+writes to whichever DATABASE_BACKEND the backend is configured with and
+both share one schema and one set of queries. Only the repository
+factories (app.core.database.factory) are imported, not the backend's
+FastAPI app or auth utilities, and the backend package is loaded from
+MIRAGE_BACKEND_DIR by path instead of through sys.path, so no other
+top-level package named app can stand in for it. Without the backend,
+persistence is disabled and the worker runs as before.
+"""
+
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+from typing import Any, Optional
+
+logger = logging.getLogger("mirage-agent")
+
+BACKEND_DIR = os.getenv(
+    "MIRAGE_BACKEND_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"),
+)
+
+# Set AGENT_PERSISTENCE=0 to run the worker without database access
+PERSISTENCE_ENABLED = os.getenv("AGENT_PERSISTENCE", "1") != "0"
+
+# Backend's app.core.database.factory module once imported
+_factory_module: Optional[Any] = None
+_unavailable = not PERSISTENCE_ENABLED
+
+
+def _load_backend_package():
+    """
+    Register backend/app as the top-level package app.
+
+    Raises:
+        ImportError: If the backend is missing or another app package is loaded
+    """
+    package_dir = os.path.join(BACKEND_DIR, "app")
+    loaded = sys.modules.get("app")
+    if loaded is not None:
+        if os.path.dirname(os.path.abspath(loaded.__file__ or "")) != os.path.abspath(package_dir):
+            raise ImportError(f"a different package named app is already imported ({loaded.__file__})")
+        return
+
+    spec = importlib.util.spec_from_file_location(
+        "app", os.path.join(package_dir, "__init__.py"), submodule_search_locations=[package_dir]
+    )
+    if spec is None or not os.path.exists(spec.origin):
+        raise ImportError(f"no backend package in {BACKEND_DIR}")
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["app"] = package
+    try:
+        spec.loader.exec_module(package)
+    except BaseException:
+        del sys.modules["app"]
+        raise
+
+
+def _factory() -> Optional[Any]:
+    """Import the backend's repository factories, or None if unavailable."""
+    global _factory_module, _unavailable
+    if _factory_module is not None or _unavailable:
+        return _factory_module
+
+    try:
+        _load_backend_package()
+        factory = importlib.import_module("app.core.database.factory")
+        settings = importlib.import_module("app.config").get_settings()
+    except ImportError as e:
+        logger.warning(f"Backend modules not importable, persistence disabled: {e}")
+        _unavailable = True
+        return None
+
+    if settings.DATABASE_BACKEND == "memory":
+        logger.warning("DATABASE_BACKEND=memory is private to each process; the backend will not see worker writes")
+    _factory_module = factory
+    return factory
+
+
+def preload() -> bool:
+    """
+    Import the backend's repository layer ahead of the first job.
+
+    The import (settings, database clients) takes several hundred
+    milliseconds, which a job would otherwise spend before its first
+    query. Called from prewarm.
+
+    Returns:
+        Whether persistence is available
+    """
+    return _factory() is not None
+
+
+async def get_message_repository() -> Optional[Any]:
+    """The backend's MessageRepository, or None if persistence is disabled."""
+    factory = _factory()
+    return await factory.get_message_repository() if factory else None
+
+
+async def get_session_repository() -> Optional[Any]:
+    """The backend's SessionRepository, or None if persistence is disabled."""
+    factory = _factory()
+    return await factory.get_session_repository() if factory else None
@@ -0,0 +1,170 @@
+"""
+On-disk cache of pre-rendered greeting audio.
+
+Greetings are fixed strings per agent type (agent/agents/registry.py), so
+their audio is rendered once per (agent_type, voice) with Gemini TTS and
+stored as WAV. A job with a cached greeting plays it as soon as the user
+joins, instead of waiting for a realtime model round trip.
+
+The file name includes a hash of the greeting text, voice and TTS model,
+so editing a greeting renders it again instead of playing stale audio.
+
+Usage:
+    python -m agent.greetings            # Render missing greetings
+    python -m agent.greetings --force    # Render all greetings again
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import wave
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from livekit import rtc
+
+from agent.agents.registry import get_agent_config, list_agent_types
+
+logger = logging.getLogger("mirage-agent")
+
+CACHE_DIR = os.path.expanduser(os.getenv("AGENT_GREETING_CACHE_DIR", "~/.cache/mirage/greetings"))
+
+# Gemini TTS model used to render greetings (same voices as Gemini Live)
+TTS_MODEL = os.getenv("AGENT_GREETING_TTS_MODEL", "gemini-2.5-flash-preview-tts")
+
+# Gemini TTS returns 16-bit mono PCM at 24kHz
+SAMPLE_RATE = 24000
+
+# Length of each audio frame pushed to the session
+FRAME_MS = 20
+
+
+def cache_path(agent_type: str, voice: str, text: str) -> str:
+    """Path of the cached greeting audio for an agent type and voice."""
+    digest = hashlib.sha256(f"{TTS_MODEL}\n{voice}\n{text}".encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"{agent_type}-{voice}-{digest}.wav")
+
+
+def load_greeting(agent_type: str, voice: str, text: str) -> Optional[bytes]:
+    """
+    Read cached greeting audio.
+
+    Returns:
+        16-bit mono PCM at SAMPLE_RATE, or None if not cached
+    """
+    path = cache_path(agent_type, voice, text)
+    try:
+        with wave.open(path, "rb") as f:
+            if f.getframerate() != SAMPLE_RATE or f.getnchannels() != 1 or f.getsampwidth() != 2:
+                logger.warning(f"Ignoring greeting cache file with unexpected format: {path}")
+                return None
+            return f.readframes(f.getnframes())
+    except FileNotFoundError:
+        return None
+    except (OSError, wave.Error) as e:
+        logger.warning(f"Could not read cached greeting {path}: {e}")
+        return None
+
+
+def load_cached_greetings() -> Dict[Tuple[str, str], bytes]:
+    """Load every cached registry greeting, keyed by (agent_type, voice)."""
+    greetings = {}
+    for agent_type in list_agent_types():
+        config = get_agent_config(agent_type)
+        pcm = load_greeting(agent_type, config["voice"], config["greeting"])
+        if pcm is not None:
+            greetings[(agent_type, config["voice"])] = pcm
+    return greetings
+
+
+async def render_greeting(agent_type: str, voice: str, text: str) -> bytes:
+    """
+    Render a greeting with Gemini TTS and store it in the cache.
+
+    Returns:
+        16-bit mono PCM at SAMPLE_RATE
+
+    Raises:
+        google.genai.errors.APIError: If the TTS request fails
+        ValueError: If the response contains no audio
+    """
+    from google.genai import Client, types
+
+    client = Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    response = await client.aio.models.generate_content(
+        model=TTS_MODEL,
+        contents=text,
+        config=types.GenerateContentConfig(
+            response_modalities=["AUDIO"],
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name=voice),
+                ),
+            ),
+        ),
+    )
+
+    pcm = b"".join(
+        part.inline_data.data
+        for candidate in response.candidates or []
+        for part in (candidate.content.parts if candidate.content else None) or []
+        if part.inline_data and part.inline_data.data
+    )
+    if not pcm:
+        raise ValueError(f"Gemini TTS returned no audio for the {agent_type} greeting")
+
+    # Write then rename, so concurrent jobs never read a partial file
+    path = cache_path(agent_type, voice, text)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with wave.open(tmp_path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Rendered {agent_type} greeting ({len(pcm) / 2 / SAMPLE_RATE:.1f}s) to {path}")
+    return pcm
+
+
+async def greeting_frames(pcm: bytes) -> AsyncIterator[rtc.AudioFrame]:
+    """Split greeting PCM into audio frames for AgentSession.say."""
+    samples_per_frame = SAMPLE_RATE * FRAME_MS // 1000
+    frame_bytes = samples_per_frame * 2
+    for offset in range(0, len(pcm), frame_bytes):
+        chunk = pcm[offset:offset + frame_bytes]
+        yield rtc.AudioFrame(
+            data=chunk,
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            samples_per_channel=len(chunk) // 2,
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="Render greetings that are already cached")
+    args = parser.parse_args()
+
+    for agent_type in list_agent_types():
+        config = get_agent_config(agent_type)
+        voice, text = config["voice"], config["greeting"]
+        if not args.force and load_greeting(agent_type, voice, text) is not None:
+            print(f"✅ {agent_type} ({voice}): cached")
+            continue
+        try:
+            pcm = await render_greeting(agent_type, voice, text)
+            print(f"✅ {agent_type} ({voice}): rendered {len(pcm) / 2 / SAMPLE_RATE:.1f}s")
+        except Exception as e:
+            print(f"❌ {agent_type} ({voice}): {e}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv("../.env")
+    load_dotenv(".env")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
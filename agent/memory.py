@@ -0,0 +1,246 @@
+"""
+Per-job memory accounting for the agent worker.
+
+The worker's process supervisor (LiveKit) logs a warning when a job
+process's RSS passes AGENT_JOB_MEMORY_WARN_MB and kills it past
+AGENT_JOB_MEMORY_LIMIT_MB. A kill skips the job's shutdown callbacks
+(transcripts, metrics, resume cache), so JobMemory also watches the RSS
+from inside the job and shuts the job down cleanly at
+GRACEFUL_LIMIT_FRACTION of the limit, letting the process be replaced
+before it OOMs the node.
+
+With AGENT_TRACEMALLOC_FRAMES set, tracemalloc traces allocations from
+prewarm on. The job diffs a snapshot from its start against one from its
+end (and at the warning / limit) and appends the top growth sites to a
+size-rotated JSON-lines report (AGENT_MEMORY_REPORT_PATH), shared by the
+node's job processes. Tracing slows allocations down, so it is meant to
+be switched on while hunting a leak, not left on.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger("mirage-agent")
+
+# Job process RSS that logs a warning (LiveKit's default is 500)
+JOB_MEMORY_WARN_MB = float(os.getenv("AGENT_JOB_MEMORY_WARN_MB", "500"))
+
+# Job process RSS at which the worker kills the process (0: no limit)
+JOB_MEMORY_LIMIT_MB = float(os.getenv("AGENT_JOB_MEMORY_LIMIT_MB", "0"))
+
+# Share of the limit at which the job shuts itself down, ahead of the kill
+GRACEFUL_LIMIT_FRACTION = 0.9
+
+# Seconds between RSS checks (the supervisor checks every 5s)
+MEMORY_CHECK_SECONDS = 5.0
+
+# Frames kept per traced allocation (0: tracemalloc off)
+TRACEMALLOC_FRAMES = int(os.getenv("AGENT_TRACEMALLOC_FRAMES", "0"))
+
+REPORT_PATH = os.path.expanduser(os.getenv("AGENT_MEMORY_REPORT_PATH", "~/.cache/mirage/memory/jobs.jsonl"))
+
+# The report rotates at this size, keeping REPORT_BACKUPS older files
+REPORT_MAX_BYTES = 1024 * 1024
+REPORT_BACKUPS = 5
+
+# Growth sites written per report entry
+TOP_SITES = 15
+
+# Allocations of the tracing machinery itself
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def start_tracing() -> bool:
+    """
+    Start tracemalloc if AGENT_TRACEMALLOC_FRAMES is set (in prewarm).
+
+    Returns:
+        Whether allocations are being traced
+    """
+    if TRACEMALLOC_FRAMES > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        logger.info(f"Tracing allocations ({TRACEMALLOC_FRAMES} frames), report: {REPORT_PATH}")
+    return tracemalloc.is_tracing()
+
+
+def rss_mb() -> float:
+    """Resident memory of this process in MB."""
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    """Snapshot of the traced allocations, without tracemalloc's own."""
+    return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+
+def growth_sites(start: tracemalloc.Snapshot, end: tracemalloc.Snapshot, limit: int = TOP_SITES) -> List[Dict[str, Any]]:
+    """Source lines whose live allocations grew the most between two snapshots."""
+    sites = []
+    for stat in end.compare_to(start, "lineno"):
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        sites.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count_diff,
+        })
+        if len(sites) == limit:
+            break
+    return sites
+
+
+def append_report(entry: Dict[str, Any], path: str = REPORT_PATH):
+    """
+    Append an entry to the JSON-lines report, rotating it by size.
+
+    Job processes share the report, so the file is locked while it is
+    rotated and written. Blocks on the lock: call it off the event loop.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        while True:
+            with open(path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                stat = os.fstat(f.fileno())
+                # Another process may have rotated the file while this one
+                # waited: this handle is now a backup, write to the new file
+                if not os.path.exists(path) or os.stat(path).st_ino != stat.st_ino:
+                    continue
+                if stat.st_size >= REPORT_MAX_BYTES:
+                    for i in range(REPORT_BACKUPS - 1, 0, -1):
+                        if os.path.exists(f"{path}.{i}"):
+                            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+                    os.replace(path, f"{path}.1")
+                    with open(path, "a") as rotated:
+                        rotated.write(json.dumps(entry) + "\n")
+                    return
+                f.write(json.dumps(entry) + "\n")
+                return
+    except OSError as e:
+        logger.warning(f"Could not write memory report {path}: {e}")
+
+
+class JobMemory:
+    """
+    Memory of one job: RSS limits while it runs, allocation growth when it ends.
+
+    Example:
+        memory = JobMemory(room_name, session_id, on_limit=ctx.shutdown)
+        memory.start()                         # at job start
+        ...
+        await memory.close()                   # shutdown callback
+    """
+
+    def __init__(
+        self,
+        room: str,
+        session_id: Optional[str],
+        on_limit: Callable[[str], None],
+        warn_mb: float = JOB_MEMORY_WARN_MB,
+        limit_mb: float = JOB_MEMORY_LIMIT_MB,
+    ):
+        """
+        Args:
+            room: Room of the job (report label)
+            session_id: Session of the job (report label)
+            on_limit: Called with a reason to shut the job down
+            warn_mb: RSS that writes a report entry (0: off)
+            limit_mb: RSS of the worker's kill limit (0: none)
+        """
+        self.room = room
+        self.session_id = session_id
+        self.on_limit = on_limit
+        self.warn_mb = warn_mb
+        self.limit_mb = limit_mb
+        self._started = time.monotonic()
+        self._rss_start = 0.0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._warned = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Record the starting point and watch the RSS."""
+        self._started = time.monotonic()
+        self._rss_start = rss_mb()
+        if tracemalloc.is_tracing():
+            self._snapshot = take_snapshot()
+        if self.warn_mb > 0 or self.limit_mb > 0:
+            self._task = asyncio.create_task(self._watch(), name="job-memory-watch")
+
+    async def _watch(self):
+        """Report at the warning, shut down ahead of the kill limit."""
+        while True:
+            await asyncio.sleep(MEMORY_CHECK_SECONDS)
+            rss = rss_mb()
+            if self.limit_mb > 0 and rss >= self.limit_mb * GRACEFUL_LIMIT_FRACTION:
+                logger.error(f"Job RSS {rss:.0f}MB is near the {self.limit_mb:.0f}MB limit, ending the job")
+                await self.report("limit", rss)
+                self.on_limit("memory limit")
+                return
+            if self.warn_mb > 0 and rss >= self.warn_mb and not self._warned:
+                self._warned = True
+                logger.warning(f"Job RSS {rss:.0f}MB is over {self.warn_mb:.0f}MB")
+                await self.report("warn", rss)
+
+    def _growth(self) -> Dict[str, Any]:
+        """Traced memory and top growth sites since the job started."""
+        start = time.perf_counter()
+        end = take_snapshot()
+        return {
+            "traced_mb_start": round(sum(s.size for s in self._snapshot.statistics("filename")) / 1e6, 1),
+            "traced_mb": round(sum(s.size for s in end.statistics("filename")) / 1e6, 1),
+            "top": growth_sites(self._snapshot, end),
+            "snapshot_ms": round((time.perf_counter() - start) * 1000),
+        }
+
+    async def report(self, event: str, rss: Optional[float] = None):
+        """
+        Append the job's memory growth so far to the report.
+
+        The snapshot diff takes a while on a large heap and the report is
+        written under a lock shared with other jobs, so both run in a
+        thread rather than on the job's event loop.
+        """
+        rss = rss_mb() if rss is None else rss
+        entry: Dict[str, Any] = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "event": event,
+            "pid": os.getpid(),
+            "room": self.room,
+            "session_id": self.session_id,
+            "duration_s": round(time.monotonic() - self._started),
+            "rss_mb_start": round(self._rss_start),
+            "rss_mb": round(rss),
+        }
+        if self._snapshot is not None and tracemalloc.is_tracing():
+            entry.update(await asyncio.to_thread(self._growth))
+        await asyncio.to_thread(append_report, entry)
+        logger.info(
+            f"Job memory {event}: RSS {entry['rss_mb_start']} -> {entry['rss_mb']}MB"
+            + (f", traced {entry['traced_mb_start']} -> {entry['traced_mb']}MB" if "top" in entry else "")
+        )
+
+    async def close(self):
+        """Stop watching and report the job's growth (when tracing)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._snapshot is not None:
+            await self.report("end")
+        else:
+            logger.info(f"Job memory: RSS {self._rss_start:.0f} -> {rss_mb():.0f}MB")
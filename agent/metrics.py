@@ -0,0 +1,73 @@
+"""
+Prometheus metrics for the agent worker.
+
+Served by the LiveKit worker's Prometheus endpoint when
+AGENT_PROMETHEUS_PORT is set. The worker gauges are set in the main
+process; the turn metrics are recorded in job processes and collected
+through prometheus_client's multiprocess mode (see worker.py).
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Seconds from the end of user speech; voice turns mostly land in 0.5-3s
+LATENCY_BUCKETS = (0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0, 4.0, 6.0, 10.0)
+
+WORKER_LOAD = Gauge(
+    "mirage_worker_load",
+    "Load reported to LiveKit (max of the session, CPU and memory loads)",
+    multiprocess_mode="livemax",
+)
+WORKER_ACTIVE_SESSIONS = Gauge(
+    "mirage_worker_active_sessions",
+    "Agent sessions (jobs) running on this worker",
+    multiprocess_mode="livemax",
+)
+WORKER_CPU_LOAD = Gauge(
+    "mirage_worker_cpu_load",
+    "Smoothed CPU utilisation of the node, 0-1",
+    multiprocess_mode="livemax",
+)
+WORKER_MEMORY_LOAD = Gauge(
+    "mirage_worker_memory_load",
+    "Memory utilisation of the node, 0-1",
+    multiprocess_mode="livemax",
+)
+WORKER_AVAILABLE = Gauge(
+    "mirage_worker_available",
+    "1 while the worker accepts new jobs, 0 while it is over its load threshold",
+    multiprocess_mode="livemax",
+)
+
+TURN_LLM_FIRST_TOKEN = Histogram(
+    "mirage_turn_llm_first_token_seconds",
+    "End of user speech to the first audio token from the realtime model",
+    ["agent_type"],
+    buckets=LATENCY_BUCKETS,
+)
+TURN_FIRST_AUDIO = Histogram(
+    "mirage_turn_first_audio_seconds",
+    "End of user speech to the first agent audio frame sent to the output",
+    ["agent_type"],
+    buckets=LATENCY_BUCKETS,
+)
+TURN_AVATAR_FIRST_FRAME = Histogram(
+    "mirage_turn_avatar_first_frame_seconds",
+    "End of user speech to the avatar publishing the agent's speech",
+    ["agent_type"],
+    buckets=LATENCY_BUCKETS,
+)
+TURNS = Counter(
+    "mirage_turns",
+    "Agent replies to user speech",
+    ["agent_type"],
+)
+TURN_INTERRUPTIONS = Counter(
+    "mirage_turn_interruptions",
+    "Agent replies interrupted by the user",
+    ["agent_type"],
+)
+REALTIME_TOKENS = Counter(
+    "mirage_realtime_tokens",
+    "Realtime model tokens by direction (input/output) and modality (audio/text/cached)",
+    ["agent_type", "direction", "modality"],
+)
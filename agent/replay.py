@@ -0,0 +1,593 @@
+"""
+Replay recorded user utterances through the voice pipeline offline.
+
+Runs MirageAgent in a real AgentSession, with the greeting path of the
+worker (agent.worker.greet) and TurnMetrics measuring every turn, but
+against ReplayRealtimeModel, a deterministic stand-in for Gemini Live:
+it detects the end of each utterance from the audio it is sent (after
+--end-of-turn seconds of silence, like Gemini's server-side turn
+detection), waits --ttft seconds, then streams a --reply-seconds reply.
+Audio comes from WAV files (16-bit mono, any rate) or synthetic speech,
+paced in real time, and the agent's audio goes to a sink that plays it
+out in real time. No Gemini, Simli or LiveKit server is needed, so the
+replay runs on any Linux box, e.g. in CI.
+
+The model's delays are fixed, so what varies between runs is the
+pipeline's own cost: per turn, overhead_ms is first_audio_ms minus
+end-of-turn and ttft. The JSON report holds the settings, the turn
+summary the worker stores on the session row and the overhead
+percentiles.
+
+Usage:
+    python -m agent.replay                                 # 5 synthetic utterances
+    python -m agent.replay --wav recordings/*.wav --report replay.json
+    python -m agent.replay --turns 20 --agent-type coach --ttft 0.3
+    python -m agent.replay --barge-in 1.0                  # Interrupt every reply after 1s
+    python -m agent.replay --max-overhead-ms 150           # Exit 1 if p95 overhead is higher (CI)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import wave
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from livekit import rtc
+from livekit.agents import AgentSession, llm, utils
+from livekit.agents.metrics import RealtimeModelMetrics
+from livekit.agents.voice.io import AudioInput, AudioOutput, AudioOutputCapabilities
+
+from agent.agents.registry import get_agent_config
+from agent.bench_context import AUDIO_TOKENS_PER_SECOND, text_tokens
+from agent.greetings import SAMPLE_RATE as GREETING_SAMPLE_RATE, load_greeting
+from agent.turn_metrics import SpeechDetector, TurnMetrics, _percentiles
+from agent.worker import MirageAgent, greet
+
+# Gemini Live returns 16-bit mono PCM at 24kHz
+OUTPUT_SAMPLE_RATE = 24000
+
+# Synthetic utterances are sent at the rate the room delivers user audio
+INPUT_SAMPLE_RATE = 16000
+
+# Length of each input frame, as delivered by the room
+FRAME_MS = 20
+
+
+def read_wav(path: str) -> Tuple[bytes, int]:
+    """
+    Read a recorded utterance.
+
+    Returns:
+        (16-bit mono PCM, sample rate)
+
+    Raises:
+        ValueError: If the file is not 16-bit mono
+    """
+    with wave.open(path, "rb") as f:
+        if f.getnchannels() != 1 or f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit mono WAV")
+        return f.readframes(f.getnframes()), f.getframerate()
+
+
+def synthetic_speech(seconds: float, sample_rate: int = INPUT_SAMPLE_RATE, seed: int = 0) -> bytes:
+    """Voiced tone with a syllable-rate envelope, at about -20 dBFS."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 120 + 60 * rng.random()
+    voice = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t)
+    envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 2.0 * t))
+    return (voice * envelope * 3000).astype(np.int16).tobytes()
+
+
+class ReplayAudioInput(AudioInput):
+    """
+    User audio in real time: the utterance being played, silence otherwise.
+
+    Frames are paced by the clock, so a slow consumer gets the backlog
+    at once, as from a room's audio stream. Frames read more than a frame
+    past their deadline are counted in late_frames.
+    """
+
+    def __init__(self):
+        super().__init__(label="Replay")
+        self._pcm = b""
+        self._offset = 0
+        self._sample_rate = INPUT_SAMPLE_RATE
+        self._played: Optional[asyncio.Future] = None
+        self._next_frame_at: Optional[float] = None
+        self.frames = 0
+        self.late_frames = 0
+
+    async def play(self, pcm: bytes, sample_rate: int):
+        """Send an utterance, returning once its last frame was read."""
+        self._pcm, self._offset, self._sample_rate = pcm, 0, sample_rate
+        self._played = asyncio.get_running_loop().create_future()
+        await self._played
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        now = time.monotonic()
+        if self._next_frame_at is None:
+            self._next_frame_at = now
+        self.frames += 1
+        if now - self._next_frame_at > FRAME_MS / 1000:
+            self.late_frames += 1
+        await asyncio.sleep(max(0.0, self._next_frame_at - now))
+        self._next_frame_at += FRAME_MS / 1000
+
+        samples = self._sample_rate * FRAME_MS // 1000
+        data = self._pcm[self._offset:self._offset + samples * 2]
+        self._offset += samples * 2
+        if data and self._offset >= len(self._pcm) and not self._played.done():
+            self._played.set_result(None)
+        return rtc.AudioFrame(
+            data=data.ljust(samples * 2, b"\0"),
+            sample_rate=self._sample_rate,
+            num_channels=1,
+            samples_per_channel=samples,
+        )
+
+    def on_attached(self):
+        pass
+
+    def on_detached(self):
+        pass
+
+
+class ReplayAudioOutput(AudioOutput):
+    """
+    Audio sink that plays each segment out in real time, like a speaker.
+
+    Frames captured after playout has already run past them (the listener
+    would hear a gap) are counted in underruns.
+    """
+
+    def __init__(self):
+        super().__init__(label="Replay", capabilities=AudioOutputCapabilities(pause=False))
+        self._started: Optional[float] = None
+        self._pushed = 0.0
+        self._finish_task: Optional[asyncio.Task] = None
+        self.frames = 0
+        self.underruns = 0
+
+    async def capture_frame(self, frame: rtc.AudioFrame):
+        await super().capture_frame(frame)
+        self.frames += 1
+        if self._started is not None and time.monotonic() - (self._started + self._pushed) > FRAME_MS / 1000:
+            self.underruns += 1
+        if self._started is None:
+            self._started = time.monotonic()
+            # Newer livekit-agents take the "speaking" state from this event
+            if hasattr(self, "on_playback_started"):
+                self.on_playback_started(created_at=time.time())
+        self._pushed += frame.duration
+
+    def flush(self):
+        super().flush()
+        if self._started is not None:
+            self._finish_task = asyncio.create_task(self._finish())
+
+    async def _finish(self):
+        await asyncio.sleep(max(0.0, self._started + self._pushed - time.monotonic()))
+        position, self._started, self._pushed = self._pushed, None, 0.0
+        self.on_playback_finished(playback_position=position, interrupted=False)
+
+    def clear_buffer(self):
+        if self._started is None:
+            return
+        if self._finish_task is not None:
+            self._finish_task.cancel()
+        position = min(self._pushed, time.monotonic() - self._started)
+        self._started, self._pushed = None, 0.0
+        self.on_playback_finished(playback_position=position, interrupted=True)
+
+
+class ReplayRealtimeModel(llm.RealtimeModel):
+    """Deterministic stand-in for Gemini Live (server-side turn detection, audio out)."""
+
+    def __init__(self, end_of_turn: float = 0.5, ttft: float = 0.4, reply_seconds: float = 3.0):
+        """
+        Args:
+            end_of_turn: Silence after user speech that ends the user's turn
+            ttft: Time from the end of the turn to the first audio of the reply
+            reply_seconds: Length of every reply
+        """
+        super().__init__(
+            capabilities=llm.RealtimeCapabilities(
+                message_truncation=False,
+                turn_detection=True,
+                user_transcription=True,
+                auto_tool_reply_generation=True,
+                audio_output=True,
+                manual_function_calls=False,
+            )
+        )
+        self.end_of_turn = end_of_turn
+        self.ttft = ttft
+        self.reply_seconds = reply_seconds
+
+    @property
+    def model(self) -> str:
+        return "replay"
+
+    @property
+    def provider(self) -> str:
+        return "mirage"
+
+    def session(self, **kwargs) -> "ReplayRealtimeSession":
+        return ReplayRealtimeSession(self)
+
+    async def aclose(self):
+        pass
+
+
+class ReplayRealtimeSession(llm.RealtimeSession):
+    """One connection to ReplayRealtimeModel; a handoff opens a new one."""
+
+    def __init__(self, realtime_model: ReplayRealtimeModel):
+        super().__init__(realtime_model)
+        self._model = realtime_model
+        self._chat_ctx = llm.ChatContext.empty()
+        self._tools = llm.ToolContext.empty()
+        self._instructions = ""
+        self._detector = SpeechDetector(
+            on_start=self._on_speech_start, on_end=self._on_speech_end, hangover=realtime_model.end_of_turn
+        )
+        self._speech_started: Optional[float] = None
+        self._context_audio_seconds = 0.0
+        self._user_turns = 0
+        self._generation: Optional[asyncio.Task] = None
+
+    @property
+    def chat_ctx(self) -> llm.ChatContext:
+        return self._chat_ctx.copy()
+
+    @property
+    def tools(self) -> llm.ToolContext:
+        return self._tools
+
+    async def update_instructions(self, instructions: str):
+        self._instructions = instructions
+
+    async def update_chat_ctx(self, chat_ctx: llm.ChatContext):
+        self._chat_ctx = chat_ctx.copy()
+
+    async def update_tools(self, tools: List[Any]):
+        self._tools = llm.ToolContext(tools)
+
+    def update_options(self, **kwargs):
+        pass
+
+    def push_audio(self, frame: rtc.AudioFrame):
+        self._detector.push(frame)
+
+    def push_video(self, frame: rtc.VideoFrame):
+        pass
+
+    def generate_reply(self, *, instructions: Any = None) -> asyncio.Future:
+        created = asyncio.get_running_loop().create_future()
+        self._start_generation(created)
+        return created
+
+    def commit_audio(self):
+        pass
+
+    def clear_audio(self):
+        pass
+
+    def interrupt(self):
+        if self._generation is not None:
+            self._generation.cancel()
+
+    def truncate(self, **kwargs):
+        pass
+
+    async def aclose(self):
+        self.interrupt()
+
+    def _on_speech_start(self, at: float):
+        # Server-side turn detection: user speech interrupts the reply
+        self._speech_started = at
+        self.interrupt()
+        self.emit("input_speech_started", llm.InputSpeechStartedEvent())
+
+    def _on_speech_end(self, at: float):
+        self._user_turns += 1
+        self._context_audio_seconds += at - self._speech_started
+        self.emit("input_speech_stopped", llm.InputSpeechStoppedEvent(user_transcription_enabled=True))
+        self.emit(
+            "input_audio_transcription_completed",
+            llm.InputTranscriptionCompleted(
+                item_id=utils.shortuuid("GI_"), transcript=f"User turn {self._user_turns}.", is_final=True
+            ),
+        )
+        self._start_generation(None)
+
+    def _start_generation(self, created: Optional[asyncio.Future]):
+        self.interrupt()
+        self._generation = asyncio.create_task(self._generate(created), name="replay-generation")
+
+    async def _generate(self, created: Optional[asyncio.Future]):
+        """Stream one reply: generation_created now, audio after ttft."""
+        response_id = utils.shortuuid("GR_")
+        message_ch = utils.aio.Chan[llm.MessageGeneration]()
+        function_ch = utils.aio.Chan[llm.FunctionCall]()
+        text_ch = utils.aio.Chan[str]()
+        audio_ch = utils.aio.Chan[rtc.AudioFrame]()
+        modalities = asyncio.get_running_loop().create_future()
+        modalities.set_result(["audio", "text"])
+        message_ch.send_nowait(
+            llm.MessageGeneration(
+                message_id=response_id, text_stream=text_ch, audio_stream=audio_ch, modalities=modalities
+            )
+        )
+        message_ch.close()
+        function_ch.close()
+
+        event = llm.GenerationCreatedEvent(
+            message_stream=message_ch,
+            function_stream=function_ch,
+            user_initiated=created is not None,
+            response_id=response_id,
+        )
+        started = time.time()
+        if created is not None and not created.done():
+            created.set_result(event)
+        self.emit("generation_created", event)
+
+        first_audio: Optional[float] = None
+        sent_seconds = 0.0
+        try:
+            await asyncio.sleep(self._model.ttft)
+            first_audio = time.time()
+            text_ch.send_nowait(f"Reply to user turn {self._user_turns}.")
+            pcm = synthetic_speech(self._model.reply_seconds, OUTPUT_SAMPLE_RATE, seed=self._user_turns)
+            samples = OUTPUT_SAMPLE_RATE * FRAME_MS // 1000
+            for offset in range(0, len(pcm), samples * 2):
+                data = pcm[offset:offset + samples * 2].ljust(samples * 2, b"\0")
+                audio_ch.send_nowait(
+                    rtc.AudioFrame(data=data, sample_rate=OUTPUT_SAMPLE_RATE, num_channels=1, samples_per_channel=samples)
+                )
+                sent_seconds += FRAME_MS / 1000
+                # Gemini streams replies faster than real time, in bursts
+                await asyncio.sleep(0)
+        finally:
+            text_ch.close()
+            audio_ch.close()
+            self._emit_metrics(response_id, started, first_audio, sent_seconds, cancelled=sent_seconds < self._model.reply_seconds)
+            self._context_audio_seconds += sent_seconds
+
+    def _emit_metrics(self, response_id: str, started: float, first_audio: Optional[float], sent_seconds: float, cancelled: bool):
+        """Usage of a generation, as Gemini reports it: the whole context is input."""
+        audio_in = int(self._context_audio_seconds * AUDIO_TOKENS_PER_SECOND)
+        text_in = text_tokens(self._instructions)
+        audio_out = int(sent_seconds * AUDIO_TOKENS_PER_SECOND)
+        duration = time.time() - started
+        self.emit(
+            "metrics_collected",
+            RealtimeModelMetrics(
+                label=self._model.label,
+                request_id=response_id,
+                timestamp=started,
+                duration=duration,
+                ttft=-1 if first_audio is None else first_audio - started,
+                cancelled=cancelled,
+                input_tokens=audio_in + text_in,
+                output_tokens=audio_out,
+                total_tokens=audio_in + text_in + audio_out,
+                tokens_per_second=audio_out / duration if duration > 0 else 0.0,
+                input_token_details=RealtimeModelMetrics.InputTokenDetails(
+                    audio_tokens=audio_in, text_tokens=text_in, image_tokens=0, cached_tokens=0, cached_tokens_details=None
+                ),
+                output_token_details=RealtimeModelMetrics.OutputTokenDetails(
+                    text_tokens=0, audio_tokens=audio_out, image_tokens=0
+                ),
+            ),
+        )
+
+
+def load_utterances(args: argparse.Namespace) -> List[Tuple[str, bytes, int]]:
+    """(name, PCM, sample rate) of every utterance to replay."""
+    if not args.wav:
+        return [
+            (f"synthetic-{i + 1}", synthetic_speech(args.utterance_seconds, seed=i), INPUT_SAMPLE_RATE)
+            for i in range(args.turns)
+        ]
+    utterances = []
+    for path in args.wav:
+        try:
+            pcm, sample_rate = read_wav(path)
+        except (OSError, ValueError, wave.Error) as e:
+            raise SystemExit(f"❌ {e}")
+        utterances.append((path, pcm, sample_rate))
+    return utterances
+
+
+class Conversation:
+    """
+    A synthetic participant talking to a MirageAgent over ReplayRealtimeModel.
+
+    Example:
+        conversation = Conversation("teacher", ReplayRealtimeModel())
+        await conversation.start()                 # Greets the participant
+        await conversation.say(pcm, 16000)         # One turn
+        await conversation.close()
+        conversation.turns.summary()
+    """
+
+    def __init__(self, agent_type: str, model: ReplayRealtimeModel):
+        """
+        Args:
+            agent_type: Registry agent type
+            model: Stand-in realtime model
+        """
+        self.agent_type = agent_type
+        self.config = get_agent_config(agent_type)
+        self.model = model
+        self.session = AgentSession(llm=model)
+        self.audio_input = ReplayAudioInput()
+        self.audio_output = ReplayAudioOutput()
+        self.turns = TurnMetrics(self.config["id"])
+        self.greeting_first_audio_ms: Optional[float] = None
+        self._speaking = asyncio.Event()
+        self._listening = asyncio.Event()
+        self._first_speaking_at: Optional[float] = None
+
+    async def start(self):
+        """Start the session with the worker's agent and greet."""
+        self.session.input.audio = self.audio_input
+        self.session.output.audio = self.audio_output
+        self.session.on("agent_state_changed", self._on_agent_state_changed)
+
+        agent = MirageAgent(self.agent_type)
+        await self.session.start(agent=agent)
+        self.turns.attach(self.session, None)
+
+        greeting = self.config.get("greeting", "Hello! How can I help you today?")
+        greeting_audio = load_greeting(self.agent_type, agent.voice, greeting)
+        if greeting_audio is None:
+            greeting_audio = synthetic_speech(len(greeting.split()) / 2.5, GREETING_SAMPLE_RATE)
+        greet_started = time.time()
+        await greet(self.session, agent, greeting, greeting_audio)
+        if self._first_speaking_at is not None:
+            self.greeting_first_audio_ms = (self._first_speaking_at - greet_started) * 1000
+
+    def _on_agent_state_changed(self, ev):
+        if ev.new_state == "speaking":
+            if self._first_speaking_at is None:
+                self._first_speaking_at = ev.created_at
+            self._speaking.set()
+        elif ev.new_state == "listening":
+            self._listening.set()
+
+    async def say(self, pcm: bytes, sample_rate: int, barge_in: Optional[float] = None, timeout: float = 10.0) -> bool:
+        """
+        Play an utterance and wait for the reply to finish, or with barge_in
+        only that long into the reply.
+
+        Returns:
+            Whether the agent replied within timeout
+        """
+        self._speaking.clear()
+        self._listening.clear()
+        await self.audio_input.play(pcm, sample_rate)
+        try:
+            await asyncio.wait_for(self._speaking.wait(), timeout=timeout)
+            self._listening.clear()
+            if barge_in is not None:
+                # The next utterance starts while the agent is still talking
+                await asyncio.sleep(barge_in)
+            else:
+                await asyncio.wait_for(self._listening.wait(), timeout=timeout + self.model.reply_seconds)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def close(self, barge_in: bool = False):
+        """Let the last reply play out (if it was barged in on), then end the session."""
+        if barge_in:
+            try:
+                await asyncio.wait_for(self._listening.wait(), timeout=self.model.reply_seconds + 1)
+            except asyncio.TimeoutError:
+                pass
+        # Let the last generation's metrics arrive
+        await asyncio.sleep(self.model.end_of_turn)
+        await self.session.aclose()
+        await self.turns.close()
+
+
+async def replay(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Greet, then play each utterance and wait for the agent's reply.
+
+    Returns:
+        The JSON report
+    """
+    utterances = load_utterances(args)
+    model = ReplayRealtimeModel(end_of_turn=args.end_of_turn, ttft=args.ttft, reply_seconds=args.reply_seconds)
+    conversation = Conversation(args.agent_type, model)
+    await conversation.start()
+
+    unanswered = 0
+    for name, pcm, sample_rate in utterances:
+        await asyncio.sleep(args.gap)
+        if not await conversation.say(pcm, sample_rate, barge_in=args.barge_in, timeout=args.turn_timeout):
+            unanswered += 1
+            print(f"❌ No reply to {name} within {args.turn_timeout}s")
+    await conversation.close(barge_in=args.barge_in is not None and not unanswered)
+
+    summary = conversation.turns.summary()
+    model_delay_ms = (args.end_of_turn + args.ttft) * 1000
+    overhead = [turn["first_audio_ms"] - model_delay_ms for turn in summary["turn_log"]]
+    for turn, turn_overhead in zip(summary["turn_log"], overhead):
+        turn["overhead_ms"] = round(turn_overhead)
+    return {
+        "settings": {
+            "agent_type": args.agent_type,
+            "utterances": [name for name, _, _ in utterances],
+            "end_of_turn_ms": args.end_of_turn * 1000,
+            "ttft_ms": args.ttft * 1000,
+            "reply_seconds": args.reply_seconds,
+            "barge_in": args.barge_in,
+        },
+        "greeting_first_audio_ms": None if conversation.greeting_first_audio_ms is None else round(conversation.greeting_first_audio_ms),
+        "unanswered": unanswered,
+        "late_input_frames": conversation.audio_input.late_frames,
+        "output_underruns": conversation.audio_output.underruns,
+        "overhead_ms": _percentiles(overhead),
+        "turn_metrics": summary,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", nargs="+", help="Utterances to replay, in order (16-bit mono WAV)")
+    parser.add_argument("--turns", type=int, default=5, help="Synthetic utterances when no --wav is given")
+    parser.add_argument("--utterance-seconds", type=float, default=2.0, help="Length of synthetic utterances")
+    parser.add_argument("--agent-type", default="teacher", help="Registry agent type")
+    parser.add_argument("--end-of-turn", type=float, default=0.5, help="Model's end-of-turn silence (s)")
+    parser.add_argument("--ttft", type=float, default=0.4, help="Model's time to first audio (s)")
+    parser.add_argument("--reply-seconds", type=float, default=3.0, help="Length of every reply (s)")
+    parser.add_argument("--gap", type=float, default=0.5, help="Pause before each utterance (s)")
+    parser.add_argument("--barge-in", type=float, help="Start the next utterance this long into each reply (s)")
+    parser.add_argument("--turn-timeout", type=float, default=10.0, help="Wait for a reply at most this long (s)")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--max-overhead-ms", type=float, help="Exit with status 1 if p95 overhead is higher")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Voice pipeline replay (agent_type={args.agent_type}, end_of_turn={args.end_of_turn}s, ttft={args.ttft}s)")
+    print("=" * 60)
+
+    report = await replay(args)
+    summary = report["turn_metrics"]
+    for i, turn in enumerate(summary["turn_log"], 1):
+        print(
+            f"turn {i:<3} first_audio={turn['first_audio_ms']:>5} ms  llm_first_token={turn['llm_first_token_ms']} ms  "
+            f"overhead={turn['overhead_ms']:>4} ms{'  (interrupted)' if turn['interrupted'] else ''}"
+        )
+    print(f"Greeting first audio: {report['greeting_first_audio_ms']} ms")
+    print(f"First audio (ms):     {summary['latency_ms']['first_audio']}")
+    print(f"Overhead (ms):        {report['overhead_ms']}")
+    print(f"Interruptions:        {summary['interruptions']}")
+    print(f"Frame misses:         {report['late_input_frames']} late input, {report['output_underruns']} output underruns")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    failed = report["unanswered"] > 0 or summary["turns"] == 0
+    if args.max_overhead_ms is not None and report["overhead_ms"].get("p95", 0) > args.max_overhead_ms:
+        print(f"❌ p95 overhead {report['overhead_ms']['p95']} ms is over {args.max_overhead_ms:.0f} ms")
+        failed = True
+    print("❌ Replay failed" if failed else "✅ Replay passed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""
+Resume a reopened session from its stored conversation.
+
+When the backend dispatches a job for an existing session, the worker
+seeds the agent with the session's context summary and newest messages,
+so the first reply continues the conversation instead of starting over.
+Both come from MessageRepository.get_session_tail in one query, started
+as soon as the job knows its session_id and awaited just before the agent
+is created.
+
+A user who reconnects within the job's reconnect grace period rejoins
+the running job and needs no resume at all. For a reconnect shortly after
+the job ended, the job leaves its final context in a local cache file
+(AGENT_RESUME_CACHE_SECONDS, default 120s), which the next job for the
+session on this node reads instead of querying the database. The file
+holds transcript text, so it is deleted once read, and expired files are
+removed whenever a job writes its own.
+
+Resuming must not hold up job start: the fetch runs while the job waits
+for the user to join (the job is dispatched at token time), and the
+context is seeded into the running agent just before the greeting. Only
+a fetch still unfinished AGENT_RESUME_TIMEOUT_SECONDS after the user
+joined is given up on, and the session starts fresh. Jobs dispatched for
+a brand new session (new_session in the job metadata) skip the fetch
+entirely.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from livekit.agents import llm
+
+from agent.context import conversation_messages
+from agent.database import get_message_repository
+
+logger = logging.getLogger("mirage-agent")
+
+# Newest messages seeded into a resumed session
+RESUME_MESSAGES = int(os.getenv("AGENT_RESUME_MESSAGES", "20"))
+
+CACHE_DIR = os.path.expanduser(os.getenv("AGENT_RESUME_CACHE_DIR", "~/.cache/mirage/resume"))
+
+# How long a finished job's context is reused for a reconnect
+CACHE_SECONDS = float(os.getenv("AGENT_RESUME_CACHE_SECONDS", "120"))
+
+# Longest the greeting waits for the context once the user has joined
+RESUME_TIMEOUT_SECONDS = float(os.getenv("AGENT_RESUME_TIMEOUT_SECONDS", "3"))
+
+
+def cache_path(session_id: str) -> str:
+    """Path of the cached context of a session."""
+    return os.path.join(CACHE_DIR, f"{session_id}.json")
+
+
+def load_cached_context(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The context a recent job of this session left behind, or None.
+
+    The file is deleted once read (or found expired): it is only meant for
+    the next job of the session.
+    """
+    path = cache_path(session_id)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_SECONDS:
+            os.remove(path)
+            return None
+        with open(path) as f:
+            context = json.load(f)
+        os.remove(path)
+        return context
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read cached context {path}: {e}")
+        return None
+
+
+def remove_expired_contexts():
+    """Delete cached contexts (and leftover temp files) older than CACHE_SECONDS."""
+    try:
+        names = os.listdir(CACHE_DIR)
+    except FileNotFoundError:
+        return
+    cutoff = time.time() - CACHE_SECONDS
+    for name in names:
+        if not name.endswith((".json", ".tmp")):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove expired context {path}: {e}")
+
+
+def save_cached_context(session_id: str, summary: str, chat_ctx: llm.ChatContext):
+    """Cache a job's final summary and newest messages for a quick reconnect."""
+    messages = [
+        {
+            "role": message.role,
+            "content": message.text_content,
+            "created_at": datetime.fromtimestamp(message.created_at, timezone.utc).isoformat(),
+        }
+        for message in conversation_messages(chat_ctx)[-RESUME_MESSAGES:]
+    ]
+
+    # Write then rename, so a starting job never reads a partial file
+    path = cache_path(session_id)
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"summary": summary or None, "messages": messages}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not cache context of session {session_id}: {e}")
+    remove_expired_contexts()
+
+
+async def load_session_context(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a session's summary and newest messages, from the cache or database.
+
+    Never raises: without a context the job starts the conversation fresh.
+
+    Returns:
+        {"summary": str or None, "messages": [...], "source": "cache" or
+        "database"}, or None if unavailable
+    """
+    start = time.perf_counter()
+    context = load_cached_context(session_id)
+    source = "cache"
+    if context is None:
+        source = "database"
+        try:
+            repository = await get_message_repository()
+            if repository is None:
+                return None
+            context = await repository.get_session_tail(session_id, RESUME_MESSAGES)
+        except Exception as e:
+            logger.warning(f"Could not load context of session {session_id}, starting fresh: {e}")
+            return None
+
+    context["source"] = source
+    logger.info(
+        f"Loaded context of session {session_id} from {source}: {len(context['messages'])} messages, "
+        f"{'a' if context.get('summary') else 'no'} summary in {(time.perf_counter() - start) * 1000:.0f}ms"
+    )
+    return context
+
+
+def resume_chat_ctx(messages: list) -> llm.ChatContext:
+    """Chat context of stored messages (role, content, created_at)."""
+    chat_ctx = llm.ChatContext.empty()
+    for message in messages:
+        if message["role"] not in ("user", "assistant") or not message["content"]:
+            continue
+        created_at = datetime.fromisoformat(message["created_at"])
+        if created_at.tzinfo is None:
+            # SQLite stores naive UTC
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        chat_ctx.add_message(role=message["role"], content=message["content"], created_at=created_at.timestamp())
+    return chat_ctx
@@ -0,0 +1,326 @@
+"""
+Concurrency soak test: how many sessions one worker node carries.
+
+Ramps up concurrent jobs, each in its own process as the LiveKit worker
+runs them (forkserver, with the agent modules preloaded). Every job is a
+replay Conversation (see agent/replay.py): a synthetic participant
+talking to MirageAgent over the deterministic ReplayRealtimeModel, so
+the load is the worker's own (audio path, session, turn accounting)
+without Gemini, Simli or a LiveKit server.
+
+At each level the jobs report, every second:
+- process CPU and RSS
+- event-loop lag (how late a 10ms timer fires)
+- audio frame deadline misses: input frames read more than a frame late
+  and output frames captured after playout ran past them
+- per turn, overhead: first audio minus the model's fixed delays
+
+The knee is the first level where p95 overhead rises more than
+--latency-budget-ms above the single-job baseline, frame misses exceed
+--max-miss-rate, or a turn goes unanswered. The level before it is the
+capacity. It is turned into the worker's load settings (agent/capacity.py):
+AGENT_LOAD_THRESHOLD sits between the node CPU at capacity and at the
+knee, and AGENT_MAX_SESSIONS is set so that the session load reaches the
+threshold at capacity (memory permitting).
+
+Usage:
+    python -m agent.soak                                  # Ramp 1,2,4,8,12,16 jobs
+    python -m agent.soak --levels 1,4,8,16,24,32 --step-seconds 30
+    python -m agent.soak --report soak.json --write-env .env
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing as mp
+import os
+import queue
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from agent.replay import INPUT_SAMPLE_RATE, Conversation, ReplayRealtimeModel, synthetic_speech
+from agent.turn_metrics import _percentiles
+
+# Seconds between job samples
+SAMPLE_SECONDS = 1.0
+
+# Timer used to measure event-loop lag
+LAG_PROBE_SECONDS = 0.01
+
+# Load threshold when no knee was found (LiveKit's production default)
+DEFAULT_LOAD_THRESHOLD = 0.7
+
+
+def run_job(index: int, agent_type: str, model_options: Dict[str, float], messages: mp.Queue, stop: Any):
+    """Job process: converse until stop is set, reporting to messages."""
+    # agent.worker configures INFO logging when imported
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(converse(index, agent_type, model_options, messages, stop))
+
+
+async def converse(index: int, agent_type: str, model_options: Dict[str, float], messages: mp.Queue, stop: Any):
+    """Talk to the agent in turns of random length, sampling the process meanwhile."""
+    conversation = Conversation(agent_type, ReplayRealtimeModel(**model_options))
+    await conversation.start()
+
+    lags: List[float] = []
+
+    async def probe_loop():
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(LAG_PROBE_SECONDS)
+            lags.append((time.monotonic() - start - LAG_PROBE_SECONDS) * 1000)
+
+    async def sample():
+        process = psutil.Process()
+        process.cpu_percent(interval=None)
+        audio_input, audio_output = conversation.audio_input, conversation.audio_output
+        while True:
+            await asyncio.sleep(SAMPLE_SECONDS)
+            window = lags[:]
+            lags.clear()
+            messages.put(("sample", index, {
+                "cpu": process.cpu_percent(interval=None) / 100,
+                "rss_mb": process.memory_info().rss / 1e6,
+                "loop_lag_ms": window,
+                "frames": audio_input.frames + audio_output.frames,
+                "misses": audio_input.late_frames + audio_output.underruns,
+            }))
+
+    tasks = [asyncio.create_task(probe_loop()), asyncio.create_task(sample())]
+    rng = random.Random(index)
+    last_turn = None
+    try:
+        while not stop.is_set():
+            await asyncio.sleep(rng.uniform(0.5, 1.5))
+            pcm = synthetic_speech(rng.uniform(1.0, 3.0), seed=rng.randrange(1000))
+            if not await conversation.say(pcm, INPUT_SAMPLE_RATE):
+                messages.put(("unanswered", index, None))
+            turns = conversation.turns.turns
+            if turns and turns[-1] is not last_turn:
+                last_turn = turns[-1]
+                messages.put(("turn", index, {"first_audio_ms": last_turn["first_audio_ms"]}))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await conversation.close()
+
+
+def drain(messages: mp.Queue, until: float, received: List[tuple]):
+    """Collect job messages, with their arrival time, until the deadline."""
+    while True:
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            return
+        try:
+            kind, index, payload = messages.get(timeout=remaining)
+        except queue.Empty:
+            return
+        received.append((time.monotonic(), kind, index, payload))
+
+
+def level_stats(jobs: int, window: List[tuple], model_delay_ms: float, node_cpu: float, memory: float) -> Dict[str, Any]:
+    """Aggregate one level's measurement window."""
+    overhead = [payload["first_audio_ms"] - model_delay_ms for _, kind, _, payload in window if kind == "turn"]
+    samples = [(index, payload) for _, kind, index, payload in window if kind == "sample"]
+    lags = [lag for _, payload in samples for lag in payload["loop_lag_ms"]]
+
+    # Frame counters are cumulative per job: misses in the window are the
+    # difference between each job's first and last sample
+    first: Dict[int, Dict[str, Any]] = {}
+    last: Dict[int, Dict[str, Any]] = {}
+    for index, payload in samples:
+        first.setdefault(index, payload)
+        last[index] = payload
+    frames = sum(last[i]["frames"] - first[i]["frames"] for i in last)
+    misses = sum(last[i]["misses"] - first[i]["misses"] for i in last)
+
+    return {
+        "jobs": jobs,
+        "turns": len(overhead),
+        "unanswered": sum(1 for _, kind, _, _ in window if kind == "unanswered"),
+        "overhead_ms": _percentiles(overhead),
+        "loop_lag_ms": _percentiles(lags),
+        "frame_miss_rate": misses / frames if frames else 0.0,
+        "job_cpu": round(statistics.mean(payload["cpu"] for _, payload in samples), 3) if samples else None,
+        "job_rss_mb": round(statistics.median(payload["rss_mb"] for payload in last.values())) if last else None,
+        "node_cpu": round(node_cpu, 3),
+        "node_memory": round(memory, 3),
+    }
+
+
+def degradation(stats: Dict[str, Any], baseline: Optional[Dict[str, Any]], args: argparse.Namespace) -> Optional[str]:
+    """Why a level is past the knee, or None if it is not."""
+    if stats["unanswered"]:
+        return f"{stats['unanswered']} unanswered turns"
+    if not stats["turns"]:
+        return "no turns completed"
+    if stats["frame_miss_rate"] > args.max_miss_rate:
+        return f"frame miss rate {stats['frame_miss_rate']:.1%}"
+    if baseline is not None and stats["overhead_ms"]["p95"] > baseline["overhead_ms"]["p95"] + args.latency_budget_ms:
+        return f"p95 overhead {stats['overhead_ms']['p95']}ms (baseline {baseline['overhead_ms']['p95']}ms)"
+    return None
+
+
+def recommend(
+    capacity: Dict[str, Any],
+    knee: Optional[Dict[str, Any]],
+    baseline_memory: float,
+) -> Dict[str, Any]:
+    """
+    Worker load settings for the measured capacity.
+
+    Returns:
+        {"sessions", "load_threshold", "max_sessions", "memory_sessions"}
+    """
+    if knee is not None:
+        threshold = (capacity["node_cpu"] + knee["node_cpu"]) / 2
+    else:
+        threshold = DEFAULT_LOAD_THRESHOLD
+    threshold = round(min(0.95, max(0.3, threshold)), 2)
+
+    # Sessions before the node's memory load reaches the threshold
+    total_mb = psutil.virtual_memory().total / 1e6
+    memory_sessions = math.floor((threshold - baseline_memory) * total_mb / capacity["job_rss_mb"])
+    sessions = max(1, min(capacity["jobs"], memory_sessions))
+
+    return {
+        "sessions": sessions,
+        "load_threshold": threshold,
+        # sessions / max_sessions reaches the threshold at capacity
+        "max_sessions": max(1, math.floor(sessions / threshold)),
+        "memory_sessions": memory_sessions,
+    }
+
+
+def write_env(path: str, values: Dict[str, Any]):
+    """Set keys in a dotenv file, keeping its other lines."""
+    lines = []
+    if os.path.exists(path):
+        with open(path) as f:
+            lines = [line for line in f.read().splitlines() if line.split("=", 1)[0].strip() not in values]
+    lines += [f"{key}={value}" for key, value in values.items()]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,12,16", help="Comma-separated concurrent job counts")
+    parser.add_argument("--step-seconds", type=float, default=20, help="Measurement window per level")
+    parser.add_argument("--warmup-seconds", type=float, default=5, help="Settling time after adding jobs")
+    parser.add_argument("--agent-type", default="teacher", help="Registry agent type")
+    parser.add_argument("--end-of-turn", type=float, default=0.5, help="Model's end-of-turn silence (s)")
+    parser.add_argument("--ttft", type=float, default=0.4, help="Model's time to first audio (s)")
+    parser.add_argument("--reply-seconds", type=float, default=3.0, help="Length of every reply (s)")
+    parser.add_argument("--latency-budget-ms", type=float, default=100, help="Allowed p95 overhead increase")
+    parser.add_argument("--max-miss-rate", type=float, default=0.01, help="Allowed share of late audio frames")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--write-env", help="Set AGENT_MAX_SESSIONS and AGENT_LOAD_THRESHOLD in this dotenv file")
+    args = parser.parse_args()
+    levels = sorted(int(level) for level in args.levels.split(","))
+
+    model_options = {"end_of_turn": args.end_of_turn, "ttft": args.ttft, "reply_seconds": args.reply_seconds}
+    model_delay_ms = (args.end_of_turn + args.ttft) * 1000
+    baseline_memory = psutil.virtual_memory().percent / 100
+
+    print("=" * 60)
+    print(f"Worker soak test ({os.cpu_count()} CPUs, {psutil.virtual_memory().total / 1e9:.1f} GB, levels {levels})")
+    print("=" * 60)
+
+    # Job processes start the way the LiveKit worker starts them on Linux
+    context = mp.get_context("forkserver" if sys.platform.startswith("linux") else "spawn")
+    if sys.platform.startswith("linux"):
+        context.set_forkserver_preload(["agent.replay"])
+    messages = context.Queue()
+    stop = context.Event()
+    processes: List[mp.Process] = []
+    received: List[tuple] = []
+    results: List[Dict[str, Any]] = []
+    baseline = capacity = knee = None
+    reason = None
+
+    try:
+        for jobs in levels:
+            while len(processes) < jobs:
+                process = context.Process(
+                    target=run_job,
+                    args=(len(processes), args.agent_type, model_options, messages, stop),
+                    daemon=True,
+                )
+                process.start()
+                processes.append(process)
+
+            drain(messages, time.monotonic() + args.warmup_seconds, received)
+            psutil.cpu_percent(interval=None)
+            window_start = time.monotonic()
+            drain(messages, window_start + args.step_seconds, received)
+            node_cpu = psutil.cpu_percent(interval=None) / 100
+            window = [message for message in received if message[0] >= window_start]
+
+            stats = level_stats(jobs, window, model_delay_ms, node_cpu, psutil.virtual_memory().percent / 100)
+            reason = degradation(stats, baseline, args)
+            stats["degraded"] = reason
+            results.append(stats)
+            print(
+                f"jobs={jobs:<3} turns={stats['turns']:<4} overhead p50/p95={stats['overhead_ms'].get('p50')}/"
+                f"{stats['overhead_ms'].get('p95')}ms loop lag p95={stats['loop_lag_ms'].get('p95')}ms "
+                f"misses={stats['frame_miss_rate']:.2%} node cpu={stats['node_cpu']:.2f} "
+                f"job cpu={stats['job_cpu']} rss={stats['job_rss_mb']}MB"
+                f"{'  ❌ ' + reason if reason else ''}"
+            )
+            if reason:
+                knee = stats
+                break
+            baseline = baseline or stats
+            capacity = stats
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+    report: Dict[str, Any] = {"settings": vars(args), "levels": results, "knee": knee and knee["jobs"]}
+    if capacity is None:
+        print(f"❌ A single job is already degraded ({reason}), no capacity to recommend")
+    else:
+        recommended = recommend(capacity, knee, baseline_memory)
+        report["recommended"] = recommended
+        if knee is None:
+            print(f"✅ No knee up to {capacity['jobs']} jobs; capacity is at least that")
+        else:
+            print(f"✅ Capacity: {capacity['jobs']} jobs (knee at {knee['jobs']}: {knee['degraded']})")
+        if recommended["memory_sessions"] < capacity["jobs"]:
+            print(f"Memory limits the worker to {recommended['sessions']} sessions")
+        env = {
+            "AGENT_MAX_SESSIONS": recommended["max_sessions"],
+            "AGENT_LOAD_THRESHOLD": recommended["load_threshold"],
+        }
+        print("Worker settings:")
+        for key, value in env.items():
+            print(f"    {key}={value}")
+        if args.write_env:
+            write_env(args.write_env, env)
+            print(f"Written to {args.write_env}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv("../.env")
+    load_dotenv(".env")
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-job startup timeline.
+
+Records when each startup step of an agent job finished, relative to the
+job starting, and how long each startup phase took. Both are logged as
+one line once the first agent audio is produced (or the job ends before
+that).
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger("mirage-agent")
+
+
+class StartupTimeline:
+    """
+    Monotonic marks for one job's startup.
+
+    Example log line:
+        Startup timeline room=mirage_... prewarm=812ms (saved) | config=0ms
+        session=1602ms avatar=1630ms participant=2210ms first_audio=3120ms
+        | phases: session_start=1600ms avatar_handshake=1628ms ...
+    """
+
+    def __init__(self, room_name: str, prewarm_ms: Optional[float] = None):
+        """
+        Args:
+            room_name: Room the job runs in (for the log line)
+            prewarm_ms: Time the process spent in prewarm before taking the
+                job, i.e. work this job did not have to do; None if the
+                process was not prewarmed
+        """
+        self.room_name = room_name
+        self.prewarm_ms = prewarm_ms
+        self.marks: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self._start = time.monotonic()
+        self._logged = False
+
+    def mark(self, step: str) -> float:
+        """
+        Record that a step finished. Only the first mark of a step counts.
+
+        Returns:
+            Milliseconds since the job started
+        """
+        if step not in self.marks:
+            self.marks[step] = (time.monotonic() - self._start) * 1000
+        return self.marks[step]
+
+    def elapsed(self) -> float:
+        """Seconds since the job started."""
+        return time.monotonic() - self._start
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record how long the enclosed block took (also when it raises)."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.monotonic() - start) * 1000
+
+    def summary(self) -> str:
+        """Format the marks and phases in the order they were recorded."""
+        steps = " ".join(f"{step}={ms:.0f}ms" for step, ms in self.marks.items())
+        phases = " ".join(f"{name}={ms:.0f}ms" for name, ms in self.phases.items())
+        prewarm = "none" if self.prewarm_ms is None else f"{self.prewarm_ms:.0f}ms (saved)"
+        return f"room={self.room_name} prewarm={prewarm} | {steps} | phases: {phases}"
+
+    def log(self):
+        """Log the timeline once."""
+        if not self._logged:
+            self._logged = True
+            logger.info(f"Startup timeline {self.summary()}")
@@ -0,0 +1,184 @@
+"""
+Batched transcript persistence for agent jobs.
+
+Conversation items are queued from AgentSession event handlers without
+ever awaiting, so the audio path is never held up by the database. A
+background task writes them with MessageRepository.create_messages:
+- a batch is flushed once it reaches max_batch messages, or
+  flush_interval seconds after its first message arrived
+- the queue is bounded; when the database falls that far behind, new
+  messages are dropped (and counted) instead of growing memory
+- failed batches are retried with backoff, then dropped
+- close() drains whatever is queued when the job shuts down
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("mirage-agent")
+
+MAX_BATCH = int(os.getenv("AGENT_TRANSCRIPT_BATCH_SIZE", "20"))
+FLUSH_INTERVAL_SECONDS = float(os.getenv("AGENT_TRANSCRIPT_FLUSH_SECONDS", "2"))
+MAX_QUEUE = int(os.getenv("AGENT_TRANSCRIPT_MAX_QUEUE", "500"))
+
+# Attempts per batch before it is dropped, and the first retry delay
+WRITE_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 0.5
+
+
+class TranscriptWriter:
+    """
+    Queue and batch-insert the messages of one session.
+
+    Example:
+        writer = TranscriptWriter(session_id, get_message_repository)
+        writer.start()
+        writer.add("user", "Hello")       # never blocks
+        await writer.close()              # drains the queue
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        get_repository: Callable[[], Awaitable[Any]],
+        max_batch: int = MAX_BATCH,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        max_queue: int = MAX_QUEUE,
+    ):
+        """
+        Args:
+            session_id: Session the messages belong to
+            get_repository: Returns the MessageRepository (or None to disable)
+            max_batch: Messages per insert
+            flush_interval: Longest time a message waits for its batch
+            max_queue: Messages held in memory before new ones are dropped
+        """
+        self.session_id = session_id
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._get_repository = get_repository
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def start(self):
+        """Start the background writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"transcripts-{self.session_id}")
+
+    def add(
+        self,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[float] = None,
+    ):
+        """
+        Queue a message. Never blocks; drops the message if the queue is full.
+
+        Args:
+            role: "user" or "assistant"
+            content: Message text (empty messages are skipped)
+            metadata: Stored in the message's metadata column
+            created_at: When the message happened (epoch seconds, default
+                now); rows keep conversation order however they are batched
+        """
+        if self._closed or not content:
+            return
+
+        timestamp = datetime.fromtimestamp(created_at, timezone.utc) if created_at else datetime.now(timezone.utc)
+        message = {
+            "session_id": self.session_id,
+            "role": role,
+            "content": content,
+            "metadata": metadata or {},
+            "created_at": timestamp.isoformat(),
+        }
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"Transcript queue full for session {self.session_id}, {self.dropped} messages dropped")
+
+    async def close(self, timeout: float = 5.0):
+        """Stop accepting messages and write the queued ones (within timeout)."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+
+        # Wake the writer if it is waiting on an empty queue
+        if not self._queue.full():
+            self._queue.put_nowait(None)
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            logger.warning(
+                f"Transcript writer for session {self.session_id} did not drain in {timeout}s, "
+                f"{self._queue.qsize()} messages lost"
+            )
+        logger.info(f"Transcripts for session {self.session_id}: {self.written} written, {self.dropped} dropped")
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for a message, then collect until the batch is full or due."""
+        first = await self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.max_batch and not self._closed:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if message is None:
+                break
+            batch.append(message)
+
+        # Closing: take everything already queued without waiting
+        while self._closed and len(batch) < self.max_batch and not self._queue.empty():
+            message = self._queue.get_nowait()
+            if message is not None:
+                batch.append(message)
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        """Insert a batch, retrying with backoff before giving up on it."""
+        delay = RETRY_DELAY_SECONDS
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                repository = await self._get_repository()
+                if repository is None:
+                    return
+                await repository.create_messages(batch)
+                self.written += len(batch)
+                return
+            except Exception as e:
+                if attempt == WRITE_ATTEMPTS:
+                    self.dropped += len(batch)
+                    logger.error(f"Dropping {len(batch)} transcript messages for session {self.session_id}: {e}")
+                    return
+                logger.warning(f"Transcript write failed (attempt {attempt}), retrying: {e}")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _run(self):
+        """Write batches until closed and drained."""
+        while True:
+            batch = await self._next_batch()
+            if batch:
+                await self._write(batch)
+            if self._closed and self._queue.empty():
+                return
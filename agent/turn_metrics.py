@@ -0,0 +1,336 @@
+"""
+Per-turn voice latency for agent jobs.
+
+Gemini detects the end of the user's turn on its side and does not tell
+the worker when that was, so the end of user speech is taken from the
+user's audio as the worker forwards it: a SpeechDetector on the session's
+audio input marks the last frame above an energy threshold before a
+pause. For every reply to user speech, TurnMetrics records the time from
+that point to:
+- llm_first_token: the first audio token from the realtime model
+  (RealtimeModelMetrics.timestamp + ttft)
+- first_audio: the first agent audio frame sent to the output (the
+  agent_state_changed "speaking" event)
+- avatar: the avatar publishing the reply. Avatar audio and video are
+  published in sync and the avatar's video never stops (it idles between
+  replies), so the first voiced frame of the avatar's audio track stands
+  in for its first speaking video frame.
+
+Interruptions and realtime token usage are counted per job as well. The
+latencies go to per-agent-type Prometheus histograms as turns happen,
+and a summary with the per-turn log is stored on the session row (the
+sessions.metrics column) when the job ends.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from livekit import rtc
+from livekit.agents.voice.io import AudioInput
+
+from agent.metrics import (
+    REALTIME_TOKENS,
+    TURN_AVATAR_FIRST_FRAME,
+    TURN_FIRST_AUDIO,
+    TURN_INTERRUPTIONS,
+    TURN_LLM_FIRST_TOKEN,
+    TURNS,
+)
+
+logger = logging.getLogger("mirage-agent")
+
+# Frames louder than this count as speech (dBFS of the frame's RMS)
+SPEECH_THRESHOLD_DBFS = float(os.getenv("AGENT_SPEECH_THRESHOLD_DBFS", "-45"))
+
+# Silence that ends a stretch of speech. Shorter pauses are within a turn.
+SPEECH_HANGOVER_SECONDS = float(os.getenv("AGENT_SPEECH_HANGOVER_SECONDS", "0.4"))
+
+# Replies later than this after user speech are not answers to it (e.g.
+# the agent speaking up on its own) and are not counted as turns
+MAX_TURN_SECONDS = 20.0
+
+# Turns kept in the per-turn log stored on the session row; the summary's
+# latency percentiles cover the same recent window (the Prometheus
+# histograms cover every turn)
+MAX_TURN_LOG = 200
+
+# Avatar audio is only analysed, so it is decoded at a low rate
+AVATAR_AUDIO_SAMPLE_RATE = 16000
+
+
+class SpeechDetector:
+    """
+    Energy-based start/end of speech on a stream of audio frames.
+
+    Cheap enough to run on every frame of the audio path: one RMS over the
+    frame's samples. Callbacks get wall-clock times (time.time()), the
+    clock the LiveKit metrics and events use.
+    """
+
+    def __init__(
+        self,
+        on_start: Optional[Callable[[float], None]] = None,
+        on_end: Optional[Callable[[float], None]] = None,
+        threshold_dbfs: float = SPEECH_THRESHOLD_DBFS,
+        hangover: float = SPEECH_HANGOVER_SECONDS,
+    ):
+        """
+        Args:
+            on_start: Called with the time of the first voiced frame
+            on_end: Called with the time of the last voiced frame, once
+                hangover seconds of silence have followed it
+            threshold_dbfs: Frame level counted as speech
+            hangover: Silence that ends speech
+        """
+        self.on_start = on_start
+        self.on_end = on_end
+        self.hangover = hangover
+        self.speaking = False
+        self.last_voiced: Optional[float] = None
+        # RMS of 16-bit samples at the threshold
+        self._threshold = 32768 * 10 ** (threshold_dbfs / 20)
+
+    def push(self, frame: rtc.AudioFrame, now: Optional[float] = None):
+        """Process one frame received at now (default: the current time)."""
+        now = time.time() if now is None else now
+        samples = np.frombuffer(frame.data, dtype=np.int16)
+        voiced = samples.size > 0 and math.sqrt(np.mean(np.square(samples, dtype=np.float32))) >= self._threshold
+
+        if voiced:
+            if not self.speaking:
+                self.speaking = True
+                if self.on_start:
+                    self.on_start(now)
+            self.last_voiced = now
+        elif self.speaking and now - self.last_voiced >= self.hangover:
+            self.speaking = False
+            if self.on_end:
+                self.on_end(self.last_voiced)
+
+
+class SpeechProbeInput(AudioInput):
+    """Pass-through audio input that feeds every frame to a SpeechDetector."""
+
+    def __init__(self, source: AudioInput, detector: SpeechDetector):
+        super().__init__(label="SpeechProbe", source=source)
+        self.detector = detector
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        frame = await self.source.__anext__()
+        self.detector.push(frame)
+        return frame
+
+    def on_attached(self):
+        self.source.on_attached()
+
+    def on_detached(self):
+        self.source.on_detached()
+
+
+def _percentiles(values: List[float]) -> Dict[str, Any]:
+    """Count, p50, p95 and max of latencies in milliseconds."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": round(ordered[len(ordered) // 2]),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]),
+        "max": round(ordered[-1]),
+    }
+
+
+class TurnMetrics:
+    """
+    Aggregate the turns of one job.
+
+    Example:
+        turns = TurnMetrics("teacher")
+        turns.attach(session, room)       # after session.start
+        ...
+        turns.summary()                   # stored on the session row
+    """
+
+    def __init__(self, agent_type: str):
+        """
+        Args:
+            agent_type: Registry agent type (Prometheus label)
+        """
+        self.agent_type = agent_type
+        self.turns: List[Dict[str, Any]] = []
+        self.turn_count = 0
+        self.interruptions = 0
+        self.tokens: Dict[str, int] = {}
+        self._user_speech_end: Optional[float] = None
+        self._avatar_tasks: List[asyncio.Task] = []
+
+    def attach(self, session: Any, room: Optional[rtc.Room]):
+        """
+        Subscribe to the session's events and probe its audio.
+
+        Call after session.start, once the session has its room audio input.
+        Without a room (e.g. agent/replay.py) there is no avatar to probe.
+        """
+        if session.input.audio is not None:
+            session.input.audio = SpeechProbeInput(
+                session.input.audio, SpeechDetector(on_end=self.on_user_speech_end)
+            )
+        else:
+            logger.warning("Session has no audio input, turn latency will not be measured")
+
+        @session.on("agent_state_changed")
+        def on_agent_state_changed(ev):
+            if ev.new_state == "speaking":
+                self.on_agent_speaking(ev.created_at)
+
+        @session.on("metrics_collected")
+        def on_metrics_collected(ev):
+            if getattr(ev.metrics, "type", None) == "realtime_model_metrics":
+                self.on_realtime_metrics(ev.metrics)
+
+        @session.on("conversation_item_added")
+        def on_conversation_item_added(ev):
+            if getattr(ev.item, "role", None) == "assistant" and ev.item.interrupted:
+                self.on_interrupted()
+
+        if room is None:
+            return
+
+        @room.on("track_subscribed")
+        def on_track_subscribed(track, publication, participant):
+            self._watch_avatar(track, participant, room)
+
+        for participant in room.remote_participants.values():
+            for publication in participant.track_publications.values():
+                if publication.track is not None:
+                    self._watch_avatar(publication.track, participant, room)
+
+    def _watch_avatar(self, track: rtc.Track, participant: rtc.RemoteParticipant, room: rtc.Room):
+        """Probe the audio the avatar publishes for this agent."""
+        if track.kind != rtc.TrackKind.KIND_AUDIO:
+            return
+        if participant.attributes.get("lk.publish_on_behalf") != room.local_participant.identity:
+            return
+
+        async def read_avatar_audio():
+            detector = SpeechDetector(on_start=self.on_avatar_speaking)
+            stream = rtc.AudioStream(track, sample_rate=AVATAR_AUDIO_SAMPLE_RATE, num_channels=1)
+            try:
+                async for event in stream:
+                    detector.push(event.frame)
+            finally:
+                await stream.aclose()
+
+        self._avatar_tasks.append(asyncio.create_task(read_avatar_audio(), name="avatar-audio-probe"))
+
+    def on_user_speech_end(self, at: float):
+        """The user stopped speaking at `at` (a pause, maybe the end of the turn)."""
+        self._user_speech_end = at
+
+    def on_agent_speaking(self, at: float):
+        """The agent's first audio frame of a reply went to the output at `at`."""
+        user_speech_end, self._user_speech_end = self._user_speech_end, None
+        if user_speech_end is None or not 0 <= at - user_speech_end <= MAX_TURN_SECONDS:
+            return
+
+        turn = {
+            "user_speech_end": user_speech_end,
+            "speaking_at": at,
+            "llm_first_token_ms": None,
+            "first_audio_ms": (at - user_speech_end) * 1000,
+            "avatar_ms": None,
+            "interrupted": False,
+        }
+        self.turns.append(turn)
+        self.turn_count += 1
+        if len(self.turns) > MAX_TURN_LOG:
+            del self.turns[0]
+        TURNS.labels(agent_type=self.agent_type).inc()
+        TURN_FIRST_AUDIO.labels(agent_type=self.agent_type).observe(at - user_speech_end)
+
+    def on_avatar_speaking(self, at: float):
+        """The avatar started publishing speech at `at`."""
+        turn = self.turns[-1] if self.turns else None
+        if turn is None or turn["avatar_ms"] is not None or at < turn["speaking_at"]:
+            return
+        turn["avatar_ms"] = (at - turn["user_speech_end"]) * 1000
+        TURN_AVATAR_FIRST_FRAME.labels(agent_type=self.agent_type).observe(at - turn["user_speech_end"])
+
+    def on_realtime_metrics(self, metrics: Any):
+        """Count a generation's tokens and attach its first token time to its turn."""
+        usage = {
+            ("input", "audio"): metrics.input_token_details.audio_tokens,
+            ("input", "text"): metrics.input_token_details.text_tokens,
+            ("input", "cached"): metrics.input_token_details.cached_tokens,
+            ("output", "audio"): metrics.output_token_details.audio_tokens,
+            ("output", "text"): metrics.output_token_details.text_tokens,
+        }
+        for (direction, modality), count in usage.items():
+            if count:
+                key = f"{direction}_{modality}"
+                self.tokens[key] = self.tokens.get(key, 0) + count
+                REALTIME_TOKENS.labels(agent_type=self.agent_type, direction=direction, modality=modality).inc(count)
+        self.tokens["input"] = self.tokens.get("input", 0) + metrics.input_tokens
+        self.tokens["output"] = self.tokens.get("output", 0) + metrics.output_tokens
+
+        if metrics.ttft < 0:
+            return
+        first_token_at = metrics.timestamp + metrics.ttft
+        # Metrics arrive when the generation is done; find the turn whose
+        # audio this generation started
+        for turn in reversed(self.turns[-4:]):
+            if turn["llm_first_token_ms"] is None and turn["user_speech_end"] <= first_token_at <= turn["speaking_at"]:
+                turn["llm_first_token_ms"] = (first_token_at - turn["user_speech_end"]) * 1000
+                TURN_LLM_FIRST_TOKEN.labels(agent_type=self.agent_type).observe(first_token_at - turn["user_speech_end"])
+                return
+
+    def on_interrupted(self):
+        """The user interrupted the agent's reply."""
+        self.interruptions += 1
+        TURN_INTERRUPTIONS.labels(agent_type=self.agent_type).inc()
+        if self.turns:
+            self.turns[-1]["interrupted"] = True
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Latency percentiles, counts, tokens and the per-turn log (milliseconds).
+
+        "turns" counts every turn of the session; the percentiles and the
+        log cover the last "latency_window_turns" (at most MAX_TURN_LOG).
+        """
+        def column(name: str) -> List[float]:
+            return [turn[name] for turn in self.turns if turn[name] is not None]
+
+        return {
+            "agent_type": self.agent_type,
+            "turns": self.turn_count,
+            "interruptions": self.interruptions,
+            "latency_window_turns": len(self.turns),
+            "latency_ms": {
+                "llm_first_token": _percentiles(column("llm_first_token_ms")),
+                "first_audio": _percentiles(column("first_audio_ms")),
+                "avatar": _percentiles(column("avatar_ms")),
+            },
+            "tokens": dict(self.tokens),
+            "turn_log": [
+                {
+                    "llm_first_token_ms": None if turn["llm_first_token_ms"] is None else round(turn["llm_first_token_ms"]),
+                    "first_audio_ms": round(turn["first_audio_ms"]),
+                    "avatar_ms": None if turn["avatar_ms"] is None else round(turn["avatar_ms"]),
+                    "interrupted": turn["interrupted"],
+                }
+                for turn in self.turns
+            ],
+        }
+
+    async def close(self):
+        """Stop probing the avatar's audio."""
+        for task in self._avatar_tasks:
+            task.cancel()
+        await asyncio.gather(*self._avatar_tasks, return_exceptions=True)
+        self._avatar_tasks.clear()
@@ -12,28 +12,92 @@ Usage:
 """
 
 import os
+import json
+import time
+import atexit
+import shutil
+import asyncio
 import logging
+import tempfile
+from typing import Any, Dict, Optional, Set
 from dotenv import load_dotenv
 
+# Load environment from parent directory
+load_dotenv("../.env")
+load_dotenv(".env")
+
+# Turn metrics are recorded in job processes. With a Prometheus port the
+# worker collects them through prometheus_client's multiprocess mode, which
+# must be configured before prometheus_client is first imported (by
+# livekit.agents below); job processes inherit the directory.
+if os.getenv("AGENT_PROMETHEUS_PORT") and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="mirage-prometheus-")
+    atexit.register(shutil.rmtree, os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+
+from livekit import rtc
 from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
+    RoomInputOptions,
     WorkerOptions,
     cli,
+    llm,
 )
 from livekit.plugins import google, simli
 
-from agent.agents.registry import get_agent_config
-
-# Load environment from parent directory
-load_dotenv("../.env")
-load_dotenv(".env")
+from agent.agents.registry import get_agent_config, list_agent_types
+from agent.capacity import LOAD_THRESHOLD, MAX_SESSIONS, WorkerLoad
+from agent.context import DEFAULT_TOKEN_BUDGET, ContextCompactor, summary_instructions
+from agent.database import get_message_repository, get_session_repository, preload as preload_database
+from agent.greetings import greeting_frames, load_cached_greetings, load_greeting, render_greeting
+from agent.memory import JOB_MEMORY_LIMIT_MB, JOB_MEMORY_WARN_MB, TRACEMALLOC_FRAMES, JobMemory, start_tracing
+from agent.resume import RESUME_TIMEOUT_SECONDS, load_session_context, resume_chat_ctx, save_cached_context
+from agent.timeline import StartupTimeline
+from agent.transcripts import TranscriptWriter
+from agent.turn_metrics import TurnMetrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mirage-agent")
 
+# Must match LIVEKIT_AGENT_NAME in the backend, which dispatches this agent
+# explicitly when it creates a session room. Empty means automatic dispatch.
+AGENT_NAME = os.getenv("LIVEKIT_AGENT_NAME", "mirage-agent")
+
+# How long a job keeps running after the user leaves, waiting for a reconnect
+RECONNECT_GRACE_SECONDS = float(os.getenv("AGENT_RECONNECT_GRACE_SECONDS", "30"))
+
+# Prewarmed processes kept ready for new jobs (unset: LiveKit's default,
+# 0 in dev mode and 2 in production)
+NUM_IDLE_PROCESSES = os.getenv("AGENT_NUM_IDLE_PROCESSES")
+
+# Seconds a process may spend in prewarm before it is considered failed
+INITIALIZE_PROCESS_TIMEOUT = float(os.getenv("AGENT_INITIALIZE_PROCESS_TIMEOUT", "30"))
+
+# Optional noise cancellation for user audio: "bvc", "nc" or empty (off).
+# Needs livekit-plugins-noise-cancellation and LiveKit Cloud.
+NOISE_CANCELLATION = os.getenv("AGENT_NOISE_CANCELLATION", "").lower()
+
+# Seconds after the job starts that the greeting waits for the avatar.
+# Past it the agent greets audio-only and the avatar takes over the audio
+# once its handshake finishes.
+AVATAR_DEADLINE_SECONDS = float(os.getenv("AGENT_AVATAR_DEADLINE_SECONDS", "4"))
+
+# First reply of a reopened session, which continues from its stored context
+WELCOME_BACK_INSTRUCTIONS = (
+    "The user has come back to this conversation. Welcome them back in one short sentence "
+    "and pick up where you left off."
+)
+
+# Port for the worker's Prometheus metrics (unset: not served)
+PROMETHEUS_PORT = os.getenv("AGENT_PROMETHEUS_PORT")
+
+
+# Fire-and-forget tasks of this process (e.g. greeting renders)
+_background_tasks: Set[asyncio.Task] = set()
+
 
 class MirageAgent(Agent):
     """
@@ -42,82 +106,541 @@ class MirageAgent(Agent):
     Inherits from LiveKit Agent and configures based on agent type.
     """
     
-    def __init__(self, agent_type: str = "teacher"):
+    def __init__(
+        self,
+        agent_type: str = "teacher",
+        chat_ctx: Optional[llm.ChatContext] = None,
+        summary: str = "",
+    ):
+        """
+        Args:
+            agent_type: Registry agent type
+            chat_ctx: Conversation to continue from (e.g. after compaction)
+            summary: Summary of the conversation before chat_ctx
+        """
         config = get_agent_config(agent_type)
-        super().__init__(instructions=config["instructions"])
+        super().__init__(instructions=summary_instructions(config["instructions"], summary), chat_ctx=chat_ctx)
         self.agent_type = agent_type
         self.config = config
+        self.voice = config.get("voice", "Puck")
         logger.info(f"Created MirageAgent with type: {agent_type}")
 
 
+def is_end_user(participant: rtc.RemoteParticipant) -> bool:
+    """Whether a participant is a user (not an agent or an avatar publishing for one)."""
+    return (
+        participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_STANDARD
+        and "lk.publish_on_behalf" not in participant.attributes
+    )
+
+
+def is_agent(participant: rtc.Participant) -> bool:
+    """Whether a participant is an agent (not an avatar publishing for one)."""
+    return (
+        participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_AGENT
+        and "lk.publish_on_behalf" not in participant.attributes
+    )
+
+
+def earlier_agent(room: rtc.Room) -> Optional[rtc.RemoteParticipant]:
+    """
+    Another agent that joined the room before this job's, if any.
+    
+    Agents are ordered by join time, then identity, so of two jobs that
+    joined together exactly one finds the other.
+    """
+    def rank(participant: rtc.Participant):
+        joined_at = getattr(participant, "joined_at", None)
+        return (joined_at.timestamp() if joined_at else float("inf"), participant.identity)
+    
+    own = rank(room.local_participant)
+    for participant in room.remote_participants.values():
+        if is_agent(participant) and rank(participant) < own:
+            return participant
+    return None
+
+
+def load_noise_cancellation():
+    """
+    Load the configured noise cancellation filter, if any.
+    
+    Importing the plugin loads its native model, so this runs in prewarm.
+    
+    Returns:
+        Noise cancellation options for RoomInputOptions, or None
+    """
+    if not NOISE_CANCELLATION:
+        return None
+    
+    try:
+        from livekit.plugins import noise_cancellation
+    except ImportError:
+        logger.warning("AGENT_NOISE_CANCELLATION is set but livekit-plugins-noise-cancellation is not installed")
+        return None
+    
+    if NOISE_CANCELLATION == "bvc":
+        return noise_cancellation.BVC()
+    if NOISE_CANCELLATION == "nc":
+        return noise_cancellation.NC()
+    logger.warning(f"Unknown AGENT_NOISE_CANCELLATION value: {NOISE_CANCELLATION}")
+    return None
+
+
+def prewarm(proc: JobProcess):
+    """
+    Prepare a job process before a job is assigned to it.
+    
+    The plugins are imported with this module when the process starts;
+    prewarm adds the agent registry, cached greeting audio, noise
+    cancellation model and the backend's repository layer, so an assigned
+    job goes straight to connecting Gemini and the avatar (and resuming
+    its session from the database).
+    """
+    proc.userdata["agent_configs"] = {
+        agent_type: get_agent_config(agent_type) for agent_type in list_agent_types()
+    }
+    proc.userdata["greetings"] = load_cached_greetings()
+    proc.userdata["noise_cancellation"] = load_noise_cancellation()
+    preload_database()
+    # After the imports above, so job reports only show what jobs allocate
+    start_tracing()
+    
+    # CPU time since the process started: plugin imports plus the above,
+    # all of which a job on this process no longer waits for
+    proc.userdata["prewarm_ms"] = time.process_time() * 1000
+    logger.info(f"Process {proc.pid} prewarmed in {proc.userdata['prewarm_ms']:.0f}ms")
+
+
+async def start_avatar(
+    session: AgentSession,
+    room: rtc.Room,
+    timeline: StartupTimeline,
+):
+    """
+    Run the Simli avatar handshake.
+    
+    The avatar points session.output.audio at its data stream when the
+    handshake completes; that output is returned so it can be attached
+    again after session.start (RoomIO sets its own audio output on start).
+    
+    Returns:
+        The avatar's audio output
+    """
+    simli_avatar = simli.AvatarSession(
+        simli_config=simli.SimliConfig(
+            api_key=os.getenv("SIMLI_API_KEY"),
+            face_id=os.getenv("SIMLI_FACE_ID", "tmp9i8bbq7c"),
+        ),
+    )
+    with timeline.phase("avatar_handshake"):
+        await simli_avatar.start(session, room=room)
+    return session.output.audio
+
+
+async def greet(
+    session: AgentSession,
+    agent: MirageAgent,
+    greeting: str,
+    greeting_audio: Optional[bytes],
+    resumed: bool = False,
+):
+    """
+    Greet the user, from cached audio when available.
+    
+    Cached audio plays immediately; the greeting is then added to the
+    Gemini session's context so the conversation continues from it. On a
+    cache miss the realtime model generates the greeting and the audio is
+    rendered in the background for later jobs. A resumed session is
+    welcomed back by the realtime model, from its restored context.
+    """
+    if resumed:
+        await session.generate_reply(instructions=WELCOME_BACK_INSTRUCTIONS)
+        return
+    
+    if greeting_audio is not None:
+        await session.say(greeting, audio=greeting_frames(greeting_audio), add_to_chat_ctx=True)
+        # say() only updates the local context; sync it to the realtime session
+        await agent.update_chat_ctx(agent.chat_ctx)
+        return
+    
+    async def render():
+        try:
+            await render_greeting(agent.agent_type, agent.voice, greeting)
+        except Exception as e:
+            logger.warning(f"Could not render {agent.agent_type} greeting: {e}")
+    
+    # Keep a reference so the task is not garbage collected mid-render
+    render_task = asyncio.create_task(render())
+    _background_tasks.add(render_task)
+    render_task.add_done_callback(_background_tasks.discard)
+    
+    await session.generate_reply(instructions=f"Greet the user: '{greeting}'")
+
+
+def job_metadata(ctx: JobContext) -> Dict[str, Any]:
+    """
+    Session metadata for the job, from dispatch metadata or room metadata.
+    
+    Both are set by the backend when it creates the room (agent_type,
+    session_id and new_session), so they are available before the room is
+    joined.
+    """
+    for metadata in (ctx.job.metadata, ctx.job.room.metadata):
+        if not metadata:
+            continue
+        try:
+            parsed = json.loads(metadata)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, dict):
+            return parsed
+        logger.warning(f"Ignoring malformed job metadata: {metadata!r}")
+    return {}
+
+
+def persist_transcripts(ctx: JobContext, session: AgentSession, session_id: str):
+    """
+    Write the conversation to the session's messages as it happens.
+    
+    Items are queued from the event handler and inserted in batches by a
+    TranscriptWriter, which is drained when the job shuts down.
+    """
+    writer = TranscriptWriter(session_id, get_message_repository)
+    writer.start()
+    
+    @session.on("conversation_item_added")
+    def on_conversation_item_added(ev):
+        item = ev.item
+        if getattr(item, "role", None) not in ("user", "assistant"):
+            return
+        metadata = {"interrupted": True} if item.interrupted else {}
+        writer.add(item.role, item.text_content, metadata, created_at=item.created_at)
+    
+    ctx.add_shutdown_callback(writer.close)
+
+
+def manage_context(
+    ctx: JobContext,
+    session: AgentSession,
+    token_budget: int,
+    session_id: Optional[str],
+    summary: str = "",
+) -> ContextCompactor:
+    """
+    Keep the realtime model's context within the agent type's token budget.
+    
+    Over budget, the older turns are summarized in the background (see
+    agent/context.py). When the agent's next reply has been added to the
+    context, the session hands over to a new MirageAgent with the summary
+    in its instructions and only the recent turns, which starts a fresh
+    Gemini session between replies. The summary is stored on the session
+    row so a resumed session starts from it, and the final context is
+    cached locally for a quick reconnect (see agent/resume.py).
+    
+    Returns:
+        The session's compactor (seed_resumed_context sets its summary)
+    """
+    compactor = ContextCompactor(token_budget, summary=summary)
+    
+    async def save_summary(summary: str):
+        try:
+            repository = await get_session_repository()
+            if repository is not None:
+                await repository.update_session(session_id, {"context_summary": summary})
+        except Exception as e:
+            logger.warning(f"Could not save context summary for session {session_id}: {e}")
+    
+    @session.on("metrics_collected")
+    def on_metrics_collected(ev):
+        if getattr(ev.metrics, "type", None) == "realtime_model_metrics":
+            compactor.observe(ev.metrics.input_tokens, session.current_agent.chat_ctx)
+    
+    @session.on("conversation_item_added")
+    def on_conversation_item_added(ev):
+        if getattr(ev.item, "role", None) != "assistant" or not compactor.ready:
+            return
+        agent = session.current_agent
+        before = len(agent.chat_ctx.items)
+        chat_ctx = compactor.apply(agent.chat_ctx)
+        session.update_agent(MirageAgent(agent.agent_type, chat_ctx=chat_ctx, summary=compactor.summary))
+        logger.info(
+            f"Compacted context ({compactor.compactions}): {before} items -> summary + {len(chat_ctx.items)} items"
+        )
+        if session_id:
+            task = asyncio.create_task(save_summary(compactor.summary))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+    
+    async def cache_context():
+        await compactor.close()
+        if session_id:
+            save_cached_context(session_id, compactor.summary, session.current_agent.chat_ctx)
+    
+    ctx.add_shutdown_callback(cache_context)
+    return compactor
+
+
+async def seed_resumed_context(
+    agent: MirageAgent,
+    compactor: ContextCompactor,
+    resume_task: asyncio.Task,
+    session_id: str,
+) -> bool:
+    """
+    Continue a reopened session from its stored context, before the greeting.
+    
+    The fetch started with the job; by the time the user has joined it has
+    usually finished. A fetch still running after RESUME_TIMEOUT_SECONDS
+    is cancelled and the session starts fresh.
+    
+    Returns:
+        Whether any context (summary or messages) was restored
+    """
+    try:
+        resumed = await asyncio.wait_for(resume_task, timeout=RESUME_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Context of session {session_id} not loaded {RESUME_TIMEOUT_SECONDS:g}s after the user joined, "
+            "starting fresh"
+        )
+        return False
+    if not resumed:
+        return False
+    
+    summary = resumed.get("summary") or ""
+    history = resume_chat_ctx(resumed["messages"])
+    if summary:
+        compactor.summary = summary
+        await agent.update_instructions(summary_instructions(agent.config["instructions"], summary))
+    if history.items:
+        chat_ctx = agent.chat_ctx.copy()
+        chat_ctx.items[:0] = history.items
+        await agent.update_chat_ctx(chat_ctx)
+    return bool(summary or history.items)
+
+
+def record_turn_metrics(ctx: JobContext, session: AgentSession, agent_type: str, session_id: Optional[str]):
+    """
+    Measure every turn's latency, interruptions and token usage.
+    
+    Turns are exported to the worker's Prometheus histograms as they
+    happen; when the job shuts down the summary is logged and stored in
+    the session's metrics column.
+    """
+    turns = TurnMetrics(agent_type)
+    turns.attach(session, ctx.room)
+    
+    async def save_turn_metrics():
+        await turns.close()
+        summary = turns.summary()
+        latency = summary["latency_ms"]
+        logger.info(
+            f"Turn metrics room={ctx.room.name} turns={summary['turns']} "
+            f"interruptions={summary['interruptions']} "
+            f"first_audio={latency['first_audio']} llm_first_token={latency['llm_first_token']} "
+            f"avatar={latency['avatar']} tokens={summary['tokens']}"
+        )
+        if not session_id:
+            return
+        try:
+            repository = await get_session_repository()
+            if repository is not None:
+                await repository.update_session(session_id, {"metrics": summary})
+        except Exception as e:
+            logger.warning(f"Could not save turn metrics for session {session_id}: {e}")
+    
+    ctx.add_shutdown_callback(save_turn_metrics)
+
+
+def watch_job_memory(ctx: JobContext, session_id: Optional[str]):
+    """
+    Keep the job's memory in check (see agent/memory.py).
+    
+    Ends the job cleanly when its process nears AGENT_JOB_MEMORY_LIMIT_MB,
+    before the worker kills it, and with tracing on reports the job's
+    allocation growth when it ends.
+    """
+    memory = JobMemory(ctx.room.name, session_id, on_limit=lambda reason: ctx.shutdown(reason=reason))
+    memory.start()
+    ctx.add_shutdown_callback(memory.close)
+
+
+def hold_for_reconnect(ctx: JobContext):
+    """
+    Keep the job alive for a grace period after the user leaves.
+    
+    The backend gives every token for a session the same room, so a user
+    who refreshes or reconnects within RECONNECT_GRACE_SECONDS rejoins this
+    running session (same Gemini session and avatar, no new greeting).
+    Otherwise the job shuts down.
+    """
+    shutdown_task: Optional[asyncio.Task] = None
+    
+    async def shutdown_if_abandoned():
+        await asyncio.sleep(RECONNECT_GRACE_SECONDS)
+        if not any(is_end_user(p) for p in ctx.room.remote_participants.values()):
+            logger.info(f"No reconnect within {RECONNECT_GRACE_SECONDS}s, ending job")
+            ctx.shutdown(reason="user did not reconnect")
+    
+    @ctx.room.on("participant_disconnected")
+    def on_participant_disconnected(participant: rtc.RemoteParticipant):
+        nonlocal shutdown_task
+        if is_end_user(participant) and (shutdown_task is None or shutdown_task.done()):
+            logger.info(f"User {participant.identity} left, waiting for a reconnect")
+            shutdown_task = asyncio.create_task(shutdown_if_abandoned())
+    
+    @ctx.room.on("participant_connected")
+    def on_participant_connected(participant: rtc.RemoteParticipant):
+        nonlocal shutdown_task
+        if is_end_user(participant) and shutdown_task is not None and not shutdown_task.done():
+            logger.info(f"User {participant.identity} reconnected to the running session")
+            shutdown_task.cancel()
+            shutdown_task = None
+
+
 async def entrypoint(ctx: JobContext):
     """
     Main entry point for the LiveKit agent.
     
-    This function is called when a user joins a room.
+    This function is called when the backend dispatches the agent to a
+    session room, usually just before the user joins it.
     It sets up the agent session with Gemini and Simli.
     """
     logger.info(f"Agent job started for room: {ctx.room.name}")
     
-    # Get agent type from room metadata or use default
-    room_metadata = ctx.room.metadata or "{}"
-    try:
-        import json
-        metadata = json.loads(room_metadata) if room_metadata else {}
-        agent_type = metadata.get("agent_type", "teacher")
-    except:
-        agent_type = "teacher"
+    userdata = ctx.proc.userdata
+    timeline = StartupTimeline(ctx.room.name, prewarm_ms=userdata.get("prewarm_ms"))
+    
+    async def log_timeline():
+        # Jobs that end before the first audio still log how far they got
+        timeline.log()
+    
+    ctx.add_shutdown_callback(log_timeline)
+    
+    metadata = job_metadata(ctx)
+    agent_type = metadata.get("agent_type") or "teacher"
+    session_id = metadata.get("session_id")
+    
+    logger.info(f"Using agent type: {agent_type}, session: {session_id}")
+    watch_job_memory(ctx, session_id)
     
-    logger.info(f"Using agent type: {agent_type}")
+    # A reopened session continues from its stored context, fetched while
+    # the session is set up and the user joins; a new one has nothing to
+    # resume
+    resume_task = None
+    if session_id and not metadata.get("new_session"):
+        resume_task = asyncio.create_task(load_session_context(session_id))
     
-    # Get agent config
-    agent_config = get_agent_config(agent_type)
+    # Get agent config (loaded in prewarm when the process was prewarmed)
+    agent_config = userdata.get("agent_configs", {}).get(agent_type) or get_agent_config(agent_type)
+    timeline.mark("config")
     
     # Create agent session with Gemini
     # Using Google's realtime model for low-latency voice
     session = AgentSession(
         llm=google.realtime.RealtimeModel(
             model="gemini-2.0-flash-exp",  # Gemini 2.0 Flash
-            voice=agent_config.get("voice", "Puck"),
+            voice=agent_config.get("voice", "Puck"),  # Must match MirageAgent.voice
         ),
     )
     
-    # Configure Simli avatar if API key is available
-    simli_api_key = os.getenv("SIMLI_API_KEY")
-    simli_face_id = os.getenv("SIMLI_FACE_ID", "tmp9i8bbq7c")
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(ev):
+        # The greeting starting to play is the end of startup
+        if ev.new_state == "speaking" and "first_audio" not in timeline.marks:
+            timeline.mark("first_audio")
+            timeline.log()
     
-    if simli_api_key:
+    if session_id:
+        persist_transcripts(ctx, session, session_id)
+    else:
+        logger.warning("No session_id in job metadata, transcripts will not be saved")
+    
+    # The avatar handshake runs while the session connects to Gemini
+    avatar_task: Optional[asyncio.Task] = None
+    if os.getenv("SIMLI_API_KEY"):
         logger.info("Configuring Simli avatar")
-        try:
-            simli_avatar = simli.AvatarSession(
-                simli_config=simli.SimliConfig(
-                    api_key=simli_api_key,
-                    face_id=simli_face_id,
-                ),
-            )
-            # Start avatar - it will stream to the room
-            await simli_avatar.start(session, room=ctx.room)
-            logger.info("Simli avatar started successfully")
-        except Exception as e:
-            logger.warning(f"Failed to start Simli avatar: {e}")
-            logger.info("Continuing without avatar")
+        avatar_task = asyncio.create_task(start_avatar(session, ctx.room, timeline))
     else:
         logger.info("SIMLI_API_KEY not set, running without avatar")
     
-    # Create the agent instance
+    # Create the agent instance (a resumed context is seeded once the user
+    # has joined, see seed_resumed_context)
     agent = MirageAgent(agent_type)
     
-    # Start the session
-    await session.start(
-        agent=agent,
-        room=ctx.room,
-    )
+    # Start the session. It outlives a user disconnect so a reconnect to
+    # the same room picks it up again (see hold_for_reconnect).
+    with timeline.phase("session_start"):
+        await session.start(
+            agent=agent,
+            room=ctx.room,
+            room_input_options=RoomInputOptions(
+                close_on_disconnect=False,
+                noise_cancellation=userdata.get("noise_cancellation"),
+            ),
+        )
+    timeline.mark("session")
+    
+    # Concurrent token requests served by different backend processes can
+    # dispatch two agents to one room; the later one leaves
+    duplicate = earlier_agent(ctx.room)
+    if duplicate is not None:
+        logger.warning(f"Agent {duplicate.identity} is already in room {ctx.room.name}, ending this job")
+        if resume_task is not None:
+            resume_task.cancel()
+        if avatar_task is not None:
+            avatar_task.cancel()
+        ctx.shutdown(reason="duplicate agent")
+        return
+    
+    record_turn_metrics(ctx, session, agent_config["id"], session_id)
+    compactor = manage_context(ctx, session, agent_config.get("context_token_budget", DEFAULT_TOKEN_BUDGET), session_id)
+    hold_for_reconnect(ctx)
     
     logger.info("Agent session started")
     
-    # Generate initial greeting
+    def attach_avatar(task: asyncio.Task):
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.warning(f"Failed to start Simli avatar: {task.exception()}")
+            logger.info("Continuing without avatar")
+            return
+        session.output.audio = task.result()
+        logger.info(f"Simli avatar started successfully ({timeline.mark('avatar'):.0f}ms into the job)")
+    
+    # The job is dispatched when the token is issued, so Gemini and the
+    # avatar are usually ready by the time the user joins; greet them once
+    # they do
+    with timeline.phase("wait_for_participant"):
+        participant = await ctx.wait_for_participant()
+    timeline.mark("participant")
+    logger.info(f"User {participant.identity} joined")
+    
+    if avatar_task is not None:
+        with timeline.phase("avatar_wait"):
+            await asyncio.wait(
+                {avatar_task},
+                timeout=max(0.0, AVATAR_DEADLINE_SECONDS - timeline.elapsed())
+            )
+        if avatar_task.done():
+            attach_avatar(avatar_task)
+        else:
+            logger.info(f"Avatar not ready after {AVATAR_DEADLINE_SECONDS}s, greeting audio-only")
+            avatar_task.add_done_callback(attach_avatar)
+    
+    resumed = False
+    if resume_task is not None:
+        with timeline.phase("resume"):
+            resumed = await seed_resumed_context(agent, compactor, resume_task, session_id)
+    
+    # Greet from cached audio when available (loaded in prewarm, or from
+    # disk when this process was not prewarmed)
     greeting = agent_config.get("greeting", "Hello! How can I help you today?")
-    await session.generate_reply(instructions=f"Greet the user: '{greeting}'")
+    greeting_audio = userdata.get("greetings", {}).get((agent_type, agent.voice))
+    if greeting_audio is None:
+        greeting_audio = load_greeting(agent_type, agent.voice, greeting)
+    await greet(session, agent, greeting, greeting_audio, resumed=resumed)
     
     logger.info("Initial greeting sent")
 
@@ -130,14 +653,38 @@ def main():
     
     # Log configuration
     logger.info(f"LIVEKIT_URL: {os.getenv('LIVEKIT_URL', 'NOT SET')}")
+    logger.info(f"LIVEKIT_AGENT_NAME: {AGENT_NAME or '(automatic dispatch)'}")
+    logger.info(f"AGENT_NUM_IDLE_PROCESSES: {NUM_IDLE_PROCESSES or '(LiveKit default)'}")
+    logger.info(f"AGENT_MAX_SESSIONS: {MAX_SESSIONS}, AGENT_LOAD_THRESHOLD: {LOAD_THRESHOLD or '(LiveKit default)'}")
+    logger.info(
+        f"AGENT_JOB_MEMORY_WARN_MB: {JOB_MEMORY_WARN_MB:g}, "
+        f"AGENT_JOB_MEMORY_LIMIT_MB: {f'{JOB_MEMORY_LIMIT_MB:g}' if JOB_MEMORY_LIMIT_MB else '(no limit)'}, "
+        f"AGENT_TRACEMALLOC_FRAMES: {TRACEMALLOC_FRAMES or '(off)'}"
+    )
     logger.info(f"GOOGLE_API_KEY: {'✅ Set' if os.getenv('GOOGLE_API_KEY') else '❌ Not set'}")
     logger.info(f"SIMLI_API_KEY: {'✅ Set' if os.getenv('SIMLI_API_KEY') else '❌ Not set'}")
     logger.info("=" * 60)
     
+    options = {}
+    if NUM_IDLE_PROCESSES:
+        options["num_idle_processes"] = int(NUM_IDLE_PROCESSES)
+    threshold = float(LOAD_THRESHOLD) if LOAD_THRESHOLD else None
+    if threshold is not None:
+        options["load_threshold"] = threshold
+    if PROMETHEUS_PORT:
+        options["prometheus_port"] = int(PROMETHEUS_PORT)
+    
     # Run the LiveKit agent CLI
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            load_fnc=WorkerLoad(threshold=threshold),
+            initialize_process_timeout=INITIALIZE_PROCESS_TIMEOUT,
+            job_memory_warn_mb=JOB_MEMORY_WARN_MB,
+            job_memory_limit_mb=JOB_MEMORY_LIMIT_MB,
+            agent_name=AGENT_NAME,
+            **options,
         ),
     )
 
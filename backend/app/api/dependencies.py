@@ -5,11 +5,14 @@ Provides authentication and repository injection.
 
 from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status, Header
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import get_settings, Settings
-from app.core.database.connection import get_database_client
-from app.core.database.repositories import UserRepository, SessionRepository, MessageRepository
-from app.utils.supabase_auth import validate_supabase_token, SupabaseAuthError, extract_user_profile
+from app.core.database.factory import get_user_repository, get_session_repository, get_message_repository
+from app.core.database.last_login import get_last_login_buffer
+from app.core.database.repositories import UserRepository
+from app.utils.supabase_auth import validate_supabase_token_cached, SupabaseAuthError, extract_user_profile
+from app.utils.fake_auth import validate_fake_token
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -20,24 +23,6 @@ def get_settings_dependency() -> Settings:
     return get_settings()
 
 
-def get_user_repository() -> UserRepository:
-    """Get user repository instance."""
-    db_client = get_database_client()
-    return UserRepository(db_client)
-
-
-def get_session_repository() -> SessionRepository:
-    """Get session repository instance."""
-    db_client = get_database_client()
-    return SessionRepository(db_client)
-
-
-def get_message_repository() -> MessageRepository:
-    """Get message repository instance."""
-    db_client = get_database_client()
-    return MessageRepository(db_client)
-
-
 async def get_current_user(
     authorization: Optional[str] = Header(None),
     user_repo: UserRepository = Depends(get_user_repository)
@@ -47,9 +32,10 @@ async def get_current_user(
     
     This dependency:
     1. Extracts JWT token from Authorization header
-    2. Validates token with Supabase
+    2. Validates token (cached per token until it expires)
     3. Gets or creates user in database
-    4. Returns user data
+    4. Buffers a last login update (flushed in the background)
+    5. Returns user data
     
     Raises:
         HTTPException: If authentication fails
@@ -73,9 +59,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Validate token with Supabase
+    # Validate token (cached per token until it expires). A cache miss may
+    # fetch the JWKS or call Supabase Auth, so it runs off the event loop.
     try:
-        supabase_user = validate_supabase_token(token)
+        if get_settings().AUTH_VALIDATOR == "fake":
+            supabase_user = validate_fake_token(token)
+        else:
+            supabase_user = await run_in_threadpool(validate_supabase_token_cached, token)
     except SupabaseAuthError as e:
         logger.warning(f"Token validation failed: {e}")
         raise HTTPException(
@@ -94,8 +84,8 @@ async def get_current_user(
         user = await user_repo.create_user(profile)
         logger.info(f"Created new user from Supabase auth: {user['email']}")
     else:
-        # Update last login
-        await user_repo.update_last_login(user_id)
+        # Record last login (write-behind, not on the request path)
+        get_last_login_buffer().record(user_id)
     
     return user
 
@@ -7,7 +7,8 @@ from datetime import datetime
 
 from app.config import get_settings, Settings
 from app.core.database.connection import get_database_client
-from app.utils.supabase_auth import test_supabase_connection
+from app.core.database.repositories import get_user_cache
+from app.utils.supabase_auth import test_supabase_connection, get_token_cache
 
 router = APIRouter()
 
@@ -63,3 +64,15 @@ async def detailed_health(settings: Settings = Depends(get_settings)):
         "services": services,
         "timestamp": datetime.utcnow().isoformat()
     }
+
+
+@router.get("/cache")
+async def cache_stats():
+    """In-process cache counters, for sizing the caches."""
+    return {
+        "caches": {
+            "tokens": get_token_cache().stats(),
+            "users": get_user_cache().stats()
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
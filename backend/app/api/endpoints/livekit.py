@@ -2,17 +2,27 @@
 LiveKit token generation endpoints for Mirage backend.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 from datetime import datetime
-import time
+import asyncio
+import uuid
 
-from livekit.api import AccessToken, VideoGrants
+import aiohttp
+from livekit.api import AccessToken, TwirpError, VideoGrants
 
 from app.config import get_settings
 from app.api.dependencies import get_current_user, get_session_repository
+from app.core.database.models import RecordNotFoundError
 from app.core.database.repositories import SessionRepository
+from app.core.livekit_rooms import (
+    delete_session_room,
+    ensure_session_room,
+    room_has_agent,
+    room_name_for_session,
+)
+from app.utils.errors import ValidationError
 from app.utils.logging import get_logger
 
 router = APIRouter()
@@ -32,6 +42,41 @@ class RoomTokenResponse(BaseModel):
     room_name: str
     session_id: str
     url: str
+    reused_room: bool = False
+
+
+async def _lookup_room_agent(room_name: str) -> Optional[bool]:
+    """room_has_agent, degrading to None (treated as a new room) on API errors."""
+    try:
+        return await room_has_agent(room_name)
+    except Exception as e:
+        logger.warning(f"Could not inspect room {room_name}: {e}")
+        return None
+
+
+async def _rollback_new_session(
+    session_repo: SessionRepository,
+    session_id: str,
+    user_id: str,
+    room_name: str,
+    session_created: bool,
+):
+    """
+    Undo a new session whose row insert or room setup failed.
+    
+    The room is deleted whether or not its setup reported success: a timed
+    out create_room may still have created it and dispatched an agent.
+    Rollback errors are logged, the original error is what the caller sees.
+    """
+    if session_created:
+        try:
+            await session_repo.delete_session(session_id, user_id=user_id)
+        except Exception as e:
+            logger.warning(f"Could not roll back session {session_id}: {e}")
+    try:
+        await delete_session_room(room_name)
+    except Exception as e:
+        logger.warning(f"Could not roll back room {room_name}: {e}")
 
 
 @router.post("/token", response_model=RoomTokenResponse)
@@ -54,31 +99,58 @@ async def get_room_token(
     try:
         user_id = current_user["id"]
         
-        # Create or get session
         if request.session_id:
-            session = await session_repo.get_session_by_id(request.session_id)
-            if not session or session.get("user_id") != user_id:
+            # Same session, same room: a reconnect rejoins the running agent
+            session_id = request.session_id
+            room_name = room_name_for_session(session_id)
+            
+            # Owner-scoped update and room lookup run concurrently; the room
+            # is only touched once ownership is confirmed
+            try:
+                session, agent_present = await asyncio.gather(
+                    session_repo.update_livekit_room(
+                        session_id, 
+                        room_name, 
+                        user_id=user_id
+                    ),
+                    _lookup_room_agent(room_name)
+                )
+            except RecordNotFoundError:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Session not found"
                 )
-            session_id = request.session_id
+            
+            agent_type = session.get("agent_type") or request.agent_type
+            reused_room = await ensure_session_room(room_name, session_id, agent_type, agent_present)
         else:
-            # Create new session
+            # New session: insert it (with its room name) while the room is
+            # created and the agent dispatched
+            session_id = str(uuid.uuid4())
+            room_name = room_name_for_session(session_id)
+            agent_type = request.agent_type
             session_data = {
+                "id": session_id,
                 "user_id": user_id,
-                "agent_type": request.agent_type,
-                "title": "Voice Chat"
+                "agent_type": agent_type,
+                "title": "Voice Chat",
+                "livekit_room_name": room_name
             }
-            session = await session_repo.create_session(session_data)
-            session_id = session["id"]
-        
-        # Generate room name
-        timestamp = int(time.time())
-        room_name = f"mirage_{user_id[:8]}_{timestamp}"
-        
-        # Update session with room name
-        await session_repo.update_livekit_room(session_id, room_name)
+            session, reused_room = await asyncio.gather(
+                session_repo.create_session(session_data),
+                ensure_session_room(room_name, session_id, agent_type, None, new_session=True),
+                return_exceptions=True
+            )
+            errors = [result for result in (session, reused_room) if isinstance(result, BaseException)]
+            if errors:
+                await _rollback_new_session(
+                    session_repo,
+                    session_id,
+                    user_id,
+                    room_name,
+                    session_created=not isinstance(session, BaseException)
+                )
+                raise errors[0]
         
         # Generate LiveKit token
         token = AccessToken(
@@ -96,7 +168,7 @@ async def get_room_token(
         
         # Add metadata for agent
         token.with_metadata({
-            "agent_type": request.agent_type,
+            "agent_type": agent_type,
             "session_id": session_id
         })
         
@@ -108,32 +180,43 @@ async def get_room_token(
             token=jwt_token,
             room_name=room_name,
             session_id=session_id,
-            url=settings.LIVEKIT_URL
+            url=settings.LIVEKIT_URL,
+            reused_room=reused_room
         )
         
     except HTTPException:
         raise
+    except (TwirpError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+        logger.error(f"Failed to prepare LiveKit room: {e!r}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not prepare the LiveKit room, please retry"
+        )
     except Exception as e:
         logger.error(f"Failed to generate room token: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate room token: {str(e)}"
+            detail="Failed to generate room token"
         )
 
 
 @router.get("/rooms")
 async def list_active_rooms(
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(get_current_user),
     session_repo: SessionRepository = Depends(get_session_repository)
 ):
-    """List active rooms for current user."""
+    """List active rooms for current user (paginated with next_cursor)."""
     try:
-        sessions = await session_repo.get_user_sessions(
+        page = await session_repo.get_user_sessions_page(
             current_user["id"], 
-            active_only=True
+            active_only=True,
+            limit=limit,
+            after=after,
+            with_room_only=True
         )
         
-        # Filter sessions with room names
         rooms = [
             {
                 "session_id": s["id"],
@@ -141,15 +224,20 @@ async def list_active_rooms(
                 "agent_type": s.get("agent_type"),
                 "last_activity": s.get("last_activity_at")
             }
-            for s in sessions
-            if s.get("livekit_room_name")
+            for s in page["sessions"]
         ]
         
         return {
             "rooms": rooms,
-            "count": len(rooms)
+            "count": len(rooms),
+            "next_cursor": page["next_cursor"]
         }
         
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to list rooms: {e}")
         raise HTTPException(
@@ -2,7 +2,7 @@
 Session management endpoints for Mirage backend.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 
@@ -11,7 +11,9 @@ from app.api.dependencies import (
     get_session_repository, 
     get_message_repository
 )
+from app.core.database.models import RecordNotFoundError
 from app.core.database.repositories import SessionRepository, MessageRepository
+from app.utils.errors import ValidationError
 from app.utils.logging import get_logger
 
 router = APIRouter()
@@ -62,21 +64,36 @@ async def create_session(
 @router.get("/")
 async def list_sessions(
     active_only: bool = True,
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(get_current_user),
     session_repo: SessionRepository = Depends(get_session_repository)
 ):
-    """List all sessions for current user."""
+    """
+    List sessions for current user, most recent activity first.
+    
+    Returns session summaries (no metadata). Pass next_cursor from the
+    response as `after` to fetch the next page.
+    """
     try:
-        sessions = await session_repo.get_user_sessions(
+        page = await session_repo.get_user_sessions_page(
             current_user["id"], 
-            active_only=active_only
+            active_only=active_only,
+            limit=limit,
+            after=after
         )
         
         return {
-            "sessions": sessions,
-            "count": len(sessions)
+            "sessions": page["sessions"],
+            "count": len(page["sessions"]),
+            "next_cursor": page["next_cursor"]
         }
         
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to list sessions: {e}")
         raise HTTPException(
@@ -129,14 +146,6 @@ async def update_session(
 ):
     """Update a session."""
     try:
-        # Check ownership
-        session = await session_repo.get_session_by_id(session_id)
-        if not session or session.get("user_id") != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Session not found"
-            )
-        
         update_data = {}
         if request.title is not None:
             update_data["title"] = request.title
@@ -149,7 +158,12 @@ async def update_session(
                 detail="No fields to update"
             )
         
-        updated_session = await session_repo.update_session(session_id, update_data)
+        # Scoped to the owner, so the ownership check and the update are one statement
+        updated_session = await session_repo.update_session(
+            session_id, 
+            update_data, 
+            user_id=current_user["id"]
+        )
         
         return {
             "message": "Session updated successfully",
@@ -158,6 +172,11 @@ async def update_session(
         
     except HTTPException:
         raise
+    except RecordNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
     except Exception as e:
         logger.error(f"Failed to update session: {e}")
         raise HTTPException(
@@ -174,16 +193,13 @@ async def delete_session(
 ):
     """Delete a session (soft delete)."""
     try:
-        # Check ownership
-        session = await session_repo.get_session_by_id(session_id)
-        if not session or session.get("user_id") != current_user["id"]:
+        deleted = await session_repo.delete_session(session_id, user_id=current_user["id"])
+        if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
         
-        await session_repo.delete_session(session_id)
-        
         return {
             "message": "Session deleted successfully"
         }
@@ -201,35 +217,57 @@ async def delete_session(
 @router.get("/{session_id}/messages")
 async def get_session_messages(
     session_id: str,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    offset: Optional[int] = Query(None, ge=0),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    session_repo: SessionRepository = Depends(get_session_repository),
     message_repo: MessageRepository = Depends(get_message_repository)
 ):
-    """Get messages for a session."""
+    """
+    Get messages for a session, oldest first.
+    
+    Paginate with the opaque cursors from the response: pass next_cursor
+    as `after` to read forward, or prev_cursor as `before` to read back.
+    `offset` is still accepted for older clients (no cursors returned).
+    """
     try:
-        # Check ownership
-        session = await session_repo.get_session_by_id(session_id)
-        if not session or session.get("user_id") != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Session not found"
+        # Reads are scoped to the owner, so no separate ownership lookup
+        if offset is not None:
+            # Legacy offset pagination
+            messages = await message_repo.get_session_messages(
+                session_id, 
+                limit=limit, 
+                offset=offset,
+                user_id=current_user["id"]
+            )
+            page = {"messages": messages, "next_cursor": None, "prev_cursor": None}
+        else:
+            page = await message_repo.get_session_messages_page(
+                session_id,
+                limit=limit,
+                after=after,
+                before=before,
+                user_id=current_user["id"]
             )
-        
-        messages = await message_repo.get_session_messages(
-            session_id, 
-            limit=limit, 
-            offset=offset
-        )
         
         return {
-            "messages": messages,
-            "count": len(messages)
+            "messages": page["messages"],
+            "count": len(page["messages"]),
+            "next_cursor": page["next_cursor"],
+            "prev_cursor": page["prev_cursor"]
         }
         
-    except HTTPException:
-        raise
+    except RecordNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to get messages: {e}")
         raise HTTPException(
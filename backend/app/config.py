@@ -56,12 +56,60 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_KEY: str = ""
     SUPABASE_JWT_SECRET: str = ""
     
+    # Token verification: "local" verifies signatures in-process (HS256 secret
+    # or JWKS) and only calls auth.get_user when no key is available;
+    # "strict" always confirms with auth.get_user to catch revoked sessions.
+    SUPABASE_JWT_VERIFY_MODE: str = "local"
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    SUPABASE_JWKS_URL: str = ""  # Defaults to <SUPABASE_URL>/auth/v1/.well-known/jwks.json
+    SUPABASE_JWKS_CACHE_SECONDS: int = 600
+    
+    # Validated token cache (entries never outlive the token's exp). In strict
+    # mode the TTL also bounds how long a revoked token keeps working.
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_NEGATIVE_CACHE_SECONDS: int = 10
+    
+    # Read-through cache of user rows (per process; refreshed on writes)
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    
+    # Write-behind last_login_at: batched flush interval, and minimum time
+    # between recorded logins for the same user
+    LAST_LOGIN_FLUSH_INTERVAL_SECONDS: float = 30.0
+    LAST_LOGIN_MIN_INTERVAL_SECONDS: int = 300
+    
+    # ==========================================================================
+    # Database Backend
+    # ==========================================================================
+    # "supabase" (PostgREST over HTTPS), "postgres" (asyncpg pool on DATABASE_URL),
+    # "sqlite" (local file at SQLITE_PATH) or "memory" (in-process SQLite)
+    DATABASE_BACKEND: str = "supabase"
+    DATABASE_URL: str = ""
+    DATABASE_POOL_MIN_SIZE: int = 1
+    DATABASE_POOL_MAX_SIZE: int = 10
+    # Per-connection prepared statement cache; set to 0 behind pgbouncer
+    # in transaction mode (e.g. the Supabase pooler on port 6543)
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    SQLITE_PATH: str = "mirage.db"
+    
+    # "supabase" validates real tokens; "fake" accepts any bearer token as a
+    # deterministic test user (local load testing only, refused in production)
+    AUTH_VALIDATOR: str = "supabase"
+    
     # ==========================================================================
     # LiveKit Configuration
     # ==========================================================================
     LIVEKIT_URL: str = ""
     LIVEKIT_API_KEY: str = ""
     LIVEKIT_API_SECRET: str = ""
+    # Timeout for RoomService calls made while issuing a room token
+    LIVEKIT_API_TIMEOUT_SECONDS: float = 2.0
+    # Worker agent_name to dispatch explicitly at token time; must match the
+    # worker's LIVEKIT_AGENT_NAME. Empty = automatic dispatch on room creation
+    LIVEKIT_AGENT_NAME: str = "mirage-agent"
+    # How long a room created at token time waits for its first participant
+    LIVEKIT_ROOM_EMPTY_TIMEOUT_SECONDS: int = 120
     
     # ==========================================================================
     # Google Gemini Configuration
@@ -97,6 +145,20 @@ class Settings(BaseSettings):
         """Check if Supabase is configured."""
         return bool(self.SUPABASE_URL and self.SUPABASE_SERVICE_KEY)
     
+    @property
+    def supabase_jwks_url(self) -> str:
+        """JWKS endpoint used to verify asymmetrically signed tokens."""
+        if self.SUPABASE_JWKS_URL:
+            return self.SUPABASE_JWKS_URL
+        if not self.SUPABASE_URL:
+            return ""
+        return f"{self.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+    
+    @property
+    def strict_token_verification(self) -> bool:
+        """Check if every token must be confirmed with Supabase Auth."""
+        return self.SUPABASE_JWT_VERIFY_MODE.lower() == "strict"
+    
     @property
     def livekit_configured(self) -> bool:
         """Check if LiveKit is configured."""
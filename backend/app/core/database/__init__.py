@@ -2,6 +2,6 @@
 Database package initialization.
 """
 
-from app.core.database.connection import get_database_client
+from app.core.database.connection import get_database_client, get_async_database_client
 
-__all__ = ["get_database_client"]
+__all__ = ["get_database_client", "get_async_database_client"]
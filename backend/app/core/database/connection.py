@@ -1,22 +1,50 @@
 """
 Supabase database connection.
+
+Two clients are kept: the async client used by the repositories, so
+database I/O never blocks the event loop, and the sync client used for
+Supabase Auth calls and health checks.
+
+With DATABASE_BACKEND=postgres the repositories instead use an asyncpg
+connection pool that talks to Postgres directly, and with sqlite/memory a
+local SQLite database (for offline development and load testing).
 """
 
+import asyncio
+import json
+import sqlite3
 from typing import Optional
 
 try:
-    from supabase import create_client, Client
+    from supabase import create_client, acreate_client, Client, AsyncClient
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
     Client = None
+    AsyncClient = None
     create_client = None
+    acreate_client = None
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+    asyncpg = None
 
 from app.config import get_settings
 
 _db_client: Optional[Client] = None
 _initialized = False
 
+_async_db_client: Optional[AsyncClient] = None
+_async_init_lock = asyncio.Lock()
+
+_pg_pool: Optional["asyncpg.Pool"] = None
+_pg_init_lock = asyncio.Lock()
+
+_sqlite_connection: Optional[sqlite3.Connection] = None
+
 
 def get_database_client() -> Client:
     """
@@ -59,13 +87,157 @@ def get_database_client() -> Client:
     return _db_client
 
 
+async def get_async_database_client() -> AsyncClient:
+    """
+    Get async Supabase database client.
+    
+    Uses singleton pattern to reuse the underlying HTTP connection pool.
+    
+    Returns:
+        Async Supabase client instance
+    
+    Raises:
+        RuntimeError: If Supabase is not configured or not available
+    """
+    global _async_db_client
+    
+    if _async_db_client is not None:
+        return _async_db_client
+    
+    if not SUPABASE_AVAILABLE:
+        raise RuntimeError(
+            "Supabase SDK not installed. Run: pip install supabase\n"
+            "Note: Requires python3-dev package for compilation."
+        )
+    
+    async with _async_init_lock:
+        if _async_db_client is None:
+            settings = get_settings()
+            
+            if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
+                raise RuntimeError(
+                    "SUPABASE_URL and SUPABASE_SERVICE_KEY must be configured. "
+                    "Please check your .env file."
+                )
+            
+            _async_db_client = await acreate_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_KEY
+            )
+    
+    return _async_db_client
+
+
+async def _init_postgres_connection(connection):
+    """Decode JSON/JSONB columns to Python objects on every pooled connection."""
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog"
+        )
+
+
+async def get_postgres_pool() -> "asyncpg.Pool":
+    """
+    Get asyncpg connection pool for the direct Postgres backend.
+    
+    Each pooled connection keeps a prepared statement cache, so the fixed
+    repository queries are parsed and planned once per connection.
+    
+    Returns:
+        asyncpg pool instance
+    
+    Raises:
+        RuntimeError: If asyncpg is not installed or DATABASE_URL is not set
+    """
+    global _pg_pool
+    
+    if _pg_pool is not None:
+        return _pg_pool
+    
+    if not ASYNCPG_AVAILABLE:
+        raise RuntimeError("asyncpg not installed. Run: pip install asyncpg")
+    
+    async with _pg_init_lock:
+        if _pg_pool is None:
+            settings = get_settings()
+            
+            if not settings.DATABASE_URL:
+                raise RuntimeError(
+                    "DATABASE_URL must be configured for DATABASE_BACKEND=postgres. "
+                    "Please check your .env file."
+                )
+            
+            _pg_pool = await asyncpg.create_pool(
+                dsn=settings.DATABASE_URL,
+                min_size=settings.DATABASE_POOL_MIN_SIZE,
+                max_size=settings.DATABASE_POOL_MAX_SIZE,
+                statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE,
+                init=_init_postgres_connection,
+            )
+    
+    return _pg_pool
+
+
+async def close_postgres_pool():
+    """Close the asyncpg pool if it was opened."""
+    global _pg_pool
+    
+    if _pg_pool is not None:
+        await _pg_pool.close()
+        _pg_pool = None
+
+
+def get_sqlite_connection() -> sqlite3.Connection:
+    """
+    Get the shared SQLite connection for the local backends.
+    
+    DATABASE_BACKEND=memory uses a private in-memory database that lives as
+    long as the process; DATABASE_BACKEND=sqlite uses the file at
+    SQLITE_PATH. The schema is created on first use.
+    
+    Returns:
+        sqlite3 connection in autocommit mode
+    """
+    global _sqlite_connection
+    
+    if _sqlite_connection is None:
+        from app.core.database.repositories.sqlite.base import apply_schema
+        
+        settings = get_settings()
+        path = ":memory:" if settings.DATABASE_BACKEND == "memory" else settings.SQLITE_PATH
+        
+        connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+        apply_schema(connection)
+        
+        _sqlite_connection = connection
+    
+    return _sqlite_connection
+
+
 def reset_database_client():
-    """Reset database client (useful for testing)."""
-    global _db_client, _initialized
+    """Reset database clients (useful for testing)."""
+    global _db_client, _initialized, _async_db_client, _sqlite_connection
     _db_client = None
     _initialized = False
+    _async_db_client = None
+    if _sqlite_connection is not None:
+        _sqlite_connection.close()
+        _sqlite_connection = None
 
 
 def is_supabase_available() -> bool:
     """Check if supabase package is available."""
     return SUPABASE_AVAILABLE
+
+
+def is_asyncpg_available() -> bool:
+    """Check if asyncpg package is available."""
+    return ASYNCPG_AVAILABLE
@@ -0,0 +1,64 @@
+"""
+Repository factories for the configured DATABASE_BACKEND.
+
+Shared by the API dependencies and the agent worker (agent/database.py),
+so this module only imports settings, connections and repositories, not
+the FastAPI app or the auth utilities.
+"""
+
+from app.config import get_settings
+from app.core.database.connection import (
+    get_async_database_client,
+    get_postgres_pool,
+    get_sqlite_connection
+)
+from app.core.database.repositories import UserRepository, SessionRepository, MessageRepository
+from app.core.database.repositories.postgres import (
+    PostgresUserRepository,
+    PostgresSessionRepository,
+    PostgresMessageRepository
+)
+from app.core.database.repositories.sqlite import (
+    SQLiteUserRepository,
+    SQLiteSessionRepository,
+    SQLiteMessageRepository
+)
+
+
+async def get_user_repository() -> UserRepository:
+    """Get user repository instance for the configured backend."""
+    backend = get_settings().DATABASE_BACKEND
+    if backend == "postgres":
+        return PostgresUserRepository(await get_postgres_pool())
+    if backend in ("sqlite", "memory"):
+        return SQLiteUserRepository(get_sqlite_connection())
+
+    db_client = await get_async_database_client()
+    return UserRepository(db_client)
+
+
+async def get_session_repository() -> SessionRepository:
+    """Get session repository instance for the configured backend."""
+    backend = get_settings().DATABASE_BACKEND
+    if backend == "postgres":
+        return PostgresSessionRepository(await get_postgres_pool())
+    if backend in ("sqlite", "memory"):
+        return SQLiteSessionRepository(get_sqlite_connection())
+
+    db_client = await get_async_database_client()
+    return SessionRepository(db_client)
+
+
+async def get_message_repository() -> MessageRepository:
+    """Get message repository instance for the configured backend."""
+    backend = get_settings().DATABASE_BACKEND
+    if backend == "postgres":
+        return PostgresMessageRepository(await get_postgres_pool())
+    if backend in ("sqlite", "memory"):
+        return SQLiteMessageRepository(get_sqlite_connection())
+
+    db_client = await get_async_database_client()
+    return MessageRepository(db_client)
+
+
+__all__ = ["get_user_repository", "get_session_repository", "get_message_repository"]
@@ -0,0 +1,144 @@
+"""
+Write-behind buffer for users.last_login_at.
+
+Authenticated requests record a login time in memory instead of issuing
+an UPDATE. A background task flushes all pending timestamps in one
+batched statement every LAST_LOGIN_FLUSH_INTERVAL_SECONDS, and once more
+on shutdown.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import structlog
+
+from app.config import get_settings
+from app.utils.cache import TTLCache
+
+logger = structlog.get_logger(__name__)
+
+
+class LastLoginBuffer:
+    """Coalesces last login writes per user and flushes them in batches."""
+
+    def __init__(self, flush_interval_seconds: float, min_interval_seconds: float, max_users: int = 100000):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self._pending: Dict[str, datetime] = {}
+        # Users recorded within the last min_interval_seconds
+        self._recent = TTLCache(
+            max_size=max_users,
+            ttl_seconds=min_interval_seconds,
+            name="last_login",
+        )
+        self._repository_factory: Optional[Callable] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    def record(self, user_id: str) -> bool:
+        """
+        Record a login for a user without touching the database.
+
+        Returns:
+            True if the login was buffered, False if the user was already
+            recorded within the minimum write interval
+        """
+        if self._recent.get(user_id) is not None:
+            return False
+
+        self._recent.set(user_id, True)
+        self._pending[user_id] = datetime.utcnow()
+        return True
+
+    @property
+    def pending_count(self) -> int:
+        """Number of users waiting to be flushed."""
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """
+        Write all pending login times in one batch.
+
+        Failed (or cancelled) batches are merged back so the next flush
+        retries them.
+
+        Returns:
+            Number of users flushed
+        """
+        if not self._pending or self._repository_factory is None:
+            return 0
+
+        updates, self._pending = self._pending, {}
+
+        try:
+            user_repo = await self._repository_factory()
+            await user_repo.update_last_login_batch(updates)
+            return len(updates)
+
+        except asyncio.CancelledError:
+            self._merge_back(updates)
+            raise
+        except Exception as e:
+            logger.error(f"Failed to flush {len(updates)} last login updates: {e}")
+            self._merge_back(updates)
+            return 0
+
+    def _merge_back(self, updates: Dict[str, datetime]):
+        """Return unwritten login times to the pending set, keeping newer ones."""
+        for user_id, login_at in updates.items():
+            newer = self._pending.get(user_id)
+            if newer is None or newer < login_at:
+                self._pending[user_id] = login_at
+
+    async def _run(self):
+        """Flush periodically until stop() is called."""
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def start(self, repository_factory: Callable):
+        """
+        Start the periodic flush task.
+
+        Args:
+            repository_factory: Async callable returning a UserRepository
+        """
+        self._repository_factory = repository_factory
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Last login buffer started (flush every {self.flush_interval_seconds}s)")
+
+    async def stop(self):
+        """
+        Stop the flush task and write anything still pending.
+
+        The task is not cancelled: a flush in progress finishes its write
+        before the task exits, then the final flush picks up the rest.
+        """
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+        flushed = await self.flush()
+        logger.info(f"Last login buffer stopped ({flushed} users flushed)")
+
+
+# Singleton pattern
+_last_login_buffer: Optional[LastLoginBuffer] = None
+
+
+def get_last_login_buffer() -> LastLoginBuffer:
+    """Get the process-wide last login buffer (singleton)."""
+    global _last_login_buffer
+    if _last_login_buffer is None:
+        settings = get_settings()
+        _last_login_buffer = LastLoginBuffer(
+            flush_interval_seconds=settings.LAST_LOGIN_FLUSH_INTERVAL_SECONDS,
+            min_interval_seconds=settings.LAST_LOGIN_MIN_INTERVAL_SECONDS,
+        )
+    return _last_login_buffer
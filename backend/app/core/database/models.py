@@ -2,8 +2,9 @@
 Database models and utilities.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Mapping
 from datetime import datetime
+from uuid import UUID
 import json
 
 
@@ -45,6 +46,32 @@ def serialize_for_db(data: Dict[str, Any]) -> Dict[str, Any]:
     return serialized
 
 
+def deserialize_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a database driver row into the shape Supabase returns.
+    
+    UUIDs become strings and timestamps become ISO 8601 strings, so
+    endpoints see identical records whichever backend is in use.
+    
+    Args:
+        row: Row mapping from the database driver
+    
+    Returns:
+        JSON-compatible dictionary
+    """
+    result = {}
+    
+    for key, value in dict(row).items():
+        if isinstance(value, UUID):
+            result[key] = str(value)
+        elif isinstance(value, datetime):
+            result[key] = value.isoformat()
+        else:
+            result[key] = value
+    
+    return result
+
+
 def handle_supabase_response(response) -> Dict[str, Any]:
     """
     Handle Supabase response and extract data.
@@ -69,3 +96,18 @@ class TableNames:
     USERS = "users"
     SESSIONS = "sessions"
     MESSAGES = "messages"
+
+
+class TableColumns:
+    """Writable columns per table (guards dynamically built SQL)."""
+    USERS = frozenset({
+        "id", "email", "full_name", "avatar_url", "preferred_agent_type",
+        "preferences", "is_active", "created_at", "updated_at", "last_login_at",
+    })
+    SESSIONS = frozenset({
+        "id", "user_id", "agent_type", "livekit_room_name", "title", "status",
+        "created_at", "updated_at", "last_activity_at", "metrics", "context_summary",
+    })
+    MESSAGES = frozenset({
+        "id", "session_id", "role", "content", "audio_url", "metadata", "created_at",
+    })
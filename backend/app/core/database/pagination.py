@@ -0,0 +1,125 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque URL-safe tokens encoding the sort key of a boundary
+row, e.g. (created_at, id). Pages are fetched with a row comparison
+against that key instead of an OFFSET, so cost does not grow with depth
+and rows inserted meanwhile never shift a page.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.errors import ValidationError
+
+
+def encode_cursor(row: Dict[str, Any], fields: Sequence[str]) -> str:
+    """Encode the sort key of a row as an opaque cursor."""
+    payload = json.dumps([row[field] for field in fields], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, fields: Sequence[str]) -> List[Any]:
+    """
+    Decode a cursor back into its sort key values.
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValidationError(f"Invalid cursor: {e}")
+
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValidationError("Invalid cursor")
+
+    return values
+
+
+def decode_timestamp_cursor(cursor: str, timestamp_field: str) -> Tuple[str, str]:
+    """
+    Decode a (timestamp, id) cursor and validate both values.
+
+    Values end up in query filters, so anything that is not an ISO
+    timestamp and a UUID is rejected.
+
+    Returns:
+        Tuple of (ISO timestamp, UUID string)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    timestamp, row_id = decode_cursor(cursor, (timestamp_field, "id"))
+
+    try:
+        datetime.fromisoformat(str(timestamp))
+        row_id = str(uuid.UUID(str(row_id)))
+    except ValueError:
+        raise ValidationError("Invalid cursor")
+
+    return str(timestamp), row_id
+
+
+def build_page(
+    rows: List[Dict[str, Any]],
+    limit: int,
+    fields: Sequence[str],
+    backward: bool = False,
+    has_cursor: bool = False,
+) -> Dict[str, Any]:
+    """
+    Turn a keyset query result into a page with next/prev cursors.
+
+    The query must fetch limit + 1 rows so the extra row tells whether
+    another page exists. Backward queries return rows in reverse sort
+    order; they are flipped back here.
+
+    Args:
+        rows: Rows as returned by the keyset query (up to limit + 1)
+        limit: Page size
+        fields: Sort key fields encoded into cursors
+        backward: Whether rows were fetched before a cursor
+        has_cursor: Whether the query started from a cursor
+
+    Returns:
+        Dictionary with items, next_cursor and prev_cursor
+    """
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = None
+    prev_cursor = None
+
+    if backward:
+        items.reverse()
+        if items:
+            # The cursor row itself lies after this page
+            next_cursor = encode_cursor(items[-1], fields)
+            if has_more:
+                prev_cursor = encode_cursor(items[0], fields)
+    elif items:
+        if has_more:
+            next_cursor = encode_cursor(items[-1], fields)
+        if has_cursor:
+            prev_cursor = encode_cursor(items[0], fields)
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+
+
+def check_cursor_arguments(after: Optional[str], before: Optional[str]):
+    """
+    Reject requests that page in both directions at once.
+
+    Raises:
+        ValidationError: If both cursors are given
+    """
+    if after and before:
+        raise ValidationError("Use either 'after' or 'before', not both")
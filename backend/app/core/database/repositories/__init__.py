@@ -2,8 +2,8 @@
 Database repositories package.
 """
 
-from app.core.database.repositories.user_repository import UserRepository
+from app.core.database.repositories.user_repository import UserRepository, get_user_cache
 from app.core.database.repositories.session_repository import SessionRepository
 from app.core.database.repositories.message_repository import MessageRepository
 
-__all__ = ["UserRepository", "SessionRepository", "MessageRepository"]
+__all__ = ["UserRepository", "SessionRepository", "MessageRepository", "get_user_cache"]
@@ -2,12 +2,13 @@
 Message repository for managing conversation messages.
 """
 
+import uuid
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from supabase import Client
+    from supabase import AsyncClient
 import structlog
 
 from app.core.database.models import (
@@ -16,14 +17,67 @@ from app.core.database.models import (
     handle_supabase_response,
     TableNames
 )
+from app.core.database.pagination import (
+    build_page,
+    check_cursor_arguments,
+    decode_timestamp_cursor
+)
+
+# Keyset pagination order for messages
+MESSAGE_CURSOR_FIELDS = ("created_at", "id")
+
+# Message fields returned by get_session_tail
+SESSION_TAIL_FIELDS = ("id", "role", "content", "created_at")
 
 logger = structlog.get_logger(__name__)
 
 
+def stamp_in_order(messages: List[Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+    """
+    Fill in id, metadata and created_at for messages inserted together.
+    
+    Messages without a created_at get now plus one microsecond per position,
+    so a batch keeps its order under (created_at, id) ordering instead of
+    tying on one timestamp and falling back to random ids. Ids are generated
+    here rather than by the database so create_messages can return them in
+    the given order (the order of a multi-row RETURNING is not guaranteed).
+    """
+    return [
+        {
+            "metadata": {},
+            **message,
+            "id": message.get("id") or str(uuid.uuid4()),
+            "created_at": message.get("created_at") or now + timedelta(microseconds=i),
+        }
+        for i, message in enumerate(messages)
+    ]
+
+
+def session_tail(rows: List[Dict[str, Any]], session_id: str) -> Dict[str, Any]:
+    """
+    Shape the rows of a session tail query (the session joined to its
+    newest messages, oldest first).
+    
+    Raises:
+        RecordNotFoundError: If there are no rows (no such session)
+    """
+    if not rows:
+        raise RecordNotFoundError(f"Session {session_id} not found")
+    
+    return {
+        "summary": rows[0]["context_summary"],
+        "messages": [
+            {key: row[key] for key in SESSION_TAIL_FIELDS}
+            for row in rows
+            if row["id"] is not None
+        ]
+    }
+
+
 class MessageRepository:
     """Repository for message data operations."""
     
-    def __init__(self, db_client: Client):
+    def __init__(self, db_client: "AsyncClient"):
         self.db = db_client
         self.table_name = TableNames.MESSAGES
     
@@ -36,7 +90,7 @@ class MessageRepository:
                 message_data["metadata"] = {}
             
             serialized_data = serialize_for_db(message_data)
-            response = self.db.table(self.table_name).insert(serialized_data).execute()
+            response = await self.db.table(self.table_name).insert(serialized_data).execute()
             
             result = handle_supabase_response(response)
             logger.info(f"Created message with ID: {result.get('id')}")
@@ -47,33 +101,197 @@ class MessageRepository:
             logger.error(f"Failed to create message: {e}")
             raise
     
+    async def create_messages(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create several messages in one insert.
+        
+        Messages without a created_at are stamped in list order (see
+        stamp_in_order), so they read back in the order given.
+        
+        Args:
+            messages: Message rows, all with the same columns
+        
+        Returns:
+            IDs of the created messages, in the given order
+        """
+        if not messages:
+            return []
+        
+        try:
+            rows = [serialize_for_db(row) for row in stamp_in_order(messages, datetime.utcnow())]
+            await self.db.table(self.table_name).insert(rows).execute()
+            
+            logger.info(f"Created {len(rows)} messages")
+            return [row["id"] for row in rows]
+            
+        except Exception as e:
+            logger.error(f"Failed to create {len(messages)} messages: {e}")
+            raise
+    
+    def _scoped_query(self, session_id: str, user_id: Optional[str]):
+        """
+        Start a messages query, optionally scoped to the session's owner.
+        
+        With a user_id the messages are embedded under the session row,
+        filtered by id and user_id, so ownership is checked in the same
+        request. Returns the query and the table that ordering, limits and
+        filters must reference (None when reading messages directly).
+        """
+        if user_id is None:
+            query = self.db.table(self.table_name).select("*").eq("session_id", session_id)
+            return query, None
+        
+        query = (
+            self.db.table(TableNames.SESSIONS)
+            .select(f"id,{self.table_name}(*)")
+            .eq("id", session_id)
+            .eq("user_id", user_id)
+        )
+        return query, self.table_name
+    
+    def _scoped_rows(self, response, session_id: str, user_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Extract message rows from a _scoped_query response."""
+        if user_id is None:
+            return response.data or []
+        
+        if not response.data:
+            raise RecordNotFoundError(f"Session {session_id} not found")
+        
+        return response.data[0].get(self.table_name) or []
+    
     async def get_session_messages(
         self, 
         session_id: str, 
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        user_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get all messages for a session."""
+        """
+        Get all messages for a session.
+        
+        Raises:
+            RecordNotFoundError: If user_id is given and does not own the session
+        """
         try:
-            response = (
-                self.db.table(self.table_name)
-                .select("*")
-                .eq("session_id", session_id)
-                .order("created_at", desc=False)
-                .range(offset, offset + limit - 1)
+            query, scope = self._scoped_query(session_id, user_id)
+            
+            response = await (
+                query.order("created_at", desc=False, foreign_table=scope)
+                .range(offset, offset + limit - 1, foreign_table=scope)
                 .execute()
             )
             
-            return response.data or []
+            return self._scoped_rows(response, session_id, user_id)
             
         except Exception as e:
             logger.error(f"Failed to get session messages {session_id}: {e}")
             raise
     
+    async def get_session_tail(self, session_id: str, limit: int = 20) -> Dict[str, Any]:
+        """
+        Get a session's context summary and newest messages in one request.
+        
+        Used to resume a session: the messages are embedded under the
+        session row, newest first, and returned oldest first.
+        
+        Args:
+            session_id: Session to read
+            limit: Most recent messages to return
+        
+        Returns:
+            {"summary": context_summary or None, "messages": [...]}
+        
+        Raises:
+            RecordNotFoundError: If the session does not exist
+        """
+        try:
+            response = await (
+                self.db.table(TableNames.SESSIONS)
+                .select(f"context_summary,{self.table_name}({','.join(SESSION_TAIL_FIELDS)})")
+                .eq("id", session_id)
+                .order("created_at", desc=True, foreign_table=self.table_name)
+                .order("id", desc=True, foreign_table=self.table_name)
+                .limit(limit, foreign_table=self.table_name)
+                .execute()
+            )
+            
+            if not response.data:
+                raise RecordNotFoundError(f"Session {session_id} not found")
+            
+            row = response.data[0]
+            return {
+                "summary": row.get("context_summary"),
+                "messages": list(reversed(row.get(self.table_name) or []))
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get session tail {session_id}: {e}")
+            raise
+    
+    async def get_session_messages_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a page of session messages ordered by (created_at, id).
+        
+        Args:
+            session_id: Session to read
+            limit: Page size
+            after: Cursor of the last row seen, to read forward
+            before: Cursor of the first row seen, to read backward
+            user_id: If given, only read when this user owns the session
+        
+        Returns:
+            Dictionary with messages, next_cursor and prev_cursor
+        
+        Raises:
+            RecordNotFoundError: If user_id is given and does not own the session
+        """
+        try:
+            check_cursor_arguments(after, before)
+            cursor = after or before
+            backward = before is not None
+            
+            query, scope = self._scoped_query(session_id, user_id)
+            
+            if cursor:
+                created_at, message_id = decode_timestamp_cursor(cursor, "created_at")
+                op = "lt" if backward else "gt"
+                query = query.or_(
+                    f'created_at.{op}."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.{op}.{message_id})',
+                    reference_table=scope
+                )
+            
+            response = await (
+                query.order("created_at", desc=backward, foreign_table=scope)
+                .order("id", desc=backward, foreign_table=scope)
+                .limit(limit + 1, foreign_table=scope)
+                .execute()
+            )
+            
+            rows = self._scoped_rows(response, session_id, user_id)
+            page = build_page(rows, limit, MESSAGE_CURSOR_FIELDS, backward, bool(cursor))
+            
+            return {
+                "messages": page["items"],
+                "next_cursor": page["next_cursor"],
+                "prev_cursor": page["prev_cursor"]
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get session messages page {session_id}: {e}")
+            raise
+    
     async def get_message_by_id(self, message_id: str) -> Optional[Dict[str, Any]]:
         """Get message by ID."""
         try:
-            response = self.db.table(self.table_name).select("*").eq("id", message_id).execute()
+            response = await self.db.table(self.table_name).select("*").eq("id", message_id).execute()
             
             if not response.data:
                 return None
@@ -87,7 +305,7 @@ class MessageRepository:
     async def delete_session_messages(self, session_id: str) -> bool:
         """Delete all messages for a session."""
         try:
-            response = (
+            response = await (
                 self.db.table(self.table_name)
                 .delete()
                 .eq("session_id", session_id)
@@ -104,7 +322,7 @@ class MessageRepository:
     async def get_message_count(self, session_id: str) -> int:
         """Get count of messages in a session."""
         try:
-            response = (
+            response = await (
                 self.db.table(self.table_name)
                 .select("id", count="exact")
                 .eq("session_id", session_id)
@@ -0,0 +1,9 @@
+"""
+Direct Postgres (asyncpg) repository backend.
+"""
+
+from app.core.database.repositories.postgres.user_repository import PostgresUserRepository
+from app.core.database.repositories.postgres.session_repository import PostgresSessionRepository
+from app.core.database.repositories.postgres.message_repository import PostgresMessageRepository
+
+__all__ = ["PostgresUserRepository", "PostgresSessionRepository", "PostgresMessageRepository"]
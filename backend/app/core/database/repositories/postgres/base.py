@@ -0,0 +1,99 @@
+"""
+Shared helpers for the asyncpg-backed repositories.
+"""
+
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from datetime import datetime, timezone
+
+import structlog
+
+from app.core.database.models import deserialize_row
+
+logger = structlog.get_logger(__name__)
+
+# timestamptz columns; callers may pass ISO strings (e.g. from Supabase Auth)
+TIMESTAMP_COLUMNS = frozenset({"created_at", "updated_at", "last_login_at", "last_activity_at"})
+
+
+def to_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC (asyncpg would assume local time)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class PostgresRepository:
+    """Base class for repositories that query Postgres through an asyncpg pool."""
+    
+    table_name: str = ""
+    columns: frozenset = frozenset()
+    
+    def __init__(self, pool):
+        self.pool = pool
+    
+    def _writable(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keep only known columns so dynamic SQL never interpolates other keys.
+        
+        Extra keys (e.g. email_verified from extract_user_profile) have no
+        column in the schema and are dropped.
+        """
+        unknown = set(data) - self.columns
+        if unknown:
+            logger.debug(f"Ignoring unknown {self.table_name} columns: {sorted(unknown)}")
+        return {key: value for key, value in data.items() if key in self.columns}
+    
+    async def _fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        """Run a query and return the first row as a dictionary."""
+        row = await self.pool.fetchrow(query, *args)
+        return deserialize_row(row) if row is not None else None
+    
+    async def _fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        """Run a query and return all rows as dictionaries."""
+        rows = await self.pool.fetch(query, *args)
+        return [deserialize_row(row) for row in rows]
+    
+    def _insert_sql(self, data: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Build an INSERT ... RETURNING * statement for the given columns."""
+        data = self._writable(data)
+        names = list(data)
+        placeholders = ", ".join(f"${i}" for i in range(1, len(names) + 1))
+        query = (
+            f"INSERT INTO {self.table_name} ({', '.join(names)}) "
+            f"VALUES ({placeholders}) RETURNING *"
+        )
+        return query, [self._param(name, data[name]) for name in names]
+    
+    def _update_sql(
+        self,
+        data: Dict[str, Any],
+        where: Iterable[str],
+        where_args: List[Any],
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build an UPDATE ... RETURNING * statement.
+        
+        Args:
+            data: Column values to set (updated_at is always set to NOW())
+            where: Column names matched with equality, in argument order
+            where_args: Values for the where columns
+        """
+        data = self._writable({k: v for k, v in data.items() if k != "updated_at"})
+        where = list(where)
+        assignments = [f"{name} = ${i}" for i, name in enumerate(data, start=len(where) + 1)]
+        assignments.append("updated_at = NOW()")
+        conditions = " AND ".join(f"{name} = ${i}" for i, name in enumerate(where, start=1))
+        query = (
+            f"UPDATE {self.table_name} SET {', '.join(assignments)} "
+            f"WHERE {conditions} RETURNING *"
+        )
+        return query, list(where_args) + [self._param(k, v) for k, v in data.items()]
+    
+    @staticmethod
+    def _param(name: str, value: Any) -> Any:
+        """Convert a column value to what asyncpg expects."""
+        if name in TIMESTAMP_COLUMNS and value is not None:
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            return to_utc(value)
+        return value
@@ -0,0 +1,257 @@
+"""
+Message repository backed by a direct asyncpg connection pool.
+"""
+
+import uuid
+from typing import Optional, List, Dict, Any
+
+import structlog
+
+from datetime import datetime
+
+from app.core.database.models import RecordNotFoundError, TableNames, TableColumns
+from app.core.database.pagination import (
+    build_page,
+    check_cursor_arguments,
+    decode_timestamp_cursor
+)
+from app.core.database.repositories.message_repository import MESSAGE_CURSOR_FIELDS, session_tail
+from app.core.database.repositories.postgres.base import PostgresRepository, to_utc
+
+logger = structlog.get_logger(__name__)
+
+# Fixed queries (prepared once per pooled connection via the statement cache)
+SELECT_SESSION_MESSAGES = (
+    "SELECT * FROM messages WHERE session_id = $1 "
+    "ORDER BY created_at ASC LIMIT $2 OFFSET $3"
+)
+SELECT_PAGE_FIRST = (
+    "SELECT * FROM messages WHERE session_id = $1 "
+    "ORDER BY created_at ASC, id ASC LIMIT $2"
+)
+SELECT_PAGE_AFTER = (
+    "SELECT * FROM messages WHERE session_id = $1 AND (created_at, id) > ($3, $4) "
+    "ORDER BY created_at ASC, id ASC LIMIT $2"
+)
+SELECT_PAGE_BEFORE = (
+    "SELECT * FROM messages WHERE session_id = $1 AND (created_at, id) < ($3, $4) "
+    "ORDER BY created_at DESC, id DESC LIMIT $2"
+)
+SELECT_BY_ID = "SELECT * FROM messages WHERE id = $1"
+# Session summary and its newest messages (backward scan of the keyset index)
+SELECT_SESSION_TAIL = (
+    "SELECT s.context_summary, m.id, m.role, m.content, m.created_at FROM sessions s "
+    "LEFT JOIN LATERAL (SELECT id, role, content, created_at FROM messages "
+    "WHERE session_id = s.id ORDER BY created_at DESC, id DESC LIMIT $2) m ON TRUE "
+    "WHERE s.id = $1 ORDER BY m.created_at ASC, m.id ASC"
+)
+
+# Bulk insert from parallel arrays: one fixed statement for any batch size.
+# Rows without created_at get the statement time plus one microsecond per
+# position, so a batch keeps its order under (created_at, id) ordering. Ids
+# come from the caller: the order of RETURNING rows is not guaranteed.
+INSERT_MESSAGES = (
+    "INSERT INTO messages (id, session_id, role, content, audio_url, metadata, created_at) "
+    "SELECT m.id, m.session_id, m.role, m.content, m.audio_url, "
+    "COALESCE(m.metadata, '{}'::jsonb), "
+    "COALESCE(m.created_at, NOW() + (m.ord - 1) * INTERVAL '1 microsecond') "
+    "FROM unnest($1::uuid[], $2::uuid[], $3::text[], $4::text[], $5::text[], $6::jsonb[], $7::timestamptz[]) "
+    "WITH ORDINALITY AS m(id, session_id, role, content, audio_url, metadata, created_at, ord) "
+    "ORDER BY m.ord"
+)
+INSERT_MESSAGE_COLUMNS = ("id", "session_id", "role", "content", "audio_url", "metadata", "created_at")
+
+
+def owned_session_query(query: str, user_param: int, order: str) -> str:
+    """
+    Wrap a messages query so it only returns rows for an owned session.
+    
+    The session row is joined to the messages subquery: no rows means the
+    session does not exist or belongs to someone else, and a single row of
+    NULLs means the session is owned but has no matching messages.
+    
+    Args:
+        query: Messages query whose $1 is the session ID
+        user_param: Parameter number for the owner's user ID
+        order: ORDER BY clause for the outer query (on m.*)
+    """
+    return (
+        f"SELECT m.* FROM sessions s LEFT JOIN ({query}) m ON TRUE "
+        f"WHERE s.id = $1 AND s.user_id = ${user_param} ORDER BY {order}"
+    )
+
+
+SELECT_OWNED_SESSION_MESSAGES = owned_session_query(SELECT_SESSION_MESSAGES, 4, "m.created_at ASC")
+SELECT_OWNED_PAGE_FIRST = owned_session_query(SELECT_PAGE_FIRST, 3, "m.created_at ASC, m.id ASC")
+SELECT_OWNED_PAGE_AFTER = owned_session_query(SELECT_PAGE_AFTER, 5, "m.created_at ASC, m.id ASC")
+SELECT_OWNED_PAGE_BEFORE = owned_session_query(SELECT_PAGE_BEFORE, 5, "m.created_at DESC, m.id DESC")
+DELETE_SESSION_MESSAGES = "DELETE FROM messages WHERE session_id = $1"
+COUNT_SESSION_MESSAGES = "SELECT COUNT(*) FROM messages WHERE session_id = $1"
+
+
+class PostgresMessageRepository(PostgresRepository):
+    """Repository for message data operations (direct Postgres)."""
+    
+    table_name = TableNames.MESSAGES
+    columns = TableColumns.MESSAGES
+    
+    async def create_message(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new message."""
+        try:
+            if "metadata" not in message_data:
+                message_data["metadata"] = {}
+            
+            query, args = self._insert_sql(message_data)
+            result = await self._fetchrow(query, *args)
+            logger.info(f"Created message with ID: {result.get('id')}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to create message: {e}")
+            raise
+    
+    async def create_messages(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create several messages in one statement (INSERT_MESSAGES).
+        
+        Messages without a created_at are stamped by the database in list
+        order, so they read back in the order given. Missing ids are
+        generated here, so the returned ids follow the given order.
+        
+        Args:
+            messages: Message rows
+        
+        Returns:
+            IDs of the created messages, in the given order
+        """
+        if not messages:
+            return []
+        
+        try:
+            messages = [{**message, "id": message.get("id") or str(uuid.uuid4())} for message in messages]
+            columns = [
+                [self._param(name, message.get(name)) for message in messages]
+                for name in INSERT_MESSAGE_COLUMNS
+            ]
+            await self.pool.execute(INSERT_MESSAGES, *columns)
+            ids = [message["id"] for message in messages]
+            logger.info(f"Created {len(ids)} messages")
+            
+            return ids
+            
+        except Exception as e:
+            logger.error(f"Failed to create {len(messages)} messages: {e}")
+            raise
+    
+    @staticmethod
+    def _owned_rows(rows: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
+        """Extract message rows from an owned_session_query result."""
+        if not rows:
+            raise RecordNotFoundError(f"Session {session_id} not found")
+        return [row for row in rows if row["id"] is not None]
+    
+    async def get_session_messages(
+        self, 
+        session_id: str, 
+        limit: int = 50,
+        offset: int = 0,
+        user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all messages for a session, optionally only if owned by user_id."""
+        try:
+            if user_id is None:
+                return await self._fetch(SELECT_SESSION_MESSAGES, session_id, limit, offset)
+            
+            rows = await self._fetch(SELECT_OWNED_SESSION_MESSAGES, session_id, limit, offset, user_id)
+            return self._owned_rows(rows, session_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get session messages {session_id}: {e}")
+            raise
+    
+    async def get_session_tail(self, session_id: str, limit: int = 20) -> Dict[str, Any]:
+        """Get a session's context summary and newest messages in one query."""
+        try:
+            return session_tail(await self._fetch(SELECT_SESSION_TAIL, session_id, limit), session_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get session tail {session_id}: {e}")
+            raise
+    
+    async def get_session_messages_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a page of session messages ordered by (created_at, id).
+        
+        Raises:
+            RecordNotFoundError: If user_id is given and does not own the session
+        """
+        try:
+            check_cursor_arguments(after, before)
+            cursor = after or before
+            backward = before is not None
+            owned = user_id is not None
+            
+            if cursor:
+                created_at, message_id = decode_timestamp_cursor(cursor, "created_at")
+                if backward:
+                    query = SELECT_OWNED_PAGE_BEFORE if owned else SELECT_PAGE_BEFORE
+                else:
+                    query = SELECT_OWNED_PAGE_AFTER if owned else SELECT_PAGE_AFTER
+                args = [session_id, limit + 1, to_utc(datetime.fromisoformat(created_at)), message_id]
+            else:
+                query = SELECT_OWNED_PAGE_FIRST if owned else SELECT_PAGE_FIRST
+                args = [session_id, limit + 1]
+            
+            if owned:
+                rows = self._owned_rows(await self._fetch(query, *args, user_id), session_id)
+            else:
+                rows = await self._fetch(query, *args)
+            page = build_page(rows, limit, MESSAGE_CURSOR_FIELDS, backward, bool(cursor))
+            
+            return {
+                "messages": page["items"],
+                "next_cursor": page["next_cursor"],
+                "prev_cursor": page["prev_cursor"]
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get session messages page {session_id}: {e}")
+            raise
+    
+    async def get_message_by_id(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """Get message by ID."""
+        try:
+            return await self._fetchrow(SELECT_BY_ID, message_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get message {message_id}: {e}")
+            raise
+    
+    async def delete_session_messages(self, session_id: str) -> bool:
+        """Delete all messages for a session."""
+        try:
+            await self.pool.execute(DELETE_SESSION_MESSAGES, session_id)
+            
+            logger.info(f"Deleted messages for session {session_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to delete session messages {session_id}: {e}")
+            raise
+    
+    async def get_message_count(self, session_id: str) -> int:
+        """Get count of messages in a session."""
+        try:
+            return await self.pool.fetchval(COUNT_SESSION_MESSAGES, session_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get message count for session {session_id}: {e}")
+            raise
@@ -0,0 +1,243 @@
+"""
+Session repository backed by a direct asyncpg connection pool.
+"""
+
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+
+import structlog
+
+from app.core.database.models import RecordNotFoundError, TableNames, TableColumns
+from app.core.database.pagination import build_page, decode_timestamp_cursor
+from app.core.database.repositories.session_repository import (
+    SESSION_CURSOR_FIELDS,
+    SESSION_SUMMARY_FIELDS
+)
+from app.core.database.repositories.postgres.base import PostgresRepository, to_utc
+
+logger = structlog.get_logger(__name__)
+
+# Fixed queries (prepared once per pooled connection via the statement cache)
+SELECT_BY_ID = "SELECT * FROM sessions WHERE id = $1"
+SELECT_USER_ACTIVE = (
+    "SELECT * FROM sessions WHERE user_id = $1 AND status = 'active' "
+    "ORDER BY last_activity_at DESC"
+)
+SELECT_USER_NOT_DELETED = (
+    "SELECT * FROM sessions WHERE user_id = $1 AND status <> 'deleted' "
+    "ORDER BY last_activity_at DESC"
+)
+SELECT_USER_PAGE = (
+    "SELECT " + ", ".join(SESSION_SUMMARY_FIELDS) + " FROM sessions "
+    "WHERE user_id = $1 AND {status} "
+    "AND ($3 OR livekit_room_name IS NOT NULL) {cursor}"
+    "ORDER BY last_activity_at DESC, id DESC LIMIT $2"
+)
+# Keyed by (active_only, has_cursor)
+SELECT_USER_PAGE_QUERIES = {
+    (active_only, has_cursor): SELECT_USER_PAGE.format(
+        status="status = 'active'" if active_only else "status <> 'deleted'",
+        cursor="AND (last_activity_at, id) < ($4, $5) " if has_cursor else "",
+    )
+    for active_only in (True, False)
+    for has_cursor in (True, False)
+}
+UPDATE_LAST_ACTIVITY = (
+    "UPDATE sessions SET last_activity_at = NOW(), updated_at = NOW() "
+    "WHERE id = $1 RETURNING *"
+)
+UPDATE_LIVEKIT_ROOM = (
+    "UPDATE sessions SET livekit_room_name = $2, updated_at = NOW() "
+    "WHERE id = $1 RETURNING *"
+)
+UPDATE_LIVEKIT_ROOM_OWNED = (
+    "UPDATE sessions SET livekit_room_name = $2, updated_at = NOW() "
+    "WHERE id = $1 AND user_id = $3 RETURNING *"
+)
+UPDATE_STATUS = (
+    "UPDATE sessions SET status = $2, updated_at = NOW() "
+    "WHERE id = $1 RETURNING *"
+)
+UPDATE_STATUS_OWNED = (
+    "UPDATE sessions SET status = $2, updated_at = NOW() "
+    "WHERE id = $1 AND user_id = $3 RETURNING *"
+)
+
+
+def _scope(session_id: str, user_id: Optional[str]) -> Tuple[List[str], List[Any]]:
+    """WHERE columns and values matching a session, and its owner if given."""
+    if user_id is None:
+        return ["id"], [session_id]
+    return ["id", "user_id"], [session_id, user_id]
+
+
+class PostgresSessionRepository(PostgresRepository):
+    """Repository for session data operations (direct Postgres)."""
+    
+    table_name = TableNames.SESSIONS
+    columns = TableColumns.SESSIONS
+    
+    async def create_session(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new session."""
+        try:
+            if "status" not in session_data:
+                session_data["status"] = "active"
+            if "title" not in session_data:
+                session_data["title"] = "New Chat"
+            if "agent_type" not in session_data:
+                session_data["agent_type"] = "teacher"
+            
+            query, args = self._insert_sql(session_data)
+            result = await self._fetchrow(query, *args)
+            logger.info(f"Created session with ID: {result.get('id')}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to create session: {e}")
+            raise
+    
+    async def get_session_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session by ID."""
+        try:
+            return await self._fetchrow(SELECT_BY_ID, session_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get session {session_id}: {e}")
+            raise
+    
+    async def get_user_sessions(
+        self, 
+        user_id: str, 
+        active_only: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Get all sessions for a user."""
+        try:
+            query = SELECT_USER_ACTIVE if active_only else SELECT_USER_NOT_DELETED
+            return await self._fetch(query, user_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get user sessions {user_id}: {e}")
+            raise
+    
+    async def get_user_sessions_page(
+        self,
+        user_id: str,
+        active_only: bool = True,
+        limit: int = 50,
+        after: Optional[str] = None,
+        with_room_only: bool = False
+    ) -> Dict[str, Any]:
+        """Get a page of session summaries for a user, most recent first."""
+        try:
+            # $3 is true when every session qualifies, not only those with a room
+            args = [user_id, limit + 1, not with_room_only]
+            if after:
+                last_activity_at, session_id = decode_timestamp_cursor(after, "last_activity_at")
+                args += [to_utc(datetime.fromisoformat(last_activity_at)), session_id]
+            
+            query = SELECT_USER_PAGE_QUERIES[(active_only, bool(after))]
+            rows = await self._fetch(query, *args)
+            page = build_page(rows, limit, SESSION_CURSOR_FIELDS)
+            
+            return {
+                "sessions": page["items"],
+                "next_cursor": page["next_cursor"]
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get user sessions page {user_id}: {e}")
+            raise
+    
+    async def update_session(
+        self,
+        session_id: str,
+        update_data: Dict[str, Any],
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Update session data, optionally only if owned by user_id."""
+        try:
+            where, where_args = _scope(session_id, user_id)
+            query, args = self._update_sql(update_data, where, where_args)
+            result = await self._fetchrow(query, *args)
+            
+            if not result:
+                raise RecordNotFoundError(f"Session {session_id} not found")
+            
+            logger.info(f"Updated session {session_id}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update session {session_id}: {e}")
+            raise
+    
+    async def update_last_activity(self, session_id: str) -> Dict[str, Any]:
+        """Update session last activity timestamp."""
+        try:
+            result = await self._fetchrow(UPDATE_LAST_ACTIVITY, session_id)
+            
+            if not result:
+                raise RecordNotFoundError(f"Session {session_id} not found")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update last activity {session_id}: {e}")
+            raise
+    
+    async def update_livekit_room(
+        self,
+        session_id: str,
+        room_name: str,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Update session with LiveKit room name, optionally only if owned by user_id."""
+        try:
+            if user_id is None:
+                result = await self._fetchrow(UPDATE_LIVEKIT_ROOM, session_id, room_name)
+            else:
+                result = await self._fetchrow(UPDATE_LIVEKIT_ROOM_OWNED, session_id, room_name, user_id)
+            
+            if not result:
+                raise RecordNotFoundError(f"Session {session_id} not found")
+            
+            logger.info(f"Updated LiveKit room for session {session_id}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update LiveKit room {session_id}: {e}")
+            raise
+    
+    async def end_session(self, session_id: str) -> Dict[str, Any]:
+        """End a session."""
+        try:
+            result = await self._fetchrow(UPDATE_STATUS, session_id, "ended")
+            
+            if not result:
+                raise RecordNotFoundError(f"Session {session_id} not found")
+            
+            logger.info(f"Ended session {session_id}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to end session {session_id}: {e}")
+            raise
+    
+    async def delete_session(self, session_id: str, user_id: Optional[str] = None) -> bool:
+        """Soft delete a session, optionally only if owned by user_id."""
+        try:
+            if user_id is None:
+                result = await self._fetchrow(UPDATE_STATUS, session_id, "deleted")
+            else:
+                result = await self._fetchrow(UPDATE_STATUS_OWNED, session_id, "deleted", user_id)
+            
+            if not result:
+                logger.warning(f"Session {session_id} not found for deletion")
+                return False
+            
+            logger.info(f"Deleted session {session_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to delete session {session_id}: {e}")
+            raise
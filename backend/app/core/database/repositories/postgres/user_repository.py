@@ -0,0 +1,197 @@
+"""
+User repository backed by a direct asyncpg connection pool.
+"""
+
+import copy
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+import structlog
+
+from app.core.database.models import RecordNotFoundError, TableNames, TableColumns
+from app.core.database.repositories.user_repository import get_user_cache
+from app.core.database.repositories.postgres.base import PostgresRepository, to_utc
+
+logger = structlog.get_logger(__name__)
+
+# Fixed queries (prepared once per pooled connection via the statement cache)
+SELECT_BY_ID = "SELECT * FROM users WHERE id = $1"
+SELECT_BY_EMAIL = "SELECT * FROM users WHERE email = $1"
+DELETE_BY_ID = "DELETE FROM users WHERE id = $1 RETURNING id"
+UPDATE_LAST_LOGIN = (
+    "UPDATE users SET last_login_at = NOW(), updated_at = NOW() "
+    "WHERE id = $1 RETURNING *"
+)
+UPDATE_LAST_LOGIN_BATCH = """
+    UPDATE users AS u
+    SET last_login_at = GREATEST(u.last_login_at, v.last_login_at),
+        updated_at = NOW()
+    FROM unnest($1::uuid[], $2::timestamptz[]) AS v(id, last_login_at)
+    WHERE u.id = v.id
+"""
+
+
+class PostgresUserRepository(PostgresRepository):
+    """Repository for user data operations (direct Postgres)."""
+    
+    table_name = TableNames.USERS
+    columns = TableColumns.USERS
+    
+    async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new user."""
+        try:
+            # Timestamps come from the database clock
+            user_data.pop("created_at", None)
+            user_data.pop("updated_at", None)
+            
+            if "is_active" not in user_data:
+                user_data["is_active"] = True
+            if "preferences" not in user_data:
+                user_data["preferences"] = {}
+            if "preferred_agent_type" not in user_data:
+                user_data["preferred_agent_type"] = "teacher"
+            
+            query, args = self._insert_sql(user_data)
+            result = await self._fetchrow(query, *args)
+            
+            get_user_cache().set(result["id"], copy.deepcopy(result))
+            logger.info(f"Created user with ID: {result.get('id')}")
+            
+            return dict(result)
+            
+        except Exception as e:
+            logger.error(f"Failed to create user: {e}")
+            raise
+    
+    async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get user by ID (read-through cached)."""
+        cached = get_user_cache().get(user_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        try:
+            result = await self._fetchrow(SELECT_BY_ID, user_id)
+            
+            if not result:
+                return None
+            
+            get_user_cache().set(user_id, copy.deepcopy(result))
+            return dict(result)
+            
+        except Exception as e:
+            logger.error(f"Failed to get user {user_id}: {e}")
+            raise
+    
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get user by email."""
+        try:
+            return await self._fetchrow(SELECT_BY_EMAIL, email)
+            
+        except Exception as e:
+            logger.error(f"Failed to get user by email {email}: {e}")
+            raise
+    
+    async def _update(self, user_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply an update and refresh the cached row."""
+        query, args = self._update_sql(update_data, ["id"], [user_id])
+        result = await self._fetchrow(query, *args)
+        
+        if not result:
+            get_user_cache().delete(user_id)
+            raise RecordNotFoundError(f"User {user_id} not found")
+        
+        get_user_cache().set(user_id, copy.deepcopy(result))
+        return dict(result)
+    
+    async def update_user(self, user_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Update user data."""
+        try:
+            result = await self._update(user_id, update_data)
+            logger.info(f"Updated user {user_id}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update user {user_id}: {e}")
+            raise
+    
+    async def delete_user(self, user_id: str) -> bool:
+        """Delete user."""
+        try:
+            get_user_cache().delete(user_id)
+            deleted = await self.pool.fetchval(DELETE_BY_ID, user_id)
+            
+            if not deleted:
+                raise RecordNotFoundError(f"User {user_id} not found")
+            
+            logger.info(f"Deleted user {user_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to delete user {user_id}: {e}")
+            raise
+    
+    async def update_last_login(self, user_id: str) -> Dict[str, Any]:
+        """Update user's last login timestamp."""
+        try:
+            result = await self._fetchrow(UPDATE_LAST_LOGIN, user_id)
+            
+            if not result:
+                get_user_cache().delete(user_id)
+                raise RecordNotFoundError(f"User {user_id} not found")
+            
+            get_user_cache().set(user_id, copy.deepcopy(result))
+            logger.info(f"Updated last login for user {user_id}")
+            
+            return dict(result)
+            
+        except Exception as e:
+            logger.error(f"Failed to update last login for user {user_id}: {e}")
+            raise
+    
+    async def update_last_login_batch(self, updates: Dict[str, datetime]) -> int:
+        """
+        Write many last login timestamps in one statement.
+        
+        Args:
+            updates: Mapping of user ID to last login time
+        
+        Returns:
+            Number of users updated
+        """
+        if not updates:
+            return 0
+        
+        try:
+            status = await self.pool.execute(
+                UPDATE_LAST_LOGIN_BATCH,
+                list(updates.keys()),
+                [to_utc(login_at) for login_at in updates.values()],
+            )
+            
+            # Command tag is "UPDATE <count>"
+            updated = int(status.split()[-1])
+            logger.info(f"Flushed last login for {updated} users")
+            
+            return updated
+            
+        except Exception as e:
+            logger.error(f"Failed to flush last login batch: {e}")
+            raise
+    
+    async def update_preferences(self, user_id: str, preferences: Dict[str, Any]) -> Dict[str, Any]:
+        """Update user preferences."""
+        try:
+            update_data = {"preferences": preferences}
+            
+            if "preferred_agent_type" in preferences:
+                update_data["preferred_agent_type"] = preferences["preferred_agent_type"]
+            
+            result = await self._update(user_id, update_data)
+            logger.info(f"Updated preferences for user {user_id}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update preferences for user {user_id}: {e}")
+            raise
@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from supabase import Client
+    from supabase import AsyncClient
 import structlog
 
 from app.core.database.models import (
@@ -16,14 +16,28 @@ from app.core.database.models import (
     handle_supabase_response,
     TableNames
 )
+from app.core.database.pagination import build_page, decode_timestamp_cursor
 
 logger = structlog.get_logger(__name__)
 
+# Columns the session list views need (no metadata blobs)
+SESSION_SUMMARY_FIELDS = (
+    "id",
+    "title",
+    "agent_type",
+    "status",
+    "livekit_room_name",
+    "created_at",
+    "last_activity_at",
+)
+# Sort key for session list cursors (newest activity first)
+SESSION_CURSOR_FIELDS = ("last_activity_at", "id")
+
 
 class SessionRepository:
     """Repository for session data operations."""
     
-    def __init__(self, db_client: Client):
+    def __init__(self, db_client: "AsyncClient"):
         self.db = db_client
         self.table_name = TableNames.SESSIONS
     
@@ -42,7 +56,7 @@ class SessionRepository:
                 session_data["agent_type"] = "teacher"
             
             serialized_data = serialize_for_db(session_data)
-            response = self.db.table(self.table_name).insert(serialized_data).execute()
+            response = await self.db.table(self.table_name).insert(serialized_data).execute()
             
             result = handle_supabase_response(response)
             logger.info(f"Created session with ID: {result.get('id')}")
@@ -56,7 +70,7 @@ class SessionRepository:
     async def get_session_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session by ID."""
         try:
-            response = self.db.table(self.table_name).select("*").eq("id", session_id).execute()
+            response = await self.db.table(self.table_name).select("*").eq("id", session_id).execute()
             
             if not response.data:
                 return None
@@ -81,7 +95,7 @@ class SessionRepository:
             else:
                 query = query.neq("status", "deleted")
             
-            response = query.order("last_activity_at", desc=True).execute()
+            response = await query.order("last_activity_at", desc=True).execute()
             
             return response.data or []
             
@@ -89,19 +103,97 @@ class SessionRepository:
             logger.error(f"Failed to get user sessions {user_id}: {e}")
             raise
     
-    async def update_session(self, session_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Update session data."""
+    async def get_user_sessions_page(
+        self,
+        user_id: str,
+        active_only: bool = True,
+        limit: int = 50,
+        after: Optional[str] = None,
+        with_room_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Get a page of session summaries for a user, most recent first.
+        
+        Only SESSION_SUMMARY_FIELDS are selected and rows are paged on
+        (last_activity_at, id), so cost stays flat as history grows.
+        
+        Args:
+            user_id: Owner of the sessions
+            active_only: Only active sessions, otherwise all but deleted
+            limit: Page size
+            after: Cursor from a previous page's next_cursor
+            with_room_only: Only sessions that have a LiveKit room
+        
+        Returns:
+            Dictionary with sessions and next_cursor
+        """
         try:
-            update_data["updated_at"] = datetime.utcnow().isoformat()
-            serialized_data = serialize_for_db(update_data)
-            
-            response = (
+            query = (
                 self.db.table(self.table_name)
-                .update(serialized_data)
-                .eq("id", session_id)
+                .select(",".join(SESSION_SUMMARY_FIELDS))
+                .eq("user_id", user_id)
+            )
+            
+            if active_only:
+                query = query.eq("status", "active")
+            else:
+                query = query.neq("status", "deleted")
+            
+            if with_room_only:
+                query = query.not_.is_("livekit_room_name", "null")
+            
+            if after:
+                last_activity_at, session_id = decode_timestamp_cursor(after, "last_activity_at")
+                query = query.or_(
+                    f'last_activity_at.lt."{last_activity_at}",'
+                    f'and(last_activity_at.eq."{last_activity_at}",id.lt.{session_id})'
+                )
+            
+            response = await (
+                query.order("last_activity_at", desc=True)
+                .order("id", desc=True)
+                .limit(limit + 1)
                 .execute()
             )
             
+            page = build_page(response.data or [], limit, SESSION_CURSOR_FIELDS)
+            
+            return {
+                "sessions": page["items"],
+                "next_cursor": page["next_cursor"]
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get user sessions page {user_id}: {e}")
+            raise
+    
+    async def update_session(
+        self,
+        session_id: str,
+        update_data: Dict[str, Any],
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Update session data.
+        
+        Args:
+            session_id: Session to update
+            update_data: Fields to set
+            user_id: If given, only update when this user owns the session
+        
+        Raises:
+            RecordNotFoundError: If no (owned) session matched
+        """
+        try:
+            update_data["updated_at"] = datetime.utcnow().isoformat()
+            serialized_data = serialize_for_db(update_data)
+            
+            query = self.db.table(self.table_name).update(serialized_data).eq("id", session_id)
+            if user_id is not None:
+                query = query.eq("user_id", user_id)
+            
+            response = await query.execute()
+            
             if not response.data:
                 raise RecordNotFoundError(f"Session {session_id} not found")
             
@@ -124,7 +216,7 @@ class SessionRepository:
             
             serialized_data = serialize_for_db(update_data)
             
-            response = (
+            response = await (
                 self.db.table(self.table_name)
                 .update(serialized_data)
                 .eq("id", session_id)
@@ -140,8 +232,23 @@ class SessionRepository:
             logger.error(f"Failed to update last activity {session_id}: {e}")
             raise
     
-    async def update_livekit_room(self, session_id: str, room_name: str) -> Dict[str, Any]:
-        """Update session with LiveKit room name."""
+    async def update_livekit_room(
+        self,
+        session_id: str,
+        room_name: str,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Update session with LiveKit room name.
+        
+        Args:
+            session_id: Session to update
+            room_name: LiveKit room name
+            user_id: If given, only update when this user owns the session
+        
+        Raises:
+            RecordNotFoundError: If no (owned) session matched
+        """
         try:
             update_data = {
                 "livekit_room_name": room_name,
@@ -150,12 +257,11 @@ class SessionRepository:
             
             serialized_data = serialize_for_db(update_data)
             
-            response = (
-                self.db.table(self.table_name)
-                .update(serialized_data)
-                .eq("id", session_id)
-                .execute()
-            )
+            query = self.db.table(self.table_name).update(serialized_data).eq("id", session_id)
+            if user_id is not None:
+                query = query.eq("user_id", user_id)
+            
+            response = await query.execute()
             
             if not response.data:
                 raise RecordNotFoundError(f"Session {session_id} not found")
@@ -179,7 +285,7 @@ class SessionRepository:
             
             serialized_data = serialize_for_db(update_data)
             
-            response = (
+            response = await (
                 self.db.table(self.table_name)
                 .update(serialized_data)
                 .eq("id", session_id)
@@ -198,8 +304,17 @@ class SessionRepository:
             logger.error(f"Failed to end session {session_id}: {e}")
             raise
     
-    async def delete_session(self, session_id: str) -> bool:
-        """Soft delete a session."""
+    async def delete_session(self, session_id: str, user_id: Optional[str] = None) -> bool:
+        """
+        Soft delete a session.
+        
+        Args:
+            session_id: Session to delete
+            user_id: If given, only delete when this user owns the session
+        
+        Returns:
+            False if no (owned) session matched
+        """
         try:
             update_data = {
                 "status": "deleted",
@@ -208,12 +323,11 @@ class SessionRepository:
             
             serialized_data = serialize_for_db(update_data)
             
-            response = (
-                self.db.table(self.table_name)
-                .update(serialized_data)
-                .eq("id", session_id)
-                .execute()
-            )
+            query = self.db.table(self.table_name).update(serialized_data).eq("id", session_id)
+            if user_id is not None:
+                query = query.eq("user_id", user_id)
+            
+            response = await query.execute()
             
             if not response.data:
                 logger.warning(f"Session {session_id} not found for deletion")
@@ -0,0 +1,9 @@
+"""
+SQLite repository backend (file or in-memory) for local development and load testing.
+"""
+
+from app.core.database.repositories.sqlite.user_repository import SQLiteUserRepository
+from app.core.database.repositories.sqlite.session_repository import SQLiteSessionRepository
+from app.core.database.repositories.sqlite.message_repository import SQLiteMessageRepository
+
+__all__ = ["SQLiteUserRepository", "SQLiteSessionRepository", "SQLiteMessageRepository"]
@@ -0,0 +1,210 @@
+"""
+Shared helpers and schema for the SQLite-backed repositories.
+
+SQLite stores ids as TEXT, timestamps as ISO 8601 TEXT (UTC) and JSON
+columns as TEXT, and rows are returned in the same shape as Supabase.
+"""
+
+import json
+import sqlite3
+import uuid
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from datetime import datetime, timezone
+
+import structlog
+
+from app.utils.errors import ValidationError
+
+logger = structlog.get_logger(__name__)
+
+# Mirrors backend/migrations/*.sql
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT UNIQUE NOT NULL,
+    full_name TEXT,
+    avatar_url TEXT,
+    preferred_agent_type TEXT DEFAULT 'teacher',
+    preferences TEXT DEFAULT '{}',
+    is_active INTEGER DEFAULT 1,
+    created_at TEXT,
+    updated_at TEXT,
+    last_login_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+    agent_type TEXT NOT NULL DEFAULT 'teacher',
+    livekit_room_name TEXT,
+    title TEXT DEFAULT 'New Chat',
+    status TEXT DEFAULT 'active',
+    created_at TEXT,
+    updated_at TEXT,
+    last_activity_at TEXT,
+    metrics TEXT DEFAULT '{}',
+    context_summary TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_user_status_activity
+    ON sessions(user_id, status, last_activity_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    session_id TEXT REFERENCES sessions(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    audio_url TEXT,
+    metadata TEXT DEFAULT '{}',
+    created_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_messages_session_created_id ON messages(session_id, created_at, id);
+"""
+
+# Columns added by later migrations, for databases created before them
+# (CREATE TABLE IF NOT EXISTS leaves existing tables unchanged)
+ADDED_COLUMNS = (
+    ("sessions", "metrics", "TEXT DEFAULT '{}'"),
+    ("sessions", "context_summary", "TEXT"),
+)
+
+JSON_COLUMNS = frozenset({"preferences", "metadata", "metrics"})
+TIMESTAMP_COLUMNS = frozenset({"created_at", "updated_at", "last_login_at", "last_activity_at"})
+BOOLEAN_COLUMNS = frozenset({"is_active"})
+
+
+def utc_now() -> str:
+    """Current UTC time in the fixed-width ISO format used for ordering."""
+    return datetime.utcnow().isoformat(timespec="microseconds")
+
+
+def apply_schema(connection: sqlite3.Connection):
+    """Create the schema, and add columns missing from older databases."""
+    connection.executescript(SCHEMA)
+    for table, column, definition in ADDED_COLUMNS:
+        existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a SQLite row into the shape Supabase returns."""
+    result = dict(row)
+    
+    for key in JSON_COLUMNS & result.keys():
+        if result[key] is not None:
+            result[key] = json.loads(result[key])
+    for key in BOOLEAN_COLUMNS & result.keys():
+        if result[key] is not None:
+            result[key] = bool(result[key])
+    
+    return result
+
+
+class SQLiteRepository:
+    """
+    Base class for repositories backed by a shared sqlite3 connection.
+    
+    Queries run inline on the event loop: SQLite calls on a local file or
+    in-memory database complete in microseconds, well below the cost of a
+    thread hop.
+    """
+    
+    table_name: str = ""
+    columns: frozenset = frozenset()
+    
+    def __init__(self, connection: sqlite3.Connection):
+        self.db = connection
+    
+    def _writable(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keep only known columns so dynamic SQL never interpolates other keys.
+        
+        Extra keys (e.g. email_verified from extract_user_profile) have no
+        column in the schema and are dropped.
+        """
+        unknown = set(data) - self.columns
+        if unknown:
+            logger.debug(f"Ignoring unknown {self.table_name} columns: {sorted(unknown)}")
+        return {key: value for key, value in data.items() if key in self.columns}
+    
+    @staticmethod
+    def _param(name: str, value: Any) -> Any:
+        """Convert a column value for storage."""
+        if value is None:
+            return None
+        if name in JSON_COLUMNS:
+            return json.dumps(value)
+        if name in TIMESTAMP_COLUMNS and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if isinstance(value, datetime):
+            # Stored as naive UTC in fixed width, so text order is time order
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value.isoformat(timespec="microseconds")
+        return value
+    
+    def _fetchrow(self, query: str, args: Iterable[Any] = ()) -> Optional[Dict[str, Any]]:
+        """Run a query and return the first row as a dictionary."""
+        row = self.db.execute(query, tuple(args)).fetchone()
+        return row_to_dict(row) if row is not None else None
+    
+    def _fetch(self, query: str, args: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """Run a query and return all rows as dictionaries."""
+        return [row_to_dict(row) for row in self.db.execute(query, tuple(args)).fetchall()]
+    
+    def _insert_sql(self, data: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Build an INSERT ... RETURNING * statement, generating the id if missing."""
+        data = self._writable(data)
+        if not data.get("id"):
+            data["id"] = str(uuid.uuid4())
+        names = list(data)
+        query = (
+            f"INSERT INTO {self.table_name} ({', '.join(names)}) "
+            f"VALUES ({', '.join('?' for _ in names)}) RETURNING *"
+        )
+        return query, [self._param(name, data[name]) for name in names]
+    
+    def _insert_many_sql(self, rows: List[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """
+        Build a multi-row INSERT ... RETURNING * statement, generating missing ids.
+        
+        Raises:
+            ValidationError: If the rows do not all have the same columns
+        """
+        rows = [self._writable(row) for row in rows]
+        for row in rows:
+            if not row.get("id"):
+                row["id"] = str(uuid.uuid4())
+        names = list(rows[0])
+        if any(row.keys() != rows[0].keys() for row in rows):
+            raise ValidationError(f"All {self.table_name} rows of a bulk insert need the same columns")
+        
+        row_placeholders = f"({', '.join('?' for _ in names)})"
+        query = (
+            f"INSERT INTO {self.table_name} ({', '.join(names)}) "
+            f"VALUES {', '.join(row_placeholders for _ in rows)} RETURNING *"
+        )
+        return query, [self._param(name, row[name]) for row in rows for name in names]
+    
+    def _update_sql(
+        self,
+        data: Dict[str, Any],
+        where: Iterable[str],
+        where_args: List[Any],
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build an UPDATE ... RETURNING * statement.
+        
+        Args:
+            data: Column values to set (updated_at is always set to now)
+            where: Column names matched with equality
+            where_args: Values for the where columns, in the same order
+        """
+        data = self._writable({k: v for k, v in data.items() if k != "updated_at"})
+        data["updated_at"] = utc_now()
+        assignments = ", ".join(f"{name} = ?" for name in data)
+        conditions = " AND ".join(f"{name} = ?" for name in where)
+        query = f"UPDATE {self.table_name} SET {assignments} WHERE {conditions} RETURNING *"
+        return query, [self._param(k, v) for k, v in data.items()] + list(where_args)
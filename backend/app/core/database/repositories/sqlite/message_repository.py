@@ -0,0 +1,239 @@
+"""
+Message repository backed by SQLite (file or in-memory).
+"""
+
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+import structlog
+
+from app.core.database.models import RecordNotFoundError, TableNames, TableColumns
+from app.core.database.pagination import (
+    build_page,
+    check_cursor_arguments,
+    decode_timestamp_cursor
+)
+from app.core.database.repositories.message_repository import (
+    MESSAGE_CURSOR_FIELDS,
+    session_tail,
+    stamp_in_order
+)
+from app.core.database.repositories.sqlite.base import SQLiteRepository, utc_now
+
+logger = structlog.get_logger(__name__)
+
+SELECT_SESSION_MESSAGES = (
+    "SELECT * FROM messages WHERE session_id = ? "
+    "ORDER BY created_at ASC LIMIT ? OFFSET ?"
+)
+SELECT_PAGE_FIRST = (
+    "SELECT * FROM messages WHERE session_id = ? "
+    "ORDER BY created_at ASC, id ASC LIMIT ?"
+)
+SELECT_PAGE_AFTER = (
+    "SELECT * FROM messages WHERE session_id = ? AND (created_at, id) > (?, ?) "
+    "ORDER BY created_at ASC, id ASC LIMIT ?"
+)
+SELECT_PAGE_BEFORE = (
+    "SELECT * FROM messages WHERE session_id = ? AND (created_at, id) < (?, ?) "
+    "ORDER BY created_at DESC, id DESC LIMIT ?"
+)
+SELECT_BY_ID = "SELECT * FROM messages WHERE id = ?"
+# Session summary and its newest messages
+SELECT_SESSION_TAIL = (
+    "SELECT s.context_summary, m.id, m.role, m.content, m.created_at FROM sessions s "
+    "LEFT JOIN (SELECT id, role, content, created_at FROM messages "
+    "WHERE session_id = ? ORDER BY created_at DESC, id DESC LIMIT ?) m ON 1 "
+    "WHERE s.id = ? ORDER BY m.created_at ASC, m.id ASC"
+)
+
+
+def owned_session_query(query: str, order: str) -> str:
+    """
+    Wrap a messages query so it only returns rows for an owned session.
+    
+    Takes the inner query's parameters followed by the session ID and the
+    owner's user ID. No rows means the session does not exist or belongs
+    to someone else; a single row of NULLs means it has no matching
+    messages.
+    """
+    return (
+        f"SELECT m.* FROM sessions s LEFT JOIN ({query}) m ON 1 "
+        f"WHERE s.id = ? AND s.user_id = ? ORDER BY {order}"
+    )
+
+
+SELECT_OWNED_SESSION_MESSAGES = owned_session_query(SELECT_SESSION_MESSAGES, "m.created_at ASC")
+SELECT_OWNED_PAGE_FIRST = owned_session_query(SELECT_PAGE_FIRST, "m.created_at ASC, m.id ASC")
+SELECT_OWNED_PAGE_AFTER = owned_session_query(SELECT_PAGE_AFTER, "m.created_at ASC, m.id ASC")
+SELECT_OWNED_PAGE_BEFORE = owned_session_query(SELECT_PAGE_BEFORE, "m.created_at DESC, m.id DESC")
+DELETE_SESSION_MESSAGES = "DELETE FROM messages WHERE session_id = ?"
+COUNT_SESSION_MESSAGES = "SELECT COUNT(*) FROM messages WHERE session_id = ?"
+
+
+class SQLiteMessageRepository(SQLiteRepository):
+    """Repository for message data operations (SQLite)."""
+    
+    table_name = TableNames.MESSAGES
+    columns = TableColumns.MESSAGES
+    
+    async def create_message(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new message."""
+        try:
+            message_data["created_at"] = utc_now()
+            
+            if "metadata" not in message_data:
+                message_data["metadata"] = {}
+            
+            query, args = self._insert_sql(message_data)
+            result = self._fetchrow(query, args)
+            logger.info(f"Created message with ID: {result.get('id')}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to create message: {e}")
+            raise
+    
+    async def create_messages(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create several messages in one multi-row insert.
+        
+        Messages without a created_at are stamped in list order (see
+        stamp_in_order), so they read back in the order given.
+        
+        Args:
+            messages: Message rows, all with the same columns
+        
+        Returns:
+            IDs of the created messages, in the given order
+        """
+        if not messages:
+            return []
+        
+        try:
+            rows = stamp_in_order(messages, datetime.utcnow())
+            query, args = self._insert_many_sql(rows)
+            self._fetch(query, args)
+            ids = [row["id"] for row in rows]
+            logger.info(f"Created {len(ids)} messages")
+            
+            return ids
+            
+        except Exception as e:
+            logger.error(f"Failed to create {len(messages)} messages: {e}")
+            raise
+    
+    @staticmethod
+    def _owned_rows(rows: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
+        """Extract message rows from an owned_session_query result."""
+        if not rows:
+            raise RecordNotFoundError(f"Session {session_id} not found")
+        return [row for row in rows if row["id"] is not None]
+    
+    async def get_session_messages(
+        self, 
+        session_id: str, 
+        limit: int = 50,
+        offset: int = 0,
+        user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all messages for a session, optionally only if owned by user_id."""
+        try:
+            args = [session_id, limit, offset]
+            if user_id is None:
+                return self._fetch(SELECT_SESSION_MESSAGES, args)
+            
+            rows = self._fetch(SELECT_OWNED_SESSION_MESSAGES, args + [session_id, user_id])
+            return self._owned_rows(rows, session_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get session messages {session_id}: {e}")
+            raise
+    
+    async def get_session_tail(self, session_id: str, limit: int = 20) -> Dict[str, Any]:
+        """Get a session's context summary and newest messages in one query."""
+        try:
+            rows = self._fetch(SELECT_SESSION_TAIL, [session_id, limit, session_id])
+            return session_tail(rows, session_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get session tail {session_id}: {e}")
+            raise
+    
+    async def get_session_messages_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a page of session messages ordered by (created_at, id).
+        
+        Raises:
+            RecordNotFoundError: If user_id is given and does not own the session
+        """
+        try:
+            check_cursor_arguments(after, before)
+            cursor = after or before
+            backward = before is not None
+            owned = user_id is not None
+            
+            if cursor:
+                created_at, message_id = decode_timestamp_cursor(cursor, "created_at")
+                if backward:
+                    query = SELECT_OWNED_PAGE_BEFORE if owned else SELECT_PAGE_BEFORE
+                else:
+                    query = SELECT_OWNED_PAGE_AFTER if owned else SELECT_PAGE_AFTER
+                args = [session_id, created_at, message_id, limit + 1]
+            else:
+                query = SELECT_OWNED_PAGE_FIRST if owned else SELECT_PAGE_FIRST
+                args = [session_id, limit + 1]
+            
+            if owned:
+                rows = self._owned_rows(self._fetch(query, args + [session_id, user_id]), session_id)
+            else:
+                rows = self._fetch(query, args)
+            page = build_page(rows, limit, MESSAGE_CURSOR_FIELDS, backward, bool(cursor))
+            
+            return {
+                "messages": page["items"],
+                "next_cursor": page["next_cursor"],
+                "prev_cursor": page["prev_cursor"]
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get session messages page {session_id}: {e}")
+            raise
+    
+    async def get_message_by_id(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """Get message by ID."""
+        try:
+            return self._fetchrow(SELECT_BY_ID, [message_id])
+            
+        except Exception as e:
+            logger.error(f"Failed to get message {message_id}: {e}")
+            raise
+    
+    async def delete_session_messages(self, session_id: str) -> bool:
+        """Delete all messages for a session."""
+        try:
+            self.db.execute(DELETE_SESSION_MESSAGES, (session_id,))
+            
+            logger.info(f"Deleted messages for session {session_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to delete session messages {session_id}: {e}")
+            raise
+    
+    async def get_message_count(self, session_id: str) -> int:
+        """Get count of messages in a session."""
+        try:
+            return self.db.execute(COUNT_SESSION_MESSAGES, (session_id,)).fetchone()[0]
+            
+        except Exception as e:
+            logger.error(f"Failed to get message count for session {session_id}: {e}")
+            raise
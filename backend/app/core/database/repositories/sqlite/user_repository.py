@@ -0,0 +1,198 @@
+"""
+User repository backed by SQLite (file or in-memory).
+"""
+
+import copy
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+import structlog
+
+from app.core.database.models import RecordNotFoundError, TableNames, TableColumns
+from app.core.database.repositories.user_repository import get_user_cache
+from app.core.database.repositories.sqlite.base import SQLiteRepository, utc_now
+
+logger = structlog.get_logger(__name__)
+
+SELECT_BY_ID = "SELECT * FROM users WHERE id = ?"
+SELECT_BY_EMAIL = "SELECT * FROM users WHERE email = ?"
+DELETE_BY_ID = "DELETE FROM users WHERE id = ? RETURNING id"
+UPDATE_LAST_LOGIN = (
+    "UPDATE users SET last_login_at = ?, updated_at = ? "
+    "WHERE id = ? RETURNING *"
+)
+UPDATE_LAST_LOGIN_IF_NEWER = (
+    "UPDATE users SET last_login_at = ?1, updated_at = ?2 "
+    "WHERE id = ?3 AND (last_login_at IS NULL OR last_login_at < ?1)"
+)
+
+
+class SQLiteUserRepository(SQLiteRepository):
+    """Repository for user data operations (SQLite)."""
+    
+    table_name = TableNames.USERS
+    columns = TableColumns.USERS
+    
+    async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new user."""
+        try:
+            user_data["created_at"] = utc_now()
+            user_data["updated_at"] = utc_now()
+            
+            if "is_active" not in user_data:
+                user_data["is_active"] = True
+            if "preferences" not in user_data:
+                user_data["preferences"] = {}
+            if "preferred_agent_type" not in user_data:
+                user_data["preferred_agent_type"] = "teacher"
+            
+            query, args = self._insert_sql(user_data)
+            result = self._fetchrow(query, args)
+            
+            get_user_cache().set(result["id"], copy.deepcopy(result))
+            logger.info(f"Created user with ID: {result.get('id')}")
+            
+            return dict(result)
+            
+        except Exception as e:
+            logger.error(f"Failed to create user: {e}")
+            raise
+    
+    async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get user by ID (read-through cached)."""
+        cached = get_user_cache().get(user_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        try:
+            result = self._fetchrow(SELECT_BY_ID, [user_id])
+            
+            if not result:
+                return None
+            
+            get_user_cache().set(user_id, copy.deepcopy(result))
+            return dict(result)
+            
+        except Exception as e:
+            logger.error(f"Failed to get user {user_id}: {e}")
+            raise
+    
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get user by email."""
+        try:
+            return self._fetchrow(SELECT_BY_EMAIL, [email])
+            
+        except Exception as e:
+            logger.error(f"Failed to get user by email {email}: {e}")
+            raise
+    
+    def _update(self, user_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply an update and refresh the cached row."""
+        query, args = self._update_sql(update_data, ["id"], [user_id])
+        result = self._fetchrow(query, args)
+        
+        if not result:
+            get_user_cache().delete(user_id)
+            raise RecordNotFoundError(f"User {user_id} not found")
+        
+        get_user_cache().set(user_id, copy.deepcopy(result))
+        return dict(result)
+    
+    async def update_user(self, user_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Update user data."""
+        try:
+            result = self._update(user_id, update_data)
+            logger.info(f"Updated user {user_id}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update user {user_id}: {e}")
+            raise
+    
+    async def delete_user(self, user_id: str) -> bool:
+        """Delete user."""
+        try:
+            get_user_cache().delete(user_id)
+            deleted = self.db.execute(DELETE_BY_ID, (user_id,)).fetchone()
+            
+            if not deleted:
+                raise RecordNotFoundError(f"User {user_id} not found")
+            
+            logger.info(f"Deleted user {user_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to delete user {user_id}: {e}")
+            raise
+    
+    async def update_last_login(self, user_id: str) -> Dict[str, Any]:
+        """Update user's last login timestamp."""
+        try:
+            now = utc_now()
+            result = self._fetchrow(UPDATE_LAST_LOGIN, [now, now, user_id])
+            
+            if not result:
+                get_user_cache().delete(user_id)
+                raise RecordNotFoundError(f"User {user_id} not found")
+            
+            get_user_cache().set(user_id, copy.deepcopy(result))
+            logger.info(f"Updated last login for user {user_id}")
+            
+            return dict(result)
+            
+        except Exception as e:
+            logger.error(f"Failed to update last login for user {user_id}: {e}")
+            raise
+    
+    async def update_last_login_batch(self, updates: Dict[str, datetime]) -> int:
+        """
+        Write many last login timestamps in one transaction.
+        
+        Args:
+            updates: Mapping of user ID to last login time
+        
+        Returns:
+            Number of users updated
+        """
+        if not updates:
+            return 0
+        
+        try:
+            now = utc_now()
+            rows = [
+                (self._param("last_login_at", login_at), now, user_id)
+                for user_id, login_at in updates.items()
+            ]
+            
+            self.db.execute("BEGIN")
+            try:
+                cursor = self.db.executemany(UPDATE_LAST_LOGIN_IF_NEWER, rows)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            
+            logger.info(f"Flushed last login for {cursor.rowcount} users")
+            return cursor.rowcount
+            
+        except Exception as e:
+            logger.error(f"Failed to flush last login batch: {e}")
+            raise
+    
+    async def update_preferences(self, user_id: str, preferences: Dict[str, Any]) -> Dict[str, Any]:
+        """Update user preferences."""
+        try:
+            update_data = {"preferences": preferences}
+            
+            if "preferred_agent_type" in preferences:
+                update_data["preferred_agent_type"] = preferences["preferred_agent_type"]
+            
+            result = self._update(user_id, update_data)
+            logger.info(f"Updated preferences for user {user_id}")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update preferences for user {user_id}: {e}")
+            raise
@@ -2,28 +2,46 @@
 User repository for managing user data.
 """
 
+import copy
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from supabase import Client
+    from supabase import AsyncClient
 import structlog
 
+from app.config import get_settings
 from app.core.database.models import (
     RecordNotFoundError, 
     serialize_for_db, 
     handle_supabase_response,
     TableNames
 )
+from app.utils.cache import TTLCache
 
 logger = structlog.get_logger(__name__)
+settings = get_settings()
+
+# User rows keyed by user ID, shared by all repository instances in the process.
+# Rows go in and come out as deep copies, so callers never share nested
+# values (e.g. preferences) with the cache.
+_user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    name="users",
+)
+
+
+def get_user_cache() -> TTLCache:
+    """Get the user record cache (for stats and tests)."""
+    return _user_cache
 
 
 class UserRepository:
     """Repository for user data operations."""
     
-    def __init__(self, db_client: Client):
+    def __init__(self, db_client: "AsyncClient"):
         self.db = db_client
         self.table_name = TableNames.USERS
     
@@ -42,26 +60,32 @@ class UserRepository:
                 user_data["preferred_agent_type"] = "teacher"
             
             serialized_data = serialize_for_db(user_data)
-            response = self.db.table(self.table_name).insert(serialized_data).execute()
+            response = await self.db.table(self.table_name).insert(serialized_data).execute()
             
             result = handle_supabase_response(response)
+            _user_cache.set(result["id"], copy.deepcopy(result))
             logger.info(f"Created user with ID: {result.get('id')}")
             
-            return result
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Failed to create user: {e}")
             raise
 
     async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user by ID."""
+        """Get user by ID (read-through cached)."""
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
         try:
-            response = self.db.table(self.table_name).select("*").eq("id", user_id).execute()
+            response = await self.db.table(self.table_name).select("*").eq("id", user_id).execute()
             
             if not response.data:
                 return None
             
-            return response.data[0]
+            _user_cache.set(user_id, copy.deepcopy(response.data[0]))
+            return dict(response.data[0])
             
         except Exception as e:
             logger.error(f"Failed to get user {user_id}: {e}")
@@ -70,7 +94,7 @@ class UserRepository:
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email."""
         try:
-            response = self.db.table(self.table_name).select("*").eq("email", email).execute()
+            response = await self.db.table(self.table_name).select("*").eq("email", email).execute()
             
             if not response.data:
                 return None
@@ -87,7 +111,7 @@ class UserRepository:
             update_data["updated_at"] = datetime.utcnow().isoformat()
             serialized_data = serialize_for_db(update_data)
             
-            response = (
+            response = await (
                 self.db.table(self.table_name)
                 .update(serialized_data)
                 .eq("id", user_id)
@@ -95,12 +119,14 @@ class UserRepository:
             )
             
             if not response.data:
+                _user_cache.delete(user_id)
                 raise RecordNotFoundError(f"User {user_id} not found")
             
             result = handle_supabase_response(response)
+            _user_cache.set(user_id, copy.deepcopy(result))
             logger.info(f"Updated user {user_id}")
             
-            return result
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Failed to update user {user_id}: {e}")
@@ -109,7 +135,8 @@ class UserRepository:
     async def delete_user(self, user_id: str) -> bool:
         """Delete user."""
         try:
-            response = self.db.table(self.table_name).delete().eq("id", user_id).execute()
+            _user_cache.delete(user_id)
+            response = await self.db.table(self.table_name).delete().eq("id", user_id).execute()
             
             if not response.data:
                 raise RecordNotFoundError(f"User {user_id} not found")
@@ -131,7 +158,7 @@ class UserRepository:
             
             serialized_data = serialize_for_db(update_data)
             
-            response = (
+            response = await (
                 self.db.table(self.table_name)
                 .update(serialized_data)
                 .eq("id", user_id)
@@ -139,17 +166,49 @@ class UserRepository:
             )
             
             if not response.data:
+                _user_cache.delete(user_id)
                 raise RecordNotFoundError(f"User {user_id} not found")
             
             result = handle_supabase_response(response)
+            _user_cache.set(user_id, copy.deepcopy(result))
             logger.info(f"Updated last login for user {user_id}")
             
-            return result
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Failed to update last login for user {user_id}: {e}")
             raise
 
+    async def update_last_login_batch(self, updates: Dict[str, datetime]) -> int:
+        """
+        Write many last login timestamps in one statement.
+        
+        Args:
+            updates: Mapping of user ID to last login time
+        
+        Returns:
+            Number of users updated
+        """
+        if not updates:
+            return 0
+        
+        try:
+            payload = [
+                {"id": user_id, "last_login_at": login_at.isoformat()}
+                for user_id, login_at in updates.items()
+            ]
+            
+            response = await self.db.rpc("update_users_last_login", {"updates": payload}).execute()
+            
+            updated = response.data or 0
+            logger.info(f"Flushed last login for {updated} users")
+            
+            return updated
+            
+        except Exception as e:
+            logger.error(f"Failed to flush last login batch: {e}")
+            raise
+    
     async def update_preferences(self, user_id: str, preferences: Dict[str, Any]) -> Dict[str, Any]:
         """Update user preferences."""
         try:
@@ -163,7 +222,7 @@ class UserRepository:
             
             serialized_data = serialize_for_db(update_data)
             
-            response = (
+            response = await (
                 self.db.table(self.table_name)
                 .update(serialized_data)
                 .eq("id", user_id)
@@ -171,12 +230,14 @@ class UserRepository:
             )
             
             if not response.data:
+                _user_cache.delete(user_id)
                 raise RecordNotFoundError(f"User {user_id} not found")
             
             result = handle_supabase_response(response)
+            _user_cache.set(user_id, copy.deepcopy(result))
             logger.info(f"Updated preferences for user {user_id}")
             
-            return result
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Failed to update preferences for user {user_id}: {e}")
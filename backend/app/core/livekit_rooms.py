@@ -0,0 +1,240 @@
+"""
+LiveKit room management for session-scoped rooms.
+
+Each session maps to one stable room name, so a refresh or reconnect for
+the same session lands in the room whose agent job is already running
+instead of dispatching a fresh agent (new Gemini session, new avatar,
+new greeting).
+
+Rooms are created at token time with agent_type/session_id metadata and
+an explicit agent dispatch, so the agent job starts warming up while the
+browser is still connecting.
+"""
+
+import asyncio
+import json
+import weakref
+from typing import Optional
+
+import aiohttp
+import structlog
+from livekit.api import (
+    CreateAgentDispatchRequest,
+    CreateRoomRequest,
+    DeleteRoomRequest,
+    JobStatus,
+    ListParticipantsRequest,
+    LiveKitAPI,
+    ParticipantInfo,
+    RoomAgentDispatch,
+    TwirpError,
+    TwirpErrorCode,
+    UpdateRoomMetadataRequest,
+)
+
+from app.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+ROOM_NAME_PREFIX = "mirage_"
+
+
+def room_name_for_session(session_id: str) -> str:
+    """
+    Stable LiveKit room name for a session.
+
+    Session IDs are UUIDs, so names never collide across sessions and
+    concurrent token requests for one session agree on the same room.
+    """
+    return f"{ROOM_NAME_PREFIX}{session_id}"
+
+
+# Singleton pattern
+_livekit_api: Optional[LiveKitAPI] = None
+
+
+def get_livekit_api() -> LiveKitAPI:
+    """
+    Get the LiveKit server API client (singleton).
+
+    Must be called from a running event loop (the client owns an aiohttp
+    session).
+    """
+    global _livekit_api
+    if _livekit_api is None:
+        settings = get_settings()
+        _livekit_api = LiveKitAPI(
+            url=settings.LIVEKIT_URL,
+            api_key=settings.LIVEKIT_API_KEY,
+            api_secret=settings.LIVEKIT_API_SECRET,
+            timeout=aiohttp.ClientTimeout(total=settings.LIVEKIT_API_TIMEOUT_SECONDS),
+        )
+    return _livekit_api
+
+
+async def close_livekit_api():
+    """Close the LiveKit API client (call on shutdown)."""
+    global _livekit_api
+    if _livekit_api is not None:
+        await _livekit_api.aclose()
+        _livekit_api = None
+
+
+async def room_has_agent(room_name: str) -> Optional[bool]:
+    """
+    Check whether a room is live and has an agent participant.
+
+    Returns:
+        None if the room does not exist, otherwise whether an agent is in it
+
+    Raises:
+        TwirpError: If the LiveKit API call fails
+    """
+    try:
+        response = await get_livekit_api().room.list_participants(
+            ListParticipantsRequest(room=room_name)
+        )
+    except TwirpError as e:
+        if e.code == TwirpErrorCode.NOT_FOUND:
+            return None
+        raise
+
+    return any(p.kind == ParticipantInfo.Kind.AGENT for p in response.participants)
+
+
+async def delete_session_room(room_name: str):
+    """
+    Delete a room (and disconnect its participants), if it exists.
+
+    Raises:
+        TwirpError: If the LiveKit API call fails
+    """
+    try:
+        await get_livekit_api().room.delete_room(DeleteRoomRequest(room=room_name))
+    except TwirpError as e:
+        if e.code != TwirpErrorCode.NOT_FOUND:
+            raise
+
+
+def room_metadata(session_id: str, agent_type: str, new_session: bool = False) -> str:
+    """
+    Room and dispatch metadata read by the agent worker.
+
+    new_session tells the agent there is no stored conversation to resume
+    (the session row may not even be committed yet).
+    """
+    return json.dumps({"agent_type": agent_type, "session_id": session_id, "new_session": new_session})
+
+
+# Per-room locks for ensure_session_room; a lock is dropped once no request
+# holds or waits for it
+_room_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _room_lock(room_name: str) -> asyncio.Lock:
+    """Lock serializing room setup for one room in this process."""
+    lock = _room_locks.get(room_name)
+    if lock is None:
+        lock = asyncio.Lock()
+        _room_locks[room_name] = lock
+    return lock
+
+
+async def _dispatch_in_progress(room_name: str, agent_name: str) -> bool:
+    """Whether an agent job for the room is pending or running but not joined yet."""
+    dispatches = await get_livekit_api().agent_dispatch.list_dispatch(room_name)
+    return any(
+        job.state.status in (JobStatus.JS_PENDING, JobStatus.JS_RUNNING)
+        for dispatch in dispatches
+        if dispatch.agent_name == agent_name
+        for job in dispatch.state.jobs
+    )
+
+
+async def ensure_session_room(
+    room_name: str,
+    session_id: str,
+    agent_type: str,
+    agent_present: Optional[bool],
+    new_session: bool = False,
+) -> bool:
+    """
+    Make sure a session room exists and has (or is getting) its agent.
+
+    - Live room with its agent: reused as is.
+    - No room: created with metadata and, when LIVEKIT_AGENT_NAME is set,
+      an explicit agent dispatch in the same call.
+    - Live room without an agent: metadata is refreshed and a new agent is
+      dispatched, unless one is already on its way. With automatic
+      dispatch the room is recreated instead, since unnamed agents are
+      only dispatched when a room is created.
+
+    Setup of one room is serialized, so concurrent token requests for a
+    session (a double-mounted client, a quick refresh) see each other's
+    dispatch instead of both dispatching an agent. Requests served by
+    different processes can still race; the agent job resolves those by
+    leaving a room that already has an agent (see agent/worker.py).
+
+    Args:
+        room_name: Session room name
+        session_id: Session the room belongs to
+        agent_type: Agent personality for the session
+        agent_present: Result of room_has_agent for the room
+        new_session: Whether the session is being created with the room
+
+    Returns:
+        True if the running agent will be reused
+
+    Raises:
+        TwirpError: If a LiveKit API call fails
+    """
+    if agent_present:
+        logger.info(f"Reusing live room {room_name} with its agent")
+        return True
+
+    async with _room_lock(room_name):
+        return await _prepare_room(room_name, session_id, agent_type, agent_present, new_session)
+
+
+async def _prepare_room(
+    room_name: str,
+    session_id: str,
+    agent_type: str,
+    agent_present: Optional[bool],
+    new_session: bool,
+) -> bool:
+    """Create or refresh a room without a running agent (see ensure_session_room)."""
+    settings = get_settings()
+    agent_name = settings.LIVEKIT_AGENT_NAME
+    metadata = room_metadata(session_id, agent_type, new_session)
+    api = get_livekit_api()
+
+    if agent_present is False:
+        if agent_name:
+            await api.room.update_room_metadata(
+                UpdateRoomMetadataRequest(room=room_name, metadata=metadata)
+            )
+            if await _dispatch_in_progress(room_name, agent_name):
+                logger.info(f"Agent for room {room_name} is already starting")
+            else:
+                await api.agent_dispatch.create_dispatch(
+                    CreateAgentDispatchRequest(agent_name=agent_name, room=room_name, metadata=metadata)
+                )
+                logger.info(f"Dispatched {agent_name} to existing room {room_name}")
+            return False
+
+        logger.info(f"Room {room_name} has no agent, recreating it")
+        await delete_session_room(room_name)
+
+    agents = [RoomAgentDispatch(agent_name=agent_name, metadata=metadata)] if agent_name else []
+    await api.room.create_room(
+        CreateRoomRequest(
+            name=room_name,
+            metadata=metadata,
+            empty_timeout=settings.LIVEKIT_ROOM_EMPTY_TIMEOUT_SECONDS,
+            agents=agents,
+        )
+    )
+    logger.info(f"Created room {room_name} ({agent_name or 'automatic'} dispatch)")
+
+    return False
@@ -14,6 +14,10 @@ from fastapi.responses import JSONResponse
 from datetime import datetime
 
 from app.config import get_settings
+from app.api.dependencies import get_user_repository
+from app.core.database.connection import close_postgres_pool
+from app.core.database.last_login import get_last_login_buffer
+from app.core.livekit_rooms import close_livekit_api
 from app.utils.logging import configure_logging, get_logger
 from app.api.endpoints import health, auth, users, sessions, livekit, agents
 
@@ -109,6 +113,9 @@ async def startup_event():
     logger.info("=" * 60)
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug: {settings.DEBUG}")
+    logger.info(f"Database backend: {settings.DATABASE_BACKEND}")
+    if settings.AUTH_VALIDATOR == "fake":
+        logger.warning("⚠️  AUTH_VALIDATOR=fake: any bearer token is accepted")
     logger.info(f"Supabase: {'✅ Configured' if settings.supabase_configured else '❌ Not configured'}")
     logger.info(f"LiveKit: {'✅ Configured' if settings.livekit_configured else '❌ Not configured'}")
     logger.info(f"Gemini: {'✅ Configured' if settings.GOOGLE_API_KEY else '❌ Not configured'}")
@@ -122,6 +129,9 @@ async def startup_event():
     logger.info("  POST /api/v1/livekit/token")
     logger.info("  GET  /api/v1/agents/")
     logger.info("=" * 60)
+    
+    # Start write-behind flushing of last login times
+    get_last_login_buffer().start(get_user_repository)
 
 
 # Shutdown event
@@ -129,6 +139,15 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown."""
     logger.info("🛑 Mirage API Shutting Down")
+    
+    # Flush buffered last login times
+    await get_last_login_buffer().stop()
+    
+    # Close direct Postgres connections (DATABASE_BACKEND=postgres)
+    await close_postgres_pool()
+    
+    # Close the LiveKit server API client
+    await close_livekit_api()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""
+Fake token validation for local load testing.
+
+Enabled with AUTH_VALIDATOR=fake. Any bearer token is accepted and mapped
+to a deterministic user, so load generators can simulate many users by
+sending different tokens. Never enabled in production.
+"""
+
+import uuid
+from typing import Dict, Any
+
+from app.config import get_settings
+from app.utils.supabase_auth import SupabaseAuthError
+
+# Namespace for deriving stable user IDs from fake tokens
+FAKE_USER_NAMESPACE = uuid.UUID("6d1e4c52-3f0b-4f5e-9a51-6b2f0e6d7a10")
+
+
+def validate_fake_token(token: str) -> Dict[str, Any]:
+    """
+    Accept any token and return a deterministic test user.
+    
+    Args:
+        token: Arbitrary bearer token (the same token always maps to the same user)
+        
+    Returns:
+        Dictionary shaped like validate_supabase_token output
+        
+    Raises:
+        SupabaseAuthError: In production, or for an empty token
+    """
+    if get_settings().is_production:
+        raise SupabaseAuthError("Fake token validation is disabled in production")
+    
+    if not token:
+        raise SupabaseAuthError("Invalid token")
+    
+    user_id = str(uuid.uuid5(FAKE_USER_NAMESPACE, token))
+    
+    return {
+        "id": user_id,
+        "email": f"{user_id[:8]}@loadtest.mirage.local",
+        "email_confirmed_at": None,
+        "created_at": None,
+        "user_metadata": {"full_name": f"Load Test {user_id[:8]}"},
+        "app_metadata": {}
+    }
+
+
+__all__ = ["validate_fake_token"]
@@ -3,6 +3,8 @@ Supabase authentication utilities for validating frontend tokens.
 """
 
 import jwt
+import hashlib
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime
 
@@ -17,6 +19,7 @@ except ImportError:
 from app.config import get_settings
 from app.utils.logging import get_logger
 from app.utils.errors import AuthenticationError
+from app.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -24,12 +27,30 @@ settings = get_settings()
 # Global Supabase client for auth
 _supabase_client: Optional["Client"] = None
 
+# Validated tokens keyed by SHA-256 of the token. Values are
+# (user_data, None) for valid tokens and (None, error) for rejected ones
+# (tokens that could not be checked are not cached).
+_token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+    name="tokens",
+)
+
 
 class SupabaseAuthError(AuthenticationError):
     """Specific error for Supabase authentication issues."""
     pass
 
 
+class SupabaseAuthUnavailableError(SupabaseAuthError):
+    """The token could not be checked (Supabase unreachable or not configured)."""
+    pass
+
+
+# Supabase Auth responses that reject the token itself
+REJECTED_TOKEN_STATUSES = (401, 403, 404)
+
+
 def get_supabase_client() -> Optional[Client]:
     """
     Get Supabase client for token validation.
@@ -53,86 +74,266 @@ def get_supabase_client() -> Optional[Client]:
         return None
 
 
-def validate_supabase_token(token: str) -> Dict[str, Any]:
+# Algorithms accepted for locally verified tokens
+HMAC_ALGORITHMS = ["HS256"]
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256", "EdDSA"]
+
+# Cached JWKS client for asymmetric token verification
+_jwks_client: Optional[jwt.PyJWKClient] = None
+
+
+def get_jwks_client() -> Optional[jwt.PyJWKClient]:
+    """
+    Get JWKS client for verifying asymmetrically signed tokens.
+    
+    The key set is cached in-process and refetched once it is older than
+    SUPABASE_JWKS_CACHE_SECONDS, or when a token names an unknown key id.
+    
+    Returns:
+        JWKS client instance or None if no JWKS endpoint is configured
+    """
+    global _jwks_client
+    
+    if _jwks_client is not None:
+        return _jwks_client
+    
+    jwks_url = settings.supabase_jwks_url
+    if not jwks_url:
+        return None
+    
+    _jwks_client = jwt.PyJWKClient(
+        jwks_url,
+        cache_jwk_set=True,
+        lifespan=settings.SUPABASE_JWKS_CACHE_SECONDS,
+        cache_keys=True,
+    )
+    logger.info(f"JWKS client initialized for {jwks_url}")
+    return _jwks_client
+
+
+def _get_jwt_secret() -> str:
+    """Get the configured HS256 secret without surrounding quotes."""
+    return settings.SUPABASE_JWT_SECRET.strip().strip('"').strip("'")
+
+
+def _user_data_from_claims(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Build user data from verified JWT claims."""
+    user_data = {
+        "id": payload.get("sub"),
+        "email": payload.get("email"),
+        "email_confirmed_at": payload.get("email_confirmed_at"),
+        "created_at": payload.get("created_at"),
+        "user_metadata": payload.get("user_metadata", {}),
+        "app_metadata": payload.get("app_metadata", {}),
+        "exp": payload.get("exp"),
+    }
+    
+    if not user_data["id"] or not user_data["email"]:
+        raise SupabaseAuthError("Invalid user data in token")
+    
+    return user_data
+
+
+def _verify_token_locally(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a token signature and claims without calling Supabase.
+    
+    Args:
+        token: JWT token from Supabase frontend
+        
+    Returns:
+        Validated user data, or None if no key is available to verify it
+        
+    Raises:
+        SupabaseAuthError: If token is invalid or expired
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError as e:
+        raise SupabaseAuthError(f"Invalid JWT token: {str(e)}")
+    
+    algorithm = header.get("alg")
+    
+    if algorithm in HMAC_ALGORITHMS:
+        key = _get_jwt_secret()
+        if not key:
+            return None
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        jwks_client = get_jwks_client()
+        if not jwks_client:
+            return None
+        try:
+            key = jwks_client.get_signing_key_from_jwt(token).key
+        except jwt.PyJWKClientError as e:
+            logger.warning(f"JWKS key lookup failed: {e}")
+            return None
+    else:
+        raise SupabaseAuthError(f"Unsupported token algorithm: {algorithm}")
+    
+    try:
+        payload = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=settings.SUPABASE_JWT_AUDIENCE or None,
+            options={"verify_exp": True, "require": ["exp", "sub"]}
+        )
+    except jwt.ExpiredSignatureError:
+        raise SupabaseAuthError("Token has expired")
+    except jwt.InvalidTokenError as e:
+        raise SupabaseAuthError(f"Invalid JWT token: {str(e)}")
+    
+    return _user_data_from_claims(payload)
+
+
+def _verify_token_remotely(token: str) -> Dict[str, Any]:
+    """
+    Verify a token with Supabase Auth (network round trip).
+    
+    Unlike local verification this also rejects tokens whose session
+    was revoked before the token expired.
+    
+    Raises:
+        SupabaseAuthError: If Supabase rejects the token
+        SupabaseAuthUnavailableError: If Supabase is unreachable
+    """
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        raise SupabaseAuthUnavailableError("Supabase client not available")
+    
+    try:
+        user_response = supabase_client.auth.get_user(token)
+    except Exception as supabase_error:
+        logger.warning(f"Supabase client validation failed: {supabase_error}")
+        if getattr(supabase_error, "status", None) in REJECTED_TOKEN_STATUSES:
+            raise SupabaseAuthError("Token rejected by Supabase")
+        raise SupabaseAuthUnavailableError("Unable to validate token")
+    
+    if not user_response or not user_response.user:
+        raise SupabaseAuthError("User not found for token")
+    
+    return {
+        "id": user_response.user.id,
+        "email": user_response.user.email,
+        "email_confirmed_at": user_response.user.email_confirmed_at,
+        "created_at": user_response.user.created_at,
+        "updated_at": user_response.user.updated_at,
+        "user_metadata": user_response.user.user_metadata or {},
+        "app_metadata": user_response.user.app_metadata or {}
+    }
+
+
+def validate_supabase_token(token: str, strict: Optional[bool] = None) -> Dict[str, Any]:
     """
     Validate a Supabase JWT token and extract user information.
     
+    Tokens are verified locally first (HS256 with SUPABASE_JWT_SECRET, or
+    the project's JWKS for asymmetric keys). Supabase Auth is only called
+    when no key is available locally, or on every request in strict mode.
+    
     Args:
         token: JWT token from Supabase frontend
+        strict: Confirm with Supabase Auth to catch revoked sessions.
+            Defaults to SUPABASE_JWT_VERIFY_MODE == "strict".
         
     Returns:
         Dictionary containing validated user information
         
     Raises:
         SupabaseAuthError: If token is invalid or expired
+        SupabaseAuthUnavailableError: If the token could not be checked
     """
+    if strict is None:
+        strict = settings.strict_token_verification
+    
     try:
         logger.debug("Starting Supabase token validation")
         
-        supabase_client = get_supabase_client()
-        if not supabase_client:
-            raise SupabaseAuthError("Supabase client not available")
+        # Method 1: Local signature verification (no network)
+        user_data = _verify_token_locally(token)
         
-        # Method 1: Use Supabase client to validate token
-        try:
-            user_response = supabase_client.auth.get_user(token)
-            
-            if user_response.user:
-                user_data = {
-                    "id": user_response.user.id,
-                    "email": user_response.user.email,
-                    "email_confirmed_at": user_response.user.email_confirmed_at,
-                    "created_at": user_response.user.created_at,
-                    "updated_at": user_response.user.updated_at,
-                    "user_metadata": user_response.user.user_metadata or {},
-                    "app_metadata": user_response.user.app_metadata or {}
-                }
-                
-                logger.info(f"Token validated for user: {user_data['email']}")
-                return user_data
-                
-        except Exception as supabase_error:
-            logger.warning(f"Supabase client validation failed: {supabase_error}")
+        if user_data and not strict:
+            logger.debug(f"Token verified locally for user: {user_data['email']}")
+            return user_data
         
-        # Method 2: Manual JWT validation (backup)
-        if settings.SUPABASE_JWT_SECRET:
-            try:
-                jwt_secret = settings.SUPABASE_JWT_SECRET.strip().strip('"').strip("'")
-                
-                payload = jwt.decode(
-                    token,
-                    jwt_secret,
-                    algorithms=["HS256"],
-                    options={"verify_exp": True}
-                )
-                
-                user_data = {
-                    "id": payload.get("sub"),
-                    "email": payload.get("email"),
-                    "email_confirmed_at": payload.get("email_confirmed_at"),
-                    "created_at": payload.get("created_at"),
-                    "user_metadata": payload.get("user_metadata", {}),
-                    "app_metadata": payload.get("app_metadata", {})
-                }
-                
-                if not user_data["id"] or not user_data["email"]:
-                    raise SupabaseAuthError("Invalid user data in token")
-                
-                logger.info(f"Manual JWT validation successful for: {user_data['email']}")
-                return user_data
-                
-            except jwt.ExpiredSignatureError:
-                raise SupabaseAuthError("Token has expired")
-            except jwt.InvalidTokenError as e:
-                raise SupabaseAuthError(f"Invalid JWT token: {str(e)}")
+        # Method 2: Supabase Auth (strict mode, or no local key material)
+        remote_user = _verify_token_remotely(token)
+        if user_data:
+            remote_user["exp"] = user_data["exp"]
         
-        raise SupabaseAuthError("Unable to validate token")
+        logger.info(f"Token validated for user: {remote_user['email']}")
+        return remote_user
         
     except SupabaseAuthError:
         raise
     except Exception as e:
         logger.error(f"Unexpected error validating token: {str(e)}")
-        raise SupabaseAuthError(f"Token validation failed: {str(e)}")
+        raise SupabaseAuthUnavailableError(f"Token validation failed: {str(e)}")
+
+
+def get_token_cache() -> TTLCache:
+    """Get the validated token cache (for stats and tests)."""
+    return _token_cache
+
+
+def _token_cache_key(token: str) -> str:
+    """Hash tokens so raw credentials are never kept in memory as keys."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _token_expiry(token: str, user_data: Dict[str, Any]) -> Optional[float]:
+    """Get the token's exp claim as a UNIX timestamp, if any."""
+    exp = user_data.get("exp")
+    if exp is None:
+        try:
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.InvalidTokenError:
+            return None
+    try:
+        return float(exp)
+    except (TypeError, ValueError):
+        return None
+
+
+def validate_supabase_token_cached(token: str) -> Dict[str, Any]:
+    """
+    Validate a token, reusing recent results for the same token.
+    
+    Valid tokens are cached for TOKEN_CACHE_TTL_SECONDS but never past
+    their exp claim. Rejected tokens (bad signature, expired, wrong
+    audience, unknown user) are cached for TOKEN_NEGATIVE_CACHE_SECONDS so
+    repeated bad tokens are not re-verified (or sent to Supabase) on every
+    request. Tokens that could not be checked are not cached, so a Supabase
+    outage does not lock users out past the outage.
+    
+    Raises:
+        SupabaseAuthError: If token is invalid or expired
+        SupabaseAuthUnavailableError: If the token could not be checked
+    """
+    key = _token_cache_key(token)
+    cached = _token_cache.get(key)
+    
+    if cached is not None:
+        user_data, error = cached
+        if error is not None:
+            raise SupabaseAuthError(error)
+        return user_data
+    
+    try:
+        user_data = validate_supabase_token(token)
+    except SupabaseAuthUnavailableError:
+        raise
+    except SupabaseAuthError as e:
+        _token_cache.set(key, (None, str(e)), ttl_seconds=settings.TOKEN_NEGATIVE_CACHE_SECONDS)
+        raise
+    
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    expires_at = _token_expiry(token, user_data)
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    
+    _token_cache.set(key, (user_data, None), ttl_seconds=ttl)
+    return user_data
 
 
 def extract_user_profile(supabase_user: Dict[str, Any]) -> Dict[str, Any]:
@@ -177,7 +378,11 @@ def test_supabase_connection() -> bool:
 
 __all__ = [
     "validate_supabase_token",
+    "validate_supabase_token_cached",
+    "get_token_cache",
+    "get_jwks_client",
     "extract_user_profile",
     "test_supabase_connection",
-    "SupabaseAuthError"
+    "SupabaseAuthError",
+    "SupabaseAuthUnavailableError"
 ]
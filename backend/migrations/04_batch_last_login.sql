@@ -0,0 +1,25 @@
+-- =============================================================================
+-- MIRAGE - Batched last login updates
+-- Run this in Supabase SQL Editor AFTER 03_messages_table.sql
+-- =============================================================================
+
+-- Apply many last_login_at updates in one statement.
+-- updates: [{"id": "<uuid>", "last_login_at": "<timestamptz>"}, ...]
+-- Timestamps never move backwards, so out-of-order flushes are harmless.
+CREATE OR REPLACE FUNCTION update_users_last_login(updates JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE users AS u
+        SET last_login_at = GREATEST(u.last_login_at, v.last_login_at),
+            updated_at = NOW()
+        FROM jsonb_to_recordset(updates) AS v(id UUID, last_login_at TIMESTAMPTZ)
+        WHERE u.id = v.id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$;
+
+-- Add comment
+COMMENT ON FUNCTION update_users_last_login(JSONB) IS 'Batched write-behind flush of users.last_login_at';
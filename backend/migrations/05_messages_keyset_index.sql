@@ -0,0 +1,12 @@
+-- =============================================================================
+-- MIRAGE - Message keyset pagination index
+-- Run this in Supabase SQL Editor AFTER 04_batch_last_login.sql
+-- =============================================================================
+
+-- Serves GET /sessions/{id}/messages cursors: WHERE session_id = ? AND
+-- (created_at, id) > (?, ?) ORDER BY created_at, id, in both directions
+CREATE INDEX IF NOT EXISTS idx_messages_session_created_id
+    ON messages(session_id, created_at, id);
+
+-- Superseded by the composite index above
+DROP INDEX IF EXISTS idx_messages_session_id;
@@ -0,0 +1,13 @@
+-- =============================================================================
+-- MIRAGE - Session list index
+-- Run this in Supabase SQL Editor AFTER 05_messages_keyset_index.sql
+-- =============================================================================
+
+-- Serves GET /sessions/ and GET /livekit/rooms: WHERE user_id = ? AND
+-- status = ? ORDER BY last_activity_at DESC, id DESC, with keyset cursors
+-- on (last_activity_at, id)
+CREATE INDEX IF NOT EXISTS idx_sessions_user_status_activity
+    ON sessions(user_id, status, last_activity_at DESC, id DESC);
+
+-- Superseded by the composite index above
+DROP INDEX IF EXISTS idx_sessions_user_id;
@@ -0,0 +1,8 @@
+-- =============================================================================
+-- MIRAGE - Session metrics
+-- Run this in Supabase SQL Editor AFTER 06_sessions_list_index.sql
+-- =============================================================================
+
+-- Voice latency, interruption and token usage summary written by the
+-- agent worker when the session's job ends
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS metrics JSONB DEFAULT '{}'::jsonb;
@@ -0,0 +1,8 @@
+-- =============================================================================
+-- MIRAGE - Session context summary
+-- Run this in Supabase SQL Editor AFTER 07_sessions_metrics.sql
+-- =============================================================================
+
+-- Running summary of the conversation's older turns, written by the agent
+-- worker when it compacts a long session's context
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS context_summary TEXT;
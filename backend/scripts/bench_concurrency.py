@@ -0,0 +1,111 @@
+"""
+Concurrency benchmark for the Mirage API.
+
+Runs N parallel clients against a running backend for a fixed duration
+and reports requests/sec and latency percentiles. Run it once against
+the old build and once against the new one to compare.
+
+Usage:
+    uvicorn app.main:app --port 8000 --workers 1   # in another terminal
+    python scripts/bench_concurrency.py --token <JWT>
+    python scripts/bench_concurrency.py --token <JWT> --clients 1,10,50 --path /api/v1/sessions/
+    python scripts/bench_concurrency.py --token <JWT> --method POST --path /api/v1/livekit/token \\
+        --body '{"agent_type": "teacher"}'
+
+A real access token can be obtained with scripts/create_test_user.py.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, List, Optional
+
+import httpx
+
+
+async def client_loop(
+    http: httpx.AsyncClient,
+    method: str,
+    path: str,
+    body: Any,
+    deadline: float,
+    latencies: List[float],
+    errors: List[int],
+):
+    """Issue requests back to back until the deadline."""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await http.request(method, path, json=body)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_level(
+    base_url: str,
+    method: str,
+    path: str,
+    body: Any,
+    token: Optional[str],
+    clients: int,
+    duration: float,
+):
+    """Run one concurrency level and print a result line."""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    
+    latencies: List[float] = []
+    errors: List[int] = []
+    
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30.0) as http:
+        # Warm up connections, caches and lazily created clients
+        await http.request(method, path, json=body)
+        
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[
+            client_loop(http, method, path, body, deadline, latencies, errors)
+            for _ in range(clients)
+        ])
+    
+    if not latencies:
+        print(f"clients={clients:<4} no successful requests ({len(errors)} errors, e.g. {errors[:1]})")
+        return
+    
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"clients={clients:<4} rps={len(latencies) / duration:9.1f}  "
+        f"p50={p50:8.2f} ms  p99={p99:8.2f} ms  errors={len(errors)}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Backend base URL")
+    parser.add_argument("--path", default="/api/v1/auth/me", help="Endpoint to hit")
+    parser.add_argument("--method", default="GET", help="HTTP method")
+    parser.add_argument("--body", help="JSON request body")
+    parser.add_argument("--token", help="Bearer token for authenticated endpoints")
+    parser.add_argument("--clients", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    args = parser.parse_args()
+    body = json.loads(args.body) if args.body else None
+    
+    print("=" * 60)
+    print(f"Concurrency benchmark: {args.method} {args.url}{args.path}")
+    print("=" * 60)
+    
+    for clients in [int(c) for c in args.clients.split(",")]:
+        await run_level(args.url, args.method, args.path, body, args.token, clients, args.duration)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark message inserts: one create_message call per message versus
+create_messages batches.
+
+Inserts the same number of messages at batch sizes 1, 10 and 100 against
+the configured DATABASE_BACKEND and prints the cost per message. Batch
+size 1 with create_message is what a transcript producer paid before the
+bulk API (one round trip per utterance).
+
+Usage:
+    DATABASE_BACKEND=postgres DATABASE_URL=postgresql://... python scripts/bench_message_insert.py
+    DATABASE_BACKEND=sqlite python scripts/bench_message_insert.py --messages 5000
+    DATABASE_BACKEND=sqlite python scripts/bench_message_insert.py --sqlite-path /tmp/bench.db
+
+The sqlite backend writes to a temporary database file (removed afterwards)
+unless --sqlite-path is given, so a run never touches SQLITE_PATH.
+    python scripts/bench_message_insert.py --batch-sizes 1,10,100,500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from typing import List
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.api.dependencies import get_message_repository, get_session_repository, get_user_repository
+from app.core.database.connection import close_postgres_pool, reset_database_client
+
+
+def make_messages(session_id: str, count: int) -> List[dict]:
+    """Alternating user/assistant messages of typical utterance length."""
+    return [
+        {
+            "session_id": session_id,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Utterance {i}: " + "lorem ipsum dolor sit amet " * 4,
+        }
+        for i in range(count)
+    ]
+
+
+def report(label: str, batch_size: int, batch_ms: List[float]):
+    """Print per-batch and per-message latency."""
+    batch_ms.sort()
+    p50 = statistics.median(batch_ms)
+    p99 = batch_ms[min(len(batch_ms) - 1, int(len(batch_ms) * 0.99))]
+    per_message_us = sum(batch_ms) / (len(batch_ms) * batch_size) * 1000
+    print(
+        f"{label:<16} batch={batch_size:<4} p50={p50:8.3f} ms  p99={p99:8.3f} ms  "
+        f"per message={per_message_us:9.1f} us  (batches={len(batch_ms)})"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="Messages inserted per batch size")
+    parser.add_argument("--batch-sizes", default="1,10,100", help="Comma-separated batch sizes")
+    parser.add_argument("--sqlite-path", help="SQLite file for the sqlite backend (default: a temporary file)")
+    args = parser.parse_args()
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+
+    settings = get_settings()
+    with tempfile.TemporaryDirectory(prefix="mirage-bench-") as tmp_dir:
+        if settings.DATABASE_BACKEND == "sqlite":
+            settings.SQLITE_PATH = args.sqlite_path or os.path.join(tmp_dir, "bench.db")
+        try:
+            await run(batch_sizes, args.messages)
+        finally:
+            reset_database_client()
+
+
+async def run(batch_sizes: List[int], message_count: int):
+    """Insert message_count messages at each batch size and report the timings."""
+    settings = get_settings()
+    print("=" * 60)
+    print(f"Message insert benchmark ({settings.DATABASE_BACKEND} backend)")
+    if settings.DATABASE_BACKEND == "sqlite":
+        print(f"SQLite database: {settings.SQLITE_PATH}")
+    print("=" * 60)
+
+    users = await get_user_repository()
+    sessions = await get_session_repository()
+    messages = await get_message_repository()
+
+    user_id = str(uuid.uuid4())
+    await users.create_user({"id": user_id, "email": f"bench-{user_id[:8]}@mirage.local"})
+
+    try:
+        session_id = (await sessions.create_session({"user_id": user_id, "title": "Bench"}))["id"]
+
+        # Warm up connections and prepared statements
+        await messages.create_message(make_messages(session_id, 1)[0])
+        await messages.create_messages(make_messages(session_id, 2))
+
+        for batch_size in batch_sizes:
+            batches = max(1, message_count // batch_size)
+
+            if batch_size == 1:
+                timings = []
+                for message in make_messages(session_id, batches):
+                    start = time.perf_counter()
+                    await messages.create_message(message)
+                    timings.append((time.perf_counter() - start) * 1000)
+                report("create_message", 1, timings)
+
+            timings = []
+            for _ in range(batches):
+                batch = make_messages(session_id, batch_size)
+                start = time.perf_counter()
+                ids = await messages.create_messages(batch)
+                timings.append((time.perf_counter() - start) * 1000)
+                assert len(ids) == batch_size
+            report("create_messages", batch_size, timings)
+
+            await messages.delete_session_messages(session_id)
+    finally:
+        # Sessions and messages are removed with the user (ON DELETE CASCADE)
+        await users.delete_user(user_id)
+        await close_postgres_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
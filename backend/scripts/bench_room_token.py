@@ -0,0 +1,115 @@
+"""
+Benchmark the database work behind POST /livekit/token.
+
+Compares the previous provisioning flow (create_session or
+get_session_by_id, then update_livekit_room) with the current one, which
+creates or updates the session together with its room name in a single
+statement. Runs against the configured DATABASE_BACKEND and prints p50/p99
+per flow, for new and existing sessions.
+
+Usage:
+    DATABASE_BACKEND=postgres DATABASE_URL=postgresql://... python scripts/bench_room_token.py
+    DATABASE_BACKEND=sqlite python scripts/bench_room_token.py --iterations 2000
+
+To measure the endpoint end to end against a running backend:
+    python scripts/bench_concurrency.py --method POST --path /api/v1/livekit/token \\
+        --body '{"agent_type": "teacher"}' --token <JWT> --clients 1,10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.api.dependencies import get_session_repository, get_user_repository
+from app.core.database.connection import close_postgres_pool
+from app.core.livekit_rooms import room_name_for_session
+
+
+def legacy_room_name(user_id: str) -> str:
+    """Room name in the shape the previous flow generated."""
+    return f"mirage_{user_id[:8]}_{int(time.time())}"
+
+
+async def legacy_new_session(repo, user_id: str):
+    """Previous flow for a new session: insert, then set the room name."""
+    session = await repo.create_session({"user_id": user_id, "agent_type": "teacher", "title": "Voice Chat"})
+    await repo.update_livekit_room(session["id"], legacy_room_name(user_id))
+
+
+async def current_new_session(repo, user_id: str):
+    """Current flow for a new session: one insert carrying the room name."""
+    session_id = str(uuid.uuid4())
+    await repo.create_session({
+        "id": session_id,
+        "user_id": user_id,
+        "agent_type": "teacher",
+        "title": "Voice Chat",
+        "livekit_room_name": room_name_for_session(session_id),
+    })
+
+
+async def run(label: str, flow: Callable[[], Awaitable[None]], iterations: int) -> None:
+    """Time repeated calls of a flow and print latency percentiles."""
+    await flow()  # Warm up connections and prepared statements
+
+    latencies: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await flow()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<28} p50={p50:8.3f} ms  p99={p99:8.3f} ms  (n={iterations})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500, help="Timed iterations per flow")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Room token provisioning benchmark ({get_settings().DATABASE_BACKEND} backend)")
+    print("=" * 60)
+
+    users = await get_user_repository()
+    sessions = await get_session_repository()
+
+    user_id = str(uuid.uuid4())
+    await users.create_user({"id": user_id, "email": f"bench-{user_id[:8]}@mirage.local"})
+
+    try:
+        existing = await sessions.create_session({"user_id": user_id, "title": "Voice Chat"})
+        session_id = existing["id"]
+
+        async def legacy_existing_session():
+            # Previous flow: ownership lookup, then set the room name
+            session = await sessions.get_session_by_id(session_id)
+            assert session["user_id"] == user_id
+            await sessions.update_livekit_room(session_id, legacy_room_name(user_id))
+
+        async def current_existing_session():
+            await sessions.update_livekit_room(session_id, room_name_for_session(session_id), user_id=user_id)
+
+        await run("new session, previous", lambda: legacy_new_session(sessions, user_id), args.iterations)
+        await run("new session, current", lambda: current_new_session(sessions, user_id), args.iterations)
+        await run("existing session, previous", legacy_existing_session, args.iterations)
+        await run("existing session, current", current_existing_session, args.iterations)
+    finally:
+        # Sessions are removed with the user (ON DELETE CASCADE)
+        await users.delete_user(user_id)
+        await close_postgres_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Microbenchmark for Supabase token validation modes.
+
+Compares local signature verification against strict mode, which also
+round-trips to Supabase Auth on every call.
+
+Usage:
+    python scripts/bench_token_validation.py                 # local mode only, self-minted token
+    python scripts/bench_token_validation.py --token <JWT>   # both modes with a real access token
+
+A real access token can be obtained with scripts/create_test_user.py.
+"""
+
+import argparse
+import os
+import secrets
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A self-minted token needs a secret; use a throwaway one if none is configured
+if not os.getenv("SUPABASE_JWT_SECRET"):
+    os.environ["SUPABASE_JWT_SECRET"] = secrets.token_urlsafe(32)
+
+from app.config import get_settings
+from app.utils.supabase_auth import validate_supabase_token, SupabaseAuthError
+
+
+def mint_token() -> str:
+    """Create an HS256 token shaped like a Supabase access token."""
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    claims = {
+        "sub": "00000000-0000-0000-0000-000000000001",
+        "email": "bench@mirage.local",
+        "aud": settings.SUPABASE_JWT_AUDIENCE,
+        "role": "authenticated",
+        "iat": int(now.timestamp()),
+        "exp": int((now + timedelta(hours=1)).timestamp()),
+        "user_metadata": {"full_name": "Mirage Bench"},
+        "app_metadata": {"provider": "email"},
+    }
+    secret = settings.SUPABASE_JWT_SECRET.strip().strip('"').strip("'")
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def run(label: str, token: str, strict: bool, iterations: int) -> None:
+    """Time repeated validations and print latency percentiles."""
+    # Warm up JWKS / client initialization outside the measured loop
+    try:
+        validate_supabase_token(token, strict=strict)
+    except SupabaseAuthError as e:
+        print(f"{label:<8} skipped: {e}")
+        return
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        validate_supabase_token(token, strict=strict)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    total_seconds = sum(samples) / 1000
+    print(
+        f"{label:<8} n={iterations:<6} p50={p50:8.3f} ms  p99={p99:8.3f} ms  "
+        f"throughput={iterations / total_seconds:10.1f}/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token", help="Real Supabase access token (enables strict mode)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Local mode iterations")
+    parser.add_argument("--strict-iterations", type=int, default=50, help="Strict mode iterations")
+    args = parser.parse_args()
+
+    token = args.token or mint_token()
+
+    print("=" * 60)
+    print("Token validation benchmark")
+    print("=" * 60)
+    run("local", token, strict=False, iterations=args.iterations)
+
+    if args.token:
+        run("strict", token, strict=True, iterations=args.strict_iterations)
+    else:
+        print("strict   skipped: pass --token with a real access token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Check session room provisioning against a LiveKit server.
+
+Creates a room the way POST /livekit/token does (metadata plus explicit
+agent dispatch), checks the room and dispatch on the server, then runs the
+"room exists, agent missing" path once more. The room is deleted again.
+
+No agent worker needs to be running: dispatches stay pending until one
+registers under LIVEKIT_AGENT_NAME.
+
+Usage:
+    livekit-server --dev
+    LIVEKIT_URL=http://localhost:7880 LIVEKIT_API_KEY=devkey LIVEKIT_API_SECRET=secret \\
+        python scripts/check_livekit_dispatch.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from livekit.api import DeleteRoomRequest, ListRoomsRequest
+
+from app.config import get_settings
+from app.core.livekit_rooms import (
+    close_livekit_api,
+    ensure_session_room,
+    get_livekit_api,
+    room_has_agent,
+    room_name_for_session,
+)
+
+
+def check(condition: bool, label: str):
+    """Print a check result and stop on failure."""
+    if not condition:
+        print(f"❌ {label}")
+        sys.exit(1)
+    print(f"✅ {label}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agent-type", default="teacher", help="Agent type written to the room metadata")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    agent_name = settings.LIVEKIT_AGENT_NAME
+    print(f"LiveKit: {settings.LIVEKIT_URL}, agent name: {agent_name or '(automatic dispatch)'}")
+
+    api = get_livekit_api()
+    session_id = str(uuid.uuid4())
+    room_name = room_name_for_session(session_id)
+
+    try:
+        check(await room_has_agent(room_name) is None, "room does not exist yet")
+
+        reused = await ensure_session_room(room_name, session_id, args.agent_type, None)
+        check(reused is False, "new room is not reported as reused")
+
+        rooms = await api.room.list_rooms(ListRoomsRequest(names=[room_name]))
+        check(len(rooms.rooms) == 1, "room created")
+        metadata = json.loads(rooms.rooms[0].metadata or "{}")
+        check(metadata.get("session_id") == session_id, "room metadata carries session_id")
+        check(metadata.get("agent_type") == args.agent_type, "room metadata carries agent_type")
+        check(rooms.rooms[0].empty_timeout == settings.LIVEKIT_ROOM_EMPTY_TIMEOUT_SECONDS, "empty_timeout set")
+
+        if agent_name:
+            dispatches = await api.agent_dispatch.list_dispatch(room_name)
+            check(
+                [d.agent_name for d in dispatches] == [agent_name],
+                f"one dispatch for {agent_name}"
+            )
+
+        check(await room_has_agent(room_name) is False, "room is live without an agent")
+        reused = await ensure_session_room(room_name, session_id, args.agent_type, False)
+        check(reused is False, "room without an agent is not reported as reused")
+
+        if agent_name:
+            dispatches = await api.agent_dispatch.list_dispatch(room_name)
+            check(len(dispatches) >= 1, "dispatch kept for the existing room")
+    finally:
+        try:
+            await api.room.delete_room(DeleteRoomRequest(room=room_name))
+            print(f"Deleted {room_name}")
+        finally:
+            await close_livekit_api()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())